@@ -36,4 +36,12 @@ class ExternalData(Model):
         return self.name
     
     class Meta(BaseMeta):
-        external = True
\ No newline at end of file
+        external = True
+
+class Match(Model):
+    event = fields.ForeignKeyField(Event, related_name='matches')
+    name = fields.CharField(max_length=255)
+    round = fields.IntegerField(null=True, index=True)
+
+    def __str__(self):
+        return self.name
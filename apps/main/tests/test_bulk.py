@@ -0,0 +1,80 @@
+import json
+from types import SimpleNamespace
+
+from pydantic import field_validator, model_validator
+
+from apps.main.models import Event, Match, Tournament
+from apps.main.tests.utils import empty_tables
+from fastapp import serializers
+from fastapp.views.mixins import BulkModelMixin
+from fastapp.views.viewsets import GenericViewSet
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Match
+        fields = ["id", "name", "round", "event_id"]
+
+    @field_validator("name")
+    @classmethod
+    def check_name(cls, value):
+        if value == "bad":
+            raise ValueError("bad")
+        return value
+
+    @model_validator(mode="after")
+    def check_round(self):
+        # 读取了请求中没有提交的字段
+        if self.round is not None and not self.name:
+            raise ValueError("A match with a round needs a name")
+        return self
+
+
+class MatchBulkViewSet(BulkModelMixin, GenericViewSet):
+    queryset = Match
+    serializer_class = MatchSerializer
+    permission_classes = []
+    filter_backends = []
+
+
+async def put_bulk(items):
+    async def data():
+        return items
+
+    request = SimpleNamespace(data=data())
+    view = MatchBulkViewSet(request=request, action="bulk_update")
+    response = await view.bulk_update(request)
+    return response.status_code, json.loads(response.body)
+
+
+async def test_bulk_update_keeps_fields_left_out():
+    async with empty_tables(Match, Event, Tournament):
+        tournament = await Tournament.objects.create(name="t")
+        event = await Event.objects.create(name="e", tournament=tournament)
+        a = await Match.objects.create(event=event, name="a", round=1)
+        b = await Match.objects.create(event=event, name="b", round=2)
+
+        status_code, body = await put_bulk(
+            [{"id": a.pk, "round": 3}, {"id": b.pk, "name": "c"}]
+        )
+        assert (status_code, body) == (200, {"count": 2})
+        assert await Match.objects.all().order_by("id").values_list(
+            "name", "round"
+        ) == [("a", 3), ("c", 2)]
+
+
+async def test_bulk_errors_with_exceptions_in_ctx_are_encoded():
+    async with empty_tables(Match, Event, Tournament):
+        tournament = await Tournament.objects.create(name="t")
+        event = await Event.objects.create(name="e", tournament=tournament)
+        a = await Match.objects.create(event=event, name="a", round=1)
+
+        status_code, body = await put_bulk(
+            [{"id": a.pk, "name": "bad"}, {"round": 2}, {"id": a.pk + 1}]
+        )
+        assert status_code == 422
+        assert [x["index"] for x in body["detail"]] == [0, 1, 2]
+        assert body["detail"][0]["errors"][0]["ctx"] == {"error": {}}
+        assert body["detail"][1]["errors"][0]["type"] == "missing"
+        assert body["detail"][2]["errors"][0]["type"] == "not_found"
+        assert await Match.objects.get(pk=a.pk).values_list("name") == ("a",)
@@ -0,0 +1,36 @@
+from apps.main.models import Event, Match, Tournament
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp.contrib.contenttypes.models import ContentType, content_types
+
+
+async def test_from_model_queries_once_per_model():
+    async with empty_tables():
+        await content_types.load(create_missing=True)
+        try:
+            with QueryCounter() as counter:
+                for _ in range(10):
+                    for model in (Tournament, Event, Match):
+                        ctype = await ContentType.from_model(model)
+                        assert await ContentType.from_id(ctype.id) is ctype
+            assert counter.count == 0
+
+            # 没有预加载时每个模型只查询一次
+            content_types.clear()
+            with QueryCounter() as counter:
+                for _ in range(10):
+                    for model in (Tournament, Event, Match):
+                        await ContentType.from_model(model)
+            assert counter.count == 3
+        finally:
+            await content_types.load()
+
+
+async def test_load_does_not_create_rows():
+    async with empty_tables():
+        await ContentType.objects.filter(model="Match").delete()
+        try:
+            await content_types.load()
+            assert content_types.get_for_model(Match) is None
+            assert not await ContentType.objects.filter(model="Match").exists()
+        finally:
+            await content_types.load(create_missing=True)
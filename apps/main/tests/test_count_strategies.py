@@ -0,0 +1,55 @@
+from apps.main.models import Event, Match, Team, Tournament
+from apps.main.tests.test_fetch_plan import create_matches
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp.paginate.count import (
+    CachedCount,
+    ConcurrentCount,
+    CountStrategy,
+    EstimatedCount,
+    WindowCount,
+)
+
+
+async def paginate(strategy, queryset, limit, offset):
+    page, total = await strategy.paginate(queryset, limit, offset)
+    if not isinstance(page, list):
+        page = await page
+    return [x.pk for x in page], total
+
+
+async def test_strategies_agree_with_the_exact_count():
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        queryset = Match.objects.filter(round__gte=1).order_by("-name")
+
+        for limit, offset in ((3, 0), (3, 6), (3, 30)):
+            expected = await paginate(CountStrategy(), queryset, limit, offset)
+            for strategy in (
+                ConcurrentCount(),
+                WindowCount(),
+                EstimatedCount(threshold=1),
+                CachedCount(),
+            ):
+                result = await paginate(strategy, queryset, limit, offset)
+                assert result == expected, (type(strategy).__name__, offset)
+        assert expected == ([], 8)
+
+
+async def test_window_count_uses_one_query():
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        with QueryCounter() as counter:
+            pks, total = await paginate(WindowCount(), Match.objects.all(), 5, 0)
+        assert counter.count == 1 and len(pks) == 5 and total == 12
+
+
+async def test_cached_count_is_kept_per_filter():
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        strategy = CachedCount()
+
+        assert await strategy.count(Match.objects.filter(round=0)) == 4
+        with QueryCounter() as counter:
+            assert await strategy.count(Match.objects.filter(round=0)) == 4
+            assert await strategy.count(Match.objects.filter(round__gte=0)) == 12
+        assert counter.count == 1
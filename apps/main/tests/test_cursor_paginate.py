@@ -0,0 +1,65 @@
+from apps.main.models import Match, Tournament
+from apps.main.tests.utils import empty_tables, fake_request
+from fastapp.exceptions import HttpCodeException
+from fastapp.paginate.cursor import CursorPaginate
+
+
+class FakeView:
+    total = None
+
+    def get_serializer_class(self):
+        return None
+
+
+class NamePaginate(CursorPaginate):
+    ordering = ["-name"]
+
+
+async def fetch(paginate, queryset, **params):
+    view = FakeView()
+    rows = await paginate.paginate_queryset(queryset, fake_request(**params), view)
+    return [row.pk for row in rows], view.total
+
+
+async def test_cursor_pages_cover_every_row_once():
+    async with empty_tables(Tournament):
+        for name in ["a", "b", "b", "c", "c", "c", "d"]:
+            await Tournament.objects.create(name=name)
+        expected = [
+            t.pk
+            for t in sorted(
+                await Tournament.objects.all(), key=lambda t: (t.name, t.pk)
+            )
+        ][::-1]
+
+        pages, cursor = [], None
+        while True:
+            params = {"page_size": 3} | ({"cursor": cursor} if cursor else {})
+            pks, total = await fetch(NamePaginate, Tournament.objects.all(), **params)
+            pages.append(pks)
+            if total.next is None:
+                break
+            cursor = total.next
+        assert sum(pages, []) == expected
+        assert [len(x) for x in pages] == [3, 3, 1]
+
+        # 从最后一页往回翻
+        back, cursor = [], total.previous
+        while cursor is not None:
+            pks, total = await fetch(
+                NamePaginate, Tournament.objects.all(), page_size=3, cursor=cursor
+            )
+            back.insert(0, pks)
+            cursor = total.previous
+        assert back == pages[:-1]
+
+
+async def test_cursor_ordering_must_be_non_null_columns():
+    for ordering in (["round"], ["event__name"]):
+        paginate = type("MatchPaginate", (CursorPaginate,), {"ordering": ordering})
+        try:
+            paginate.get_ordering(Match.objects.all())
+        except HttpCodeException as e:
+            assert e.status_code == 400 and ordering[0] in e.detail
+        else:
+            raise AssertionError(f"{ordering} accepted")
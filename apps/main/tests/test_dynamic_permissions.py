@@ -0,0 +1,63 @@
+import contextlib
+
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp.contrib.dynamic_rbac import utils
+from fastapp.contrib.dynamic_rbac.models import DynamicPermission
+
+
+@contextlib.contextmanager
+def declared(perms):
+    collect = utils.collect_dynamic_permissions
+    utils.collect_dynamic_permissions = lambda: set(perms)
+    try:
+        yield
+    finally:
+        utils.collect_dynamic_permissions = collect
+
+
+def make_perms(count: int, target: str = "view"):
+    return {(f"perm{i}", target) for i in range(count)}
+
+
+async def stored_perms():
+    return set(await DynamicPermission.objects.all().values_list("perm", "target"))
+
+
+async def test_initialize_dynamic_permissions_diffs_declared_rows():
+    async with empty_tables(DynamicPermission):
+        with declared(make_perms(5)):
+            assert await utils.initialize_dynamic_permissions() == (5, 0)
+            assert await utils.initialize_dynamic_permissions() == (0, 0)
+        assert await stored_perms() == make_perms(5)
+
+        # 不再声明的权限默认保留
+        with declared(make_perms(3) | {("extra", "view")}):
+            assert await utils.initialize_dynamic_permissions() == (1, 0)
+            assert len(await stored_perms()) == 6
+
+            with QueryCounter() as counter:
+                result = await utils.initialize_dynamic_permissions(
+                    remove_stale=True, batch_size=1
+                )
+            assert result == (0, 2)
+            assert counter.count_of("DELETE") == 2
+        assert await stored_perms() == make_perms(3) | {("extra", "view")}
+
+
+async def test_initialize_dynamic_permissions_queries_do_not_grow():
+    counts = []
+    for size in (10, 100, 1000):
+        async with empty_tables(DynamicPermission):
+            with declared(make_perms(size, target="old")):
+                await utils.initialize_dynamic_permissions()
+
+            # 一半新增，旧的全部移除
+            with declared(make_perms(size // 2, target="new")):
+                with QueryCounter() as counter:
+                    result = await utils.initialize_dynamic_permissions(
+                        remove_stale=True, batch_size=1000
+                    )
+                assert result == (size // 2, size)
+                assert await stored_perms() == make_perms(size // 2, target="new")
+            counts.append(counter.count)
+    assert len(set(counts)) == 1, counts
@@ -0,0 +1,38 @@
+from apps.main.models import Event, Match, Tournament
+from apps.main.tests.utils import empty_tables
+from fastapp import serializers
+from fastapp.views.mixins import ExportModelMixin
+from fastapp.views.viewsets import GenericViewSet
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Match
+        fields = ["id", "name", "round"]
+
+
+class MatchExportViewSet(ExportModelMixin, GenericViewSet):
+    serializer_class = MatchSerializer
+    export_chunk_size = 2
+
+
+async def export_ids(view):
+    ids = []
+    async for rows in view.iter_export_chunks(Match.objects.all()):
+        ids.extend(row["id"] for row in rows)
+    return ids
+
+
+async def test_export_keeps_rows_with_null_ordering_values():
+    async with empty_tables(Match, Event, Tournament):
+        tournament = await Tournament.objects.create(name="t")
+        event = await Event.objects.create(name="e", tournament=tournament)
+        for i, round in enumerate([1, None, 2, None, 3]):
+            await Match.objects.create(event=event, name=f"m{i}", round=round)
+        all_ids = sorted(await Match.objects.all().values_list("id", flat=True))
+
+        view = MatchExportViewSet(request=None, action="export", ordering=["round"])
+        assert await export_ids(view) == all_ids
+
+        view = MatchExportViewSet(request=None, action="export", ordering=["-name"])
+        assert await export_ids(view) == all_ids[::-1]
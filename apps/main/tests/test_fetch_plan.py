@@ -0,0 +1,140 @@
+from apps.main.models import Event, Match, Team, Tournament
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp import serializers
+from fastapp.serializers.fields import ListSerializer
+from fastapp.serializers.model import FetchPlan, _get_fetch_plan
+
+
+class TournamentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tournament
+        fields = ["id", "name"]
+
+
+class TeamSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Team
+        fields = ["id", "name"]
+
+
+class EventSerializer(serializers.ModelSerializer):
+    tournament = TournamentSerializer()
+    participants = ListSerializer(TeamSerializer())
+
+    class Meta:
+        model = Event
+        fields = ["id", "name", "tournament", "participants"]
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    event = EventSerializer(null=True)
+
+    class Meta:
+        model = Match
+        fields = ["id", "name", "event"]
+
+
+class EventNameSerializer(serializers.ModelSerializer):
+    tournament = TournamentSerializer()
+
+    class Meta:
+        model = Event
+        fields = ["id", "name", "tournament"]
+
+
+class MatchEventNameSerializer(serializers.ModelSerializer):
+    event = EventNameSerializer(null=True)
+
+    class Meta:
+        model = Match
+        fields = ["id", "name", "event"]
+
+
+class MatchNameSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Match
+        fields = ["id", "name"]
+
+
+async def create_matches():
+    teams = [await Team.objects.create(name=f"team{i}") for i in range(3)]
+    for i in range(2):
+        tournament = await Tournament.objects.create(name=f"t{i}")
+        for j in range(2):
+            event = await Event.objects.create(name=f"e{i}{j}", tournament=tournament)
+            await event.participants.add(*teams[: j + 1])
+            for k in range(3):
+                await Match.objects.create(event=event, name=f"m{i}{j}{k}", round=k)
+
+
+async def dump(serializer_class):
+    """Serialize every match and return the rows with the SQL it took."""
+    with QueryCounter() as counter:
+        rows = await serializer_class.from_queryset(Match.objects.order_by("id"))
+
+    # 不经过 fetch plan，逐个关系预取的结果作为对照
+    expected = [
+        serializer_class.model_validate(match).model_dump()
+        for match in await Match.objects.order_by("id").prefetch_related(
+            *serializer_class.get_fetch_fields()
+        )
+    ]
+    assert [row.model_dump() for row in rows] == expected
+    assert expected[0]["name"] == "m000"
+    return expected, counter.queries
+
+
+def selected_columns(sql: str, table: str):
+    """Return the columns of ``table`` in the SELECT list of ``sql``."""
+    columns = set()
+    for item in sql.split(" FROM ", 1)[0].removeprefix("SELECT ").split(","):
+        owner, _, column = item.split(" ")[0].rpartition(".")
+        if owner.strip('"') in ("", table):
+            columns.add(column.strip('"'))
+    return columns
+
+
+async def test_forward_relations_are_joined():
+    assert _get_fetch_plan(MatchEventNameSerializer) == FetchPlan(
+        select_related=("event__tournament",),
+        prefetch_related=(),
+        only=("id", "name", "event_id"),
+    )
+
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        rows, queries = await dump(MatchEventNameSerializer)
+
+        assert len(queries) == 1
+        assert selected_columns(queries[0], "main_match") == {"id", "name", "event_id"}
+        assert rows[0]["event"]["tournament"]["name"] == "t0"
+
+
+async def test_relations_below_a_prefetch_are_prefetched():
+    plan = _get_fetch_plan(MatchSerializer)
+    assert plan.select_related == ()
+    assert set(plan.prefetch_related) == {"event__tournament", "event__participants"}
+    assert plan.only == ("id", "name", "event_id")
+
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        rows, queries = await dump(MatchSerializer)
+
+        # 行数无关：比赛、赛事、锦标赛、参赛队各一次
+        assert len(queries) == 4
+        assert rows[0]["event"]["tournament"]["name"] == "t0"
+        assert [t["name"] for t in rows[-1]["event"]["participants"]] == [
+            "team0",
+            "team1",
+        ]
+
+
+async def test_unused_columns_are_not_selected():
+    assert _get_fetch_plan(MatchNameSerializer).only == ("id", "name")
+
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+        _, queries = await dump(MatchNameSerializer)
+
+        assert len(queries) == 1
+        assert selected_columns(queries[0], "main_match") == {"id", "name"}
@@ -0,0 +1,175 @@
+import contextlib
+
+from apps.main.models import Team
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp.contrib.auth import get_user_model
+from fastapp.contrib.auth.models import Group, Permission
+from fastapp.contrib.contenttypes.models import ContentType, content_types
+from fastapp.contrib.guardian.models import GroupObjectPermission, UserObjectPermission
+from fastapp.contrib.guardian.shortcuts import (
+    filter_objects_for_user,
+    get_perms_for_objects,
+)
+
+
+@contextlib.asynccontextmanager
+async def guardian_tables(team_count: int = 5):
+    User = get_user_model()
+    async with empty_tables(
+        UserObjectPermission, GroupObjectPermission, Permission, Group, User, Team
+    ):
+        await content_types.load(create_missing=True)
+        ctype = await ContentType.from_model(Team)
+        for perm in ("view", "change"):
+            await Permission.objects.create(content_type=ctype, perm=perm)
+        user = await User.objects.create(username="u", password="!")
+        group = await Group.objects.create(name="g")
+        await Team.objects.bulk_create(
+            [Team(name=f"team{i}") for i in range(team_count)]
+        )
+        yield user, group, list(await Team.objects.all().order_by("id"))
+
+
+def insert_of(model):
+    return f'INSERT INTO "{model._meta.db_table}"'
+
+
+def delete_of(model):
+    return f'DELETE FROM "{model._meta.db_table}"'
+
+
+async def test_bulk_assign_perm_counts_only_new_rows():
+    async with guardian_tables() as (user, group, teams):
+        manager = UserObjectPermission.objects
+        assert await manager.bulk_assign_perm("view", user, teams[:3]) == 3
+        # 已有的授权被唯一约束跳过
+        assert await manager.bulk_assign_perm("view", user, teams) == 2
+        assert await manager.bulk_assign_perm("view", user, teams) == 0
+        assert await manager.bulk_assign_perm("change", user, Team.objects.all()) == 5
+        assert await UserObjectPermission.objects.filter(user=user).count() == 10
+
+        manager = GroupObjectPermission.objects
+        assert await manager.bulk_assign_perm("view", group, teams) == 5
+        assert await manager.bulk_assign_perm("view", group, teams[1:]) == 0
+        assert await GroupObjectPermission.objects.filter(group=group).count() == 5
+
+        with QueryCounter() as counter:
+            assert await manager.bulk_assign_perm("view", group, []) == 0
+        assert counter.count == 0
+
+
+async def test_bulk_assign_perm_chunks_inserts():
+    async with guardian_tables(team_count=7) as (user, _, teams):
+        manager = UserObjectPermission.objects
+        for batch_size, statements in ((2, 4), (6, 2), (7, 1), (8, 1)):
+            await UserObjectPermission.objects.all().delete()
+            with QueryCounter() as counter:
+                assert await manager.bulk_assign_perm(
+                    "view", user, teams, batch_size=batch_size
+                ) == len(teams)
+            assert counter.count_of(insert_of(UserObjectPermission)) == statements
+
+        # 分块边界两侧已有的行同样被跳过
+        await UserObjectPermission.objects.filter(
+            object_id__in=[str(teams[1].pk), str(teams[2].pk)]
+        ).delete()
+        assert await manager.bulk_assign_perm("view", user, teams, batch_size=2) == 2
+        assert await UserObjectPermission.objects.filter(user=user).count() == 7
+
+
+async def test_bulk_remove_perm_counts_and_chunks_deletes():
+    async with guardian_tables(team_count=7) as (user, _, teams):
+        manager = UserObjectPermission.objects
+        await manager.bulk_assign_perm("view", user, teams)
+        await manager.bulk_assign_perm("change", user, teams)
+
+        with QueryCounter() as counter:
+            assert (
+                await manager.bulk_remove_perm("view", user, teams[:5], batch_size=2)
+                == 5
+            )
+        assert counter.count_of(delete_of(UserObjectPermission)) == 3
+        assert await manager.bulk_remove_perm("view", user, teams[:5]) == 0
+        assert await manager.bulk_remove_perm("view", user, Team.objects.all()) == 2
+
+        # 其他权限不受影响
+        assert await UserObjectPermission.objects.filter(user=user).count() == 7
+
+
+async def grant_mixed(user, group, teams):
+    # 用户在 0、1 上有 view，组在 1、2 上有 change
+    await user.groups.add(group)
+    await UserObjectPermission.objects.bulk_assign_perm("view", user, teams[:2])
+    await GroupObjectPermission.objects.bulk_assign_perm("change", group, teams[1:3])
+
+
+async def test_get_perms_for_objects_merges_user_and_group_grants():
+    async with guardian_tables() as (user, group, teams):
+        await grant_mixed(user, group, teams)
+        pks = [x.pk for x in teams]
+
+        # 用户授权和组授权各一次查询
+        with QueryCounter() as counter:
+            result = await get_perms_for_objects(
+                user, teams, accept_model_perms=False
+            )
+        assert counter.count == 2
+        assert [result[pk] for pk in pks] == [
+            {"view"},
+            {"view", "change"},
+            {"change"},
+            set(),
+            set(),
+        ]
+
+        with QueryCounter() as counter:
+            result = await get_perms_for_objects(
+                user, teams, use_groups=False, accept_model_perms=False
+            )
+        assert counter.count == 1
+        assert [result[pk] for pk in pks[:3]] == [{"view"}, {"view"}, set()]
+
+        with QueryCounter() as counter:
+            result = await get_perms_for_objects(
+                group, teams, "change", accept_model_perms=False
+            )
+        assert counter.count == 1
+        assert [result[pk] for pk in pks[:3]] == [set(), {"change"}, {"change"}]
+
+
+async def test_filter_objects_for_user_any_or_all_perms():
+    async with guardian_tables() as (user, group, teams):
+        await grant_mixed(user, group, teams)
+        perms = ["view", "change"]
+
+        with QueryCounter() as counter:
+            held = await filter_objects_for_user(
+                user, perms, teams, accept_model_perms=False
+            )
+        assert held == teams[1:2]
+        assert counter.count == 2
+
+        held = await filter_objects_for_user(
+            user, perms, teams, any_perm=True, accept_model_perms=False
+        )
+        assert held == teams[:3]
+
+        held = await filter_objects_for_user(
+            user, perms, teams, use_groups=False, accept_model_perms=False
+        )
+        assert held == []
+        held = await filter_objects_for_user(
+            user, perms, teams, any_perm=True, use_groups=False
+        )
+        assert held == teams[:2]
+
+
+async def test_object_perms_queries_do_not_grow_with_objects():
+    counts = []
+    for size in (3, 30):
+        async with guardian_tables(team_count=size) as (user, group, teams):
+            await grant_mixed(user, group, teams)
+            with QueryCounter() as counter:
+                await filter_objects_for_user(user, ["view", "change"], teams)
+            counts.append(counter.count)
+    assert counts[0] == counts[1], counts
@@ -0,0 +1,80 @@
+import datetime
+import decimal
+import uuid
+
+from apps.main.models import Team
+from fastapp import serializers
+from fastapp.responses import JSONResponse, render_json, serializer_content
+from fastapp.utils.json import format_datetime
+from fastapp.views.viewsets import ListSerializerWrapper
+
+TZ = datetime.timezone(datetime.timedelta(hours=8))
+
+
+class TeamTimesSerializer(serializers.ModelSerializer):
+    at = serializers.DateTimeField()
+    day = serializers.DateField()
+    t = serializers.TimeField()
+    price = serializers.DecimalField(max_digits=10, decimal_places=2)
+    key = serializers.UUIDField()
+    formatted = serializers.DateTimeField(format="%Y/%m/%d")
+
+    class Meta:
+        model = Team
+        fields = ["id", "name", "at", "day", "t", "price", "key", "formatted"]
+
+
+def test_format_datetime_matches_strftime():
+    for year in (1, 999, 1000, 2024, 9999):
+        for microsecond in (0, 123456):
+            for tzinfo in (None, TZ):
+                value = datetime.datetime(
+                    year, 1, 2, 3, 4, 5, microsecond, tzinfo=tzinfo
+                )
+                assert format_datetime(value) == value.strftime("%Y-%m-%d %H:%M:%S")
+                assert format_datetime(value.date()) == value.date().isoformat()
+                assert format_datetime(value.timetz()) == value.strftime("%H:%M:%S")
+
+
+def test_render_json_bytes_are_pinned():
+    content = {
+        "at": datetime.datetime(2024, 5, 6, 7, 8, 9, 123456, tzinfo=TZ),
+        "old": datetime.datetime(999, 1, 2, 3, 4, 5),
+        "day": datetime.date(2024, 5, 6),
+        "t": datetime.time(7, 8, 9, 10),
+        "price": decimal.Decimal("1E+2"),
+        "key": uuid.UUID(int=5),
+        "nested": [(datetime.date(2024, 1, 1), decimal.Decimal("0.50"))],
+    }
+    assert render_json(content) == (
+        b'{"at":"2024-05-06 07:08:09","old":"999-01-02 03:04:05",'
+        b'"day":"2024-05-06","t":"07:08:09","price":"100",'
+        b'"key":"00000000-0000-0000-0000-000000000005",'
+        b'"nested":[["2024-01-01","0.50"]]}'
+    )
+
+
+def test_serializer_renders_the_same_json_without_model_dump():
+    serializer = TeamTimesSerializer(
+        id=1,
+        name="n",
+        at=datetime.datetime(999, 1, 2, 3, 4, 5, 6, tzinfo=TZ),
+        day=datetime.date(2024, 5, 6),
+        t=datetime.time(7, 8, 9, 10),
+        price=decimal.Decimal("1E+2"),
+        key=uuid.UUID(int=5),
+        formatted=datetime.datetime(2024, 1, 2, 3, 4, 5),
+    )
+    expected = (
+        b'{"id":1,"name":"n","at":"999-01-02 03:04:05","day":"2024-05-06",'
+        b'"t":"07:08:09","price":"100",'
+        b'"key":"00000000-0000-0000-0000-000000000005","formatted":"2024/01/02"}'
+    )
+    assert JSONResponse(serializer.model_dump()).body == expected
+    assert JSONResponse(serializer_content(serializer)).body == expected
+
+    # 分页器把列表放进 dict 里
+    wrapper = ListSerializerWrapper([serializer, serializer])
+    assert JSONResponse({"data": serializer_content(wrapper)}).body == (
+        b'{"data":[' + expected + b"," + expected + b"]}"
+    )
@@ -0,0 +1,31 @@
+import typing
+
+from apps.main.tests.utils import empty_tables
+from fastapp.contrib.auth import get_user_model
+from fastapp.contrib.auth.typing import TokenTypeEnum
+from fastapp.contrib.auth.utils import OptionalCurrentUser
+from fastapp.security import jwt
+
+optional_current_user = typing.get_args(OptionalCurrentUser)[1].dependency
+
+
+async def test_optional_current_user_without_token():
+    User = get_user_model()
+    async with empty_tables(User):
+        user = await User.objects.create(username="optional", password="!")
+        token = jwt.create_token(
+            {"sub": user.username, "typ": TokenTypeEnum.ACCESS.value},
+            version_key=user.password,
+        )
+
+        maxsize = jwt.verified_tokens.maxsize
+        try:
+            for jwt.verified_tokens.maxsize in (maxsize or 100, 0):
+                # 匿名请求没有 token，不能因为计算缓存键而出错
+                assert await optional_current_user(None) is None
+                assert await optional_current_user("invalid") is None
+                assert (await optional_current_user(token)).pk == user.pk
+                assert (await optional_current_user(token)).pk == user.pk
+        finally:
+            jwt.verified_tokens.maxsize = maxsize
+            jwt.verified_tokens.clear()
@@ -0,0 +1,88 @@
+import contextlib
+import hashlib
+import json
+
+from apps.main.tests.test_permission_cache import ALIAS, NonAtomicCache, disk_cache
+from apps.main.tests.utils import empty_tables
+from common.settings import settings
+from fastapp.cache.states import backends
+from fastapp.contrib.key_auth import cache as key_cache
+from fastapp.contrib.key_auth.cache import get_active_api_key, get_api_key_cache
+from fastapp.contrib.key_auth.mixins import KeyAuthMixin
+from fastapp.contrib.key_auth.models import APIKey
+from fastapp.exceptions import ImproperlyConfigured
+
+
+@contextlib.contextmanager
+def key_cache_settings(**overrides):
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    key_cache._api_key_cache = None
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        key_cache._api_key_cache = None
+
+
+def test_api_key_cache_is_opt_in_and_needs_deletable_alias():
+    assert get_api_key_cache() is None
+
+    with key_cache_settings(KEY_AUTH_CACHE_TIMEOUT=60, KEY_AUTH_CACHE_ALIAS=None):
+        assert get_api_key_cache() is None
+
+    backends[ALIAS] = NonAtomicCache()
+    try:
+        with key_cache_settings(KEY_AUTH_CACHE_TIMEOUT=60, KEY_AUTH_CACHE_ALIAS=ALIAS):
+            try:
+                get_api_key_cache()
+            except ImproperlyConfigured:
+                pass
+            else:
+                raise AssertionError("alias without delete accepted")
+    finally:
+        backends.pop(ALIAS)
+
+
+async def test_revoked_api_key_is_dropped_for_every_worker():
+    with disk_cache(), key_cache_settings(
+        KEY_AUTH_CACHE_TIMEOUT=60, KEY_AUTH_CACHE_ALIAS=ALIAS
+    ):
+        async with empty_tables(APIKey):
+            api_key = await APIKey.objects.create(app_key="key", app_secret="s")
+            assert (await get_active_api_key(APIKey, "app_key", "key")).pk == api_key.pk
+
+            # 另一个 worker 从共享缓存读取
+            other = key_cache._api_key_cache
+            key_cache._api_key_cache = None
+            assert (await get_active_api_key(APIKey, "app_key", "key")).pk == api_key.pk
+
+            key_cache._api_key_cache = other
+            api_key.is_active = False
+            await api_key.save()
+            assert await get_active_api_key(APIKey, "app_key", "key") is None
+
+            # 新 worker 的本地缓存为空，只能看到共享缓存
+            key_cache._api_key_cache = None
+            assert await get_active_api_key(APIKey, "app_key", "key") is None
+
+
+def test_sign_is_checked_over_the_raw_body():
+    secret = "secret"
+    body = b'{"b": 1,  "a": [1, 2]}'
+
+    raw_sign = hashlib.md5(body + secret.encode()).hexdigest()
+    assert KeyAuthMixin.check_sign(raw_sign, body, secret)
+
+    # 旧客户端对规范化后的 JSON 签名
+    canonical = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":"))
+    legacy_sign = hashlib.md5((canonical + secret).encode()).hexdigest()
+    assert KeyAuthMixin.check_sign(legacy_sign, body, secret)
+
+    assert not KeyAuthMixin.check_sign(raw_sign, body + b" ", "other")
+    assert not KeyAuthMixin.check_sign(raw_sign, b"not json", secret)
+    assert KeyAuthMixin.check_sign(
+        hashlib.md5(b"not json" + secret.encode()).hexdigest(), b"not json", secret
+    )
@@ -0,0 +1,70 @@
+import time
+
+from fastapp.contrib.limiter.lease import LeaseRedisRateLimiter
+
+
+class FakeRedis:
+    """Runs the lease script of LeaseRedisRateLimiter against a dict."""
+
+    def __init__(self):
+        self.counters = {}
+        self.calls = 0
+
+    async def evalsha(self, sha, numkeys, key, limit, expire_time, batch):
+        self.calls += 1
+        now = time.monotonic()
+        current, expires_at = self.counters.get(key, (0, 0))
+        if expires_at <= now:
+            current, expires_at = 0, now + int(expire_time) / 1000
+
+        pttl = int((expires_at - now) * 1000)
+        grant = min(int(batch), int(limit) - current)
+        if grant <= 0:
+            return [0, pttl]
+
+        self.counters[key] = (current + grant, expires_at)
+        return [grant, pttl]
+
+
+def make_workers(redis, count, **kwargs):
+    workers = []
+    for _ in range(count):
+        limiter = LeaseRedisRateLimiter(**kwargs)
+        limiter.connection = redis
+        limiter.lua_sha = "lease"
+        workers.append(limiter)
+    return workers
+
+
+async def test_lease_is_clamped_to_a_share_of_the_limit():
+    limiter = LeaseRedisRateLimiter(times=10, seconds=60, expected_workers=4)
+    assert limiter.lease_size == 2
+
+    limiter = LeaseRedisRateLimiter(times=3, seconds=60, expected_workers=4)
+    assert limiter.lease_size == 1
+
+    limiter = LeaseRedisRateLimiter(times=100000, seconds=60)
+    assert limiter.lease_size == limiter.batch_size
+
+
+async def test_small_limit_is_shared_between_workers():
+    redis = FakeRedis()
+    first, second = make_workers(redis, 2, times=10, seconds=60, expected_workers=4)
+
+    assert await first._check("k") == 0
+    # the first worker only leased a share, the second one is still admitted
+    assert await second._check("k") == 0
+
+
+async def test_load_admits_close_to_the_limit():
+    redis = FakeRedis()
+    workers = make_workers(redis, 4, times=1000, seconds=60, expected_workers=4)
+
+    admitted = 0
+    for i in range(4000):
+        if await workers[i % 4]._check("k") == 0:
+            admitted += 1
+
+    lease_size = workers[0].lease_size
+    assert 1000 - 3 * lease_size <= admitted <= 1000
+    assert redis.calls < 4000 // 10
@@ -0,0 +1,115 @@
+from apps.main.models import Event, Team, Tournament
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp import serializers
+from fastapp.serializers.fields import ListSerializer
+
+
+class TeamSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Team
+        fields = ["id", "name"]
+
+
+class EventSerializer(serializers.ModelSerializer):
+    participants = ListSerializer(TeamSerializer(), allow_primary_key=True)
+
+    class Meta:
+        model = Event
+        fields = ["id", "name", "tournament_id", "participants"]
+
+
+async def create_teams(count: int):
+    await Team.objects.bulk_create([Team(name=f"team{i}") for i in range(count)])
+    return list(await Team.objects.all().order_by("id").values_list("id", flat=True))
+
+
+async def participant_ids(event_id: int):
+    event = await Event.objects.get(pk=event_id)
+    return sorted(team.pk for team in await event.participants.all())
+
+
+async def save_event(**payload):
+    with QueryCounter() as counter:
+        instance = await EventSerializer(**payload).save()
+    return instance, counter
+
+
+async def test_m2m_is_synced_by_diff():
+    async with empty_tables(Event, Team, Tournament):
+        tournament = await Tournament.objects.create(name="t")
+        ids = await create_teams(5)
+
+        # 创建：插入一次，不删除
+        event, counter = await save_event(
+            name="e",
+            tournament_id=tournament.pk,
+            participants=[{"id": x} for x in ids[:3]],
+        )
+        assert await participant_ids(event.pk) == ids[:3]
+        assert counter.count_of('INSERT INTO "event_team"') == 1
+        assert counter.count_of('DELETE FROM "event_team"') == 0
+
+        # 更新：只删除多余的、插入缺少的
+        _, counter = await save_event(
+            id=event.pk,
+            name="e",
+            tournament_id=tournament.pk,
+            participants=[{"id": x} for x in ids[2:]],
+        )
+        assert await participant_ids(event.pk) == ids[2:]
+        assert counter.count_of('INSERT INTO "event_team"') == 1
+        assert counter.count_of('DELETE FROM "event_team"') == 1
+
+        # 没有变化时不写入
+        _, counter = await save_event(
+            id=event.pk,
+            name="e",
+            tournament_id=tournament.pk,
+            participants=[{"id": x} for x in ids[2:]],
+        )
+        assert [x.split()[0] for x in counter.queries if '"event_team"' in x] == [
+            "SELECT"
+        ]
+
+        # 全部移除
+        _, counter = await save_event(
+            id=event.pk, name="e", tournament_id=tournament.pk, participants=[]
+        )
+        assert await participant_ids(event.pk) == []
+
+        # 未提交的 m2m 字段保持不变
+        _, counter = await save_event(
+            id=event.pk,
+            name="e",
+            tournament_id=tournament.pk,
+            participants=[{"id": ids[0]}],
+        )
+        _, counter = await save_event(
+            id=event.pk, name="renamed", tournament_id=tournament.pk
+        )
+        assert await participant_ids(event.pk) == [ids[0]]
+        assert not [x for x in counter.queries if '"event_team"' in x]
+
+
+async def perf_m2m_statements_do_not_grow_with_ids():
+    counts = []
+    for size in (10, 100, 1000):
+        async with empty_tables(Event, Team, Tournament):
+            tournament = await Tournament.objects.create(name="t")
+            ids = await create_teams(size)
+            event, _ = await save_event(
+                name="e",
+                tournament_id=tournament.pk,
+                participants=[{"id": x} for x in ids[: size // 2]],
+            )
+
+            # 移除前一半，加入后一半
+            _, counter = await save_event(
+                id=event.pk,
+                name="e",
+                tournament_id=tournament.pk,
+                participants=[{"id": x} for x in ids[size // 2 :]],
+            )
+            assert await participant_ids(event.pk) == ids[size // 2 :]
+            counts.append(counter.count)
+    assert len(set(counts)) == 1, counts
@@ -0,0 +1,69 @@
+from apps.main.models import Event, Team, Tournament
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp import serializers
+from fastapp.serializers.fields import ListSerializer
+
+
+class TeamSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Team
+        fields = ["id", "name"]
+
+
+class EventSerializer(serializers.ModelSerializer):
+    participants = ListSerializer(TeamSerializer(), allow_primary_key=True)
+
+    class Meta:
+        model = Event
+        fields = ["id", "name", "participants"]
+
+
+class TournamentSerializer(serializers.ModelSerializer):
+    events = ListSerializer(EventSerializer(), writable=True)
+
+    class Meta:
+        model = Tournament
+        fields = ["id", "name", "events"]
+
+
+async def save_tournament(size: int) -> QueryCounter:
+    tournament = await Tournament.objects.create(name="t")
+    teams = [await Team.objects.create(name=f"team{i}") for i in range(5)]
+    events = [
+        await Event.objects.create(name=f"e{i}", tournament=tournament)
+        for i in range(size)
+    ]
+    payload = {
+        "id": tournament.pk,
+        "name": "renamed",
+        "events": [
+            {
+                "id": event.pk,
+                "name": f"{event.name}!",
+                "participants": [{"id": team.pk} for team in teams],
+            }
+            for event in events
+        ],
+    }
+
+    serializer = TournamentSerializer(**payload)
+    with QueryCounter() as counter:
+        await serializer.save()
+
+    for event in await Event.objects.filter(tournament=tournament):
+        assert event.name.endswith("!")
+        assert len(await event.participants.all()) == 5
+    return counter
+
+
+async def test_nested_save_loads_related_rows_once():
+    for size in (2, 10, 30):
+        async with empty_tables(Event, Team, Tournament):
+            counter = await save_tournament(size)
+
+        selects = [x for x in counter.queries if x.startswith("SELECT")]
+        # 每个模型一次 pk__in 查询，与嵌套条目的数量无关
+        entity_selects = [x for x in selects if '"event_team"' not in x]
+        assert len(entity_selects) == 3, entity_selects
+        # 每个实例读取一次自己的 m2m 中间表行用于比较
+        assert len(selects) - len(entity_selects) == size
@@ -0,0 +1,37 @@
+from tortoise import connections
+
+from apps.main.models import Match
+from apps.main.tests.utils import empty_tables
+from fastapp.paginate.count import with_stable_ordering
+from fastapp.views.viewsets import GenericViewSet
+
+
+class MatchViewSet(GenericViewSet):
+    queryset = Match
+
+
+async def explain(queryset) -> str:
+    """Return the SQLite query plan of ``queryset`` as one string."""
+    _, rows = await connections.get("default").execute_query(
+        f"EXPLAIN QUERY PLAN {queryset.sql()}"
+    )
+    return " | ".join(row["detail"] for row in rows)
+
+
+async def test_get_queryset_keeps_the_ordering():
+    assert MatchViewSet().get_queryset()._orderings == []
+
+    queryset = MatchViewSet(ordering=["-round"]).get_queryset()
+    assert [(f, o.value) for f, o in queryset._orderings] == [("round", "DESC")]
+
+
+async def test_pk_tiebreak_uses_the_index():
+    async with empty_tables(Match):
+        queryset = MatchViewSet(ordering=["round"]).get_queryset()
+        plan = await explain(with_stable_ordering(queryset).offset(20).limit(10))
+        assert "INDEX" in plan and "TEMP B-TREE" not in plan, plan
+
+        # 没有索引的列仍然需要排序，说明上面的检查有效
+        queryset = MatchViewSet(ordering=["name"]).get_queryset()
+        plan = await explain(with_stable_ordering(queryset).offset(20).limit(10))
+        assert "TEMP B-TREE" in plan, plan
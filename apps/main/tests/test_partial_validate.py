@@ -0,0 +1,27 @@
+from pydantic import ValidationError
+
+from apps.main.models import Match
+from fastapp import serializers
+
+
+class MatchSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Match
+        fields = ["id", "name", "round"]
+
+
+def test_partial_validate_ignores_unknown_fields():
+    instance = Match(id=1, name="m", round=1, event_id=1)
+
+    serializer = MatchSerializer.partial_validate(
+        instance, {"round": 2, "password": "x", "event_id": 3}
+    )
+    assert serializer.model_fields_set == {"round"}
+    assert (serializer.name, serializer.round) == ("m", 2)
+
+    try:
+        MatchSerializer.partial_validate(instance, {"round": "bad", "password": "x"})
+    except ValidationError as e:
+        assert [error["loc"] for error in e.errors()] == [("round",)]
+    else:
+        raise AssertionError("invalid round accepted")
@@ -0,0 +1,50 @@
+import asyncio
+import time
+
+from apps.main.tests.utils import empty_tables
+from fastapp.contrib.auth import authenticate_user, get_user_model
+from fastapp.django.hashers import PBKDF2PasswordHasher, make_password
+
+
+async def create_user(username: str, encoded: str):
+    return await get_user_model().objects.create(username=username, password=encoded)
+
+
+async def test_authenticate_upgrades_outdated_hash_unless_told_not_to():
+    User = get_user_model()
+    async with empty_tables(User):
+        outdated = PBKDF2PasswordHasher().encode("secret", "salt", iterations=1000)
+        await create_user("old", outdated)
+
+        # 修改密码时旧密码马上会被替换
+        assert await authenticate_user("old", "secret", rehash=False)
+        assert (await User.objects.get(username="old")).password == outdated
+
+        assert await authenticate_user("old", "secret")
+        upgraded = (await User.objects.get(username="old")).password
+        assert upgraded != outdated
+        assert upgraded.split("$")[1] == str(PBKDF2PasswordHasher.iterations)
+
+
+async def perf_login_storm_keeps_other_requests_fast():
+    User = get_user_model()
+    async with empty_tables(User):
+        await create_user("storm", make_password("secret"))
+
+        async def other_request():
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            return time.perf_counter() - start
+
+        storm = asyncio.gather(
+            *[authenticate_user("storm", "secret") for _ in range(8)]
+        )
+        latencies = []
+        while not storm.done():
+            latencies.append(await other_request())
+        assert all(await storm)
+
+        latencies.sort()
+        p99 = latencies[int(len(latencies) * 0.99)]
+        # 哈希在线程池中运行，一次 PBKDF2 就要几百毫秒，事件循环不能被它阻塞
+        assert p99 < 0.05, f"p99 {p99 * 1000:.1f}ms over {len(latencies)} requests"
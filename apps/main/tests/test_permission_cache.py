@@ -0,0 +1,77 @@
+import asyncio
+import contextlib
+import tempfile
+
+from common.settings import settings
+from fastapp.cache.disk import DiskCacheBackend
+from fastapp.cache.states import backends
+from fastapp.contrib.auth import cache as auth_cache
+from fastapp.contrib.auth.cache import PermissionCache, get_permission_cache
+from fastapp.exceptions import ImproperlyConfigured
+
+ALIAS = "test_permission_cache"
+
+
+@contextlib.contextmanager
+def permission_cache_settings(**overrides):
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    auth_cache._permission_cache = None
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        auth_cache._permission_cache = None
+
+
+@contextlib.contextmanager
+def disk_cache():
+    with tempfile.TemporaryDirectory() as directory:
+        backends[ALIAS] = DiskCacheBackend(directory=directory)
+        try:
+            yield backends[ALIAS]
+        finally:
+            backends.pop(ALIAS)._cache.close()
+
+
+class NonAtomicCache:
+    pass
+
+
+def test_permission_cache_needs_alias():
+    with permission_cache_settings(
+        AUTH_PERMISSION_CACHE_TIMEOUT=60, AUTH_PERMISSION_CACHE_ALIAS=None
+    ):
+        assert get_permission_cache() is None
+
+    backends[ALIAS] = NonAtomicCache()
+    try:
+        with permission_cache_settings(
+            AUTH_PERMISSION_CACHE_TIMEOUT=60, AUTH_PERMISSION_CACHE_ALIAS=ALIAS
+        ):
+            try:
+                get_permission_cache()
+            except ImproperlyConfigured:
+                pass
+            else:
+                raise AssertionError("non-atomic alias accepted")
+    finally:
+        backends.pop(ALIAS)
+
+
+async def test_permission_cache_invalidate_across_workers():
+    with disk_cache():
+        workers = [PermissionCache(alias=ALIAS, sync_interval=0) for _ in range(4)]
+        for worker in workers:
+            worker.set(("User", 1), frozenset({("main", "book", "view")}))
+
+        # 并发的 invalidate 不会丢失递增
+        await asyncio.gather(*(w.invalidate() for w in workers for _ in range(5)))
+        assert await backends[ALIAS].get(PermissionCache.generation_key) == 20
+
+        observer = PermissionCache(alias=ALIAS, sync_interval=0)
+        observer.set(("User", 1), frozenset())
+        assert await observer.get(("User", 1)) is None
+        assert observer.generation == 20
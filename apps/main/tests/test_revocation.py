@@ -0,0 +1,156 @@
+import asyncio
+import contextlib
+import time
+
+from apps.main.tests.test_permission_cache import ALIAS, NonAtomicCache, disk_cache
+from common.settings import settings
+from fastapp.cache.states import backends
+from fastapp.exceptions import ImproperlyConfigured
+from fastapp.security import revocation
+from fastapp.security.revocation import (
+    TokenRevocationList,
+    get_token_revocation_list,
+    is_token_revoked,
+    revoke_token_payload,
+)
+
+
+@contextlib.contextmanager
+def revocation_settings():
+    overrides = {
+        "JWT_REVOCATION_ENABLE": True,
+        "JWT_REVOCATION_CACHE_ALIAS": ALIAS,
+        "JWT_REVOCATION_SYNC_INTERVAL": 0,
+    }
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    revocation._revocation_list = None
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        revocation._revocation_list = None
+
+
+def make_worker(**kwargs):
+    return TokenRevocationList(alias=ALIAS, **{"sync_interval": 0} | kwargs)
+
+
+class BrokenCache:
+    atomic_incr = True
+
+    async def get(self, key, default=None):
+        raise ConnectionError("cache is down")
+
+
+def test_revocation_needs_atomic_incr():
+    backends[ALIAS] = NonAtomicCache()
+    try:
+        with revocation_settings():
+            try:
+                get_token_revocation_list()
+            except ImproperlyConfigured:
+                pass
+            else:
+                raise AssertionError("non-atomic alias accepted")
+    finally:
+        backends.pop(ALIAS)
+
+
+async def test_log_entry_written_after_seq_is_not_skipped():
+    with disk_cache() as cache:
+        writer, reader = make_worker(), make_worker()
+        exp = time.time() + 60
+
+        # 序号已分配但条目还没有写入
+        await cache.add(writer.seq_key, 0, timeout=None)
+        seq = await cache.incr(writer.seq_key)
+        await cache.set(writer.make_key("late"), 1, timeout=60)
+        assert not await reader.is_revoked("late")
+        assert reader.seq == seq and seq in reader.pending
+
+        await cache.set(writer.make_log_key(seq), ("late", exp), timeout=60)
+        assert await reader.is_revoked("late")
+        assert not reader.pending
+
+        # 一直缺失的条目在 pending_timeout 之后放弃
+        await cache.incr(writer.seq_key)
+        reader.pending_timeout = 0
+        await reader.is_revoked("other")
+        await reader.is_revoked("other")
+        assert not reader.pending
+
+
+async def test_new_worker_starts_from_snapshot():
+    with disk_cache() as cache:
+        writer = make_worker()
+        writer.snapshot_interval = 5
+        exp = time.time() + 60
+        for i in range(7):
+            await writer.revoke(f"jti-{i}", exp)
+        await writer.is_revoked("jti-0")
+        assert (await cache.get(writer.snapshot_key))["seq"] == 7
+
+        # 快照之前的日志不再需要
+        for seq in range(1, 8):
+            await cache.delete(writer.make_log_key(seq))
+        await writer.revoke("jti-7", exp)
+
+        reader = make_worker()
+        for i in range(8):
+            assert await reader.is_revoked(f"jti-{i}")
+        assert not await reader.is_revoked("jti-8")
+        assert not reader.pending
+
+
+async def test_full_filters_are_added_and_expired_ones_dropped():
+    with disk_cache():
+        worker = make_worker(capacity=2)
+        now = time.time()
+        await worker.revoke("old-1", now + 1)
+        await worker.revoke("old-2", now + 1)
+        await worker.revoke("new", now + 60)
+        assert await worker.is_revoked("new")
+        assert len(worker.filters) == 2
+
+        worker.filters[0].expires_at = now - 1
+        assert await worker.is_revoked("new")
+        assert len(worker.filters) == 1
+
+
+async def test_revoking_an_access_token_revokes_its_refresh_token():
+    with disk_cache(), revocation_settings():
+        exp = time.time() + 60
+        payload = {"jti": "access", "rti": "refresh", "exp": exp}
+        assert await revoke_token_payload(payload)
+
+        assert await is_token_revoked({"jti": "access"})
+        assert await is_token_revoked({"jti": "refresh"})
+        assert not await is_token_revoked({"jti": "other"})
+
+
+async def test_fresh_worker_waits_for_the_first_sync():
+    with disk_cache():
+        await make_worker().revoke("bad", time.time() + 60)
+
+        reader = make_worker(sync_interval=60)
+        results = await asyncio.gather(*[reader.is_revoked("bad") for _ in range(5)])
+        assert results == [True] * 5
+
+
+async def test_revocation_fails_closed_until_loaded():
+    backends[ALIAS] = BrokenCache()
+    try:
+        worker = make_worker(sync_interval=60)
+        assert await worker.is_revoked("good")
+        assert await worker.is_revoked("good")
+        assert not worker.loaded
+    finally:
+        backends.pop(ALIAS)
+
+    with disk_cache():
+        # 首次加载失败后不受 sync_interval 限制，下一次请求重试
+        assert not await worker.is_revoked("good")
+        assert worker.loaded
@@ -0,0 +1,137 @@
+import contextlib
+import os
+import stat
+import tempfile
+from pathlib import Path
+
+from pydantic import ValidationError, field_validator
+from tortoise.contrib.pydantic.creator import _MODEL_INDEX
+
+from apps.main.models import Event, Team, Tournament
+from common.settings import settings
+from fastapp import filters, serializers
+from fastapp.serializers import schema_cache
+from fastapp.serializers.fields import ListSerializer
+
+
+@contextlib.contextmanager
+def cache_dir(mode: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp) / "schemas"
+        directory.mkdir(mode=mode)
+        directory.chmod(mode)
+        saved = settings.SCHEMA_CACHE_DIR
+        settings.SCHEMA_CACHE_DIR = directory
+        try:
+            yield directory
+        finally:
+            settings.SCHEMA_CACHE_DIR = saved
+            schema_cache._insecure_dirs.discard(directory)
+
+
+def test_schema_cache_only_reads_private_files():
+    with cache_dir(0o700) as directory:
+        schema_cache.create_model("SchemaCachePrivate", name=(str, ...))
+        (path,) = directory.iterdir()
+        assert stat.S_IMODE(path.stat().st_mode) & 0o077 == 0
+        assert schema_cache._read_schema(path) is not None
+
+        path.chmod(0o666)
+        assert schema_cache._read_schema(path) is None
+
+        link = directory / "link.pickle"
+        os.symlink(path, link)
+        assert schema_cache._read_schema(link) is None
+
+
+def test_schema_cache_ignores_shared_directory():
+    with cache_dir(0o777) as directory:
+        assert not schema_cache._check_cache_dir(directory)
+        model = schema_cache.create_model("SchemaCacheShared", name=(str, ...))
+        assert model(name="x").name == "x"
+        assert not list(directory.iterdir())
+
+
+def build_round_trip():
+    class RoundTripTeamSerializer(serializers.ModelSerializer):
+        @field_validator("name")
+        @classmethod
+        def validate_name(cls, v):
+            if v == "bad":
+                raise ValueError("bad name")
+            return v.strip()
+
+        class Meta:
+            model = Team
+            fields = ["id", "name"]
+
+    class RoundTripEventSerializer(serializers.ModelSerializer):
+        participants = ListSerializer(RoundTripTeamSerializer(), allow_primary_key=True)
+
+        class Meta:
+            model = Event
+            fields = ["id", "name", "participants"]
+
+    class RoundTripTournamentSerializer(serializers.ModelSerializer):
+        events = ListSerializer(RoundTripEventSerializer(), writable=True)
+
+        class Meta:
+            model = Tournament
+            fields = ["id", "name", "events"]
+
+    class RoundTripFilterSet(filters.FilterSet):
+        name = filters.CharFilter(field_name="name", lookup_expr="icontains")
+        id = filters.IntegerFilter(field_name="id", many=True)
+
+    return RoundTripTournamentSerializer, RoundTripFilterSet.PydanticModel
+
+
+def round_trip_results(serializer_class, filter_model):
+    valid = {
+        "name": "t",
+        "events": [{"name": "e", "participants": [{"name": " a "}, 3]}],
+    }
+    invalid = {"name": 1, "events": [{"participants": [{"name": "bad"}, "x"]}]}
+
+    results = []
+    for model in (serializer_class, filter_model):
+        results.append(model.model_json_schema())
+        results.append(model.model_json_schema(mode="serialization"))
+    serializer = serializer_class(**valid)
+    results.append(serializer.model_dump())
+    results.append(serializer.model_dump_json())
+    try:
+        serializer_class(**invalid)
+    except ValidationError as e:
+        results.append(e.errors(include_url=False, include_context=False))
+    else:
+        raise AssertionError("invalid payload accepted")
+    results.append(filter_model(name="x", id=["1", 2]).model_dump())
+    return results
+
+
+def test_schema_cache_round_trip_matches_a_cold_build():
+    with cache_dir(0o700) as directory:
+        before = set(_MODEL_INDEX)
+        cold = build_round_trip()
+        assert len(list(directory.iterdir())) == 4
+
+        # 新进程里的 _MODEL_INDEX 为空，模型会重新创建并读取缓存
+        for name in set(_MODEL_INDEX) - before:
+            _MODEL_INDEX.pop(name)
+        completed = []
+        complete_model = schema_cache._complete_model
+        schema_cache._complete_model = lambda model, schema: (
+            completed.append(model),
+            complete_model(model, schema),
+        )
+        try:
+            warm = build_round_trip()
+        finally:
+            schema_cache._complete_model = complete_model
+
+        assert len(completed) == 4
+        assert warm[0] is not cold[0] and warm[1] is not cold[1]
+        results = round_trip_results(*warm)
+        assert results == round_trip_results(*cold)
+        assert results[4]["events"][0]["participants"][0]["name"] == "a"
@@ -0,0 +1,111 @@
+import contextlib
+
+from fastapi import HTTPException
+
+from apps.main.tests.test_permission_cache import ALIAS, NonAtomicCache, disk_cache
+from apps.main.tests.utils import QueryCounter, empty_tables
+from common.settings import settings
+from fastapp.cache.states import backends
+from fastapp.contrib.auth import cache as auth_cache
+from fastapp.contrib.auth import get_user_model
+from fastapp.contrib.auth.cache import get_user_cache
+from fastapp.contrib.auth.utils import (
+    _get_current_user_factory,
+    default_version_checker,
+)
+from fastapp.exceptions import ImproperlyConfigured
+from fastapp.security.jwt import create_token
+
+
+@contextlib.contextmanager
+def user_cache_settings(**overrides):
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    auth_cache._user_cache = None
+    try:
+        yield
+    finally:
+        for k, v in saved.items():
+            setattr(settings, k, v)
+        auth_cache._user_cache = None
+
+
+def assert_improperly_configured(func):
+    try:
+        func()
+    except ImproperlyConfigured:
+        pass
+    else:
+        raise AssertionError("user cache enabled without a deletable alias")
+
+
+def test_user_cache_needs_deletable_alias():
+    assert get_user_cache() is None
+
+    with user_cache_settings(AUTH_USER_CACHE_ENABLE=True, AUTH_USER_CACHE_ALIAS=None):
+        assert_improperly_configured(get_user_cache)
+
+    backends[ALIAS] = NonAtomicCache()
+    try:
+        with user_cache_settings(
+            AUTH_USER_CACHE_ENABLE=True, AUTH_USER_CACHE_ALIAS=ALIAS
+        ):
+            assert_improperly_configured(get_user_cache)
+    finally:
+        backends.pop(ALIAS)
+
+
+async def current_user(token: str):
+    get_current_user = _get_current_user_factory(
+        version_checker=default_version_checker
+    )
+    try:
+        return await get_current_user(token)
+    except HTTPException:
+        return None
+
+
+async def test_saving_user_drops_it_for_every_worker():
+    User = get_user_model()
+    with disk_cache(), user_cache_settings(
+        AUTH_USER_CACHE_ENABLE=True, AUTH_USER_CACHE_ALIAS=ALIAS
+    ):
+        async with empty_tables(User):
+            user = await User.objects.create(username="cached", password="!")
+            token = create_token({"sub": user.username}, version_key=user.password)
+            assert (await current_user(token)).pk == user.pk
+
+            # 另一个 worker 从共享缓存读取，不查询数据库
+            other = auth_cache._user_cache
+            auth_cache._user_cache = None
+            with QueryCounter() as counter:
+                assert (await current_user(token)).pk == user.pk
+            assert counter.count == 0
+
+            auth_cache._user_cache = other
+            user.is_active = False
+            await user.save()
+            assert await current_user(token) is None
+
+            # 新 worker 的本地缓存为空，只能看到共享缓存
+            auth_cache._user_cache = None
+            assert await current_user(token) is None
+
+
+async def perf_user_cache_skips_the_user_query():
+    User = get_user_model()
+    async with empty_tables(User):
+        user = await User.objects.create(username="cached", password="!")
+        token = create_token({"sub": user.username}, version_key=user.password)
+
+        counts = []
+        for enable in (False, True):
+            with disk_cache(), user_cache_settings(
+                AUTH_USER_CACHE_ENABLE=enable, AUTH_USER_CACHE_ALIAS=ALIAS
+            ):
+                with QueryCounter() as counter:
+                    for _ in range(20):
+                        assert (await current_user(token)).pk == user.pk
+                counts.append(counter.count)
+        assert counts == [20, 1], counts
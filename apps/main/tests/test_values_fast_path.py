@@ -0,0 +1,32 @@
+from apps.main.models import Event, Match, Team, Tournament
+from apps.main.tests.test_fetch_plan import (
+    MatchEventNameSerializer,
+    MatchNameSerializer,
+    MatchSerializer,
+    create_matches,
+)
+from apps.main.tests.utils import QueryCounter, empty_tables
+from fastapp.responses import JSONResponse
+
+
+async def test_values_path_renders_the_same_json():
+    async with empty_tables(Match, Event, Team, Tournament):
+        await create_matches()
+
+        for serializer_class in (MatchNameSerializer, MatchEventNameSerializer):
+            queryset = Match.objects.order_by("id")
+            with QueryCounter() as counter:
+                rows = await serializer_class.values_from_queryset(queryset)
+            assert counter.count == 1 and len(rows) == 12
+
+            expected = [
+                x.model_dump() for x in await serializer_class.from_queryset(queryset)
+            ]
+            assert JSONResponse(rows).body == JSONResponse(expected).body
+
+
+async def test_values_path_skips_many_to_many():
+    async with empty_tables(Match, Event, Team, Tournament):
+        with QueryCounter() as counter:
+            assert await MatchSerializer.values_from_queryset(Match.objects.all()) is None
+        assert counter.count == 0
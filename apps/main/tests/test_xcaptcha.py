@@ -0,0 +1,109 @@
+import asyncio
+import contextlib
+
+from aiohttp import web
+
+from common.settings import settings
+from fastapp.contrib.xcaptcha.client import XCaptchaClient
+from fastapp.contrib.xcaptcha.exceptions import CaptchaRequired
+
+
+class FakeAssessmentServer:
+    """A captcha service answering risk assessments with ``self.action``."""
+
+    def __init__(self):
+        self.action = None
+        self.calls = 0
+        self.delay = 0.0
+
+    async def risk_assessment(self, request: web.Request):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+
+        if self.action is None:
+            return web.json_response({"status": "ok", "data": {}})
+        return web.json_response(
+            {"status": "throttled", "data": {"action": self.action}}, status=429
+        )
+
+    @contextlib.asynccontextmanager
+    async def serve(self):
+        app = web.Application()
+        app.router.add_post("/guard/risk_assessment", self.risk_assessment)
+
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            await runner.cleanup()
+
+
+@contextlib.asynccontextmanager
+async def xcaptcha_settings(url):
+    overrides = {
+        "XCAPTCHA_ENABLE": True,
+        "XCAPTCHA_URL": url,
+        "XCAPTCHA_ENCRYPT_KEY": "0123456789abcdef0123456789abcdef",
+        "XCAPTCHA_API_KEY": "test",
+    }
+    saved = {k: getattr(settings, k) for k in overrides}
+    for k, v in overrides.items():
+        setattr(settings, k, v)
+    try:
+        yield
+    finally:
+        await XCaptchaClient.close_shared()
+        for k, v in saved.items():
+            setattr(settings, k, v)
+
+
+def make_limiter(**kwargs):
+    from fastapp.contrib.xcaptcha.depends import IntelligenceLimiter
+
+    return IntelligenceLimiter(**kwargs)
+
+
+async def test_allowed_decisions_are_cached_and_coalesced():
+    server = FakeAssessmentServer()
+    server.delay = 0.05
+    async with server.serve() as url, xcaptcha_settings(url):
+        limiter = make_limiter(decision_ttl=60)
+
+        results = await asyncio.gather(*[limiter._check("ip:0:0") for _ in range(10)])
+        assert results == [None] * 10
+        assert server.calls == 1
+
+        assert await limiter._check("ip:0:0") is None
+        assert server.calls == 1
+
+
+async def test_captcha_decision_is_not_cached():
+    server = FakeAssessmentServer()
+    async with server.serve() as url, xcaptcha_settings(url):
+        limiter = make_limiter(decision_ttl=60)
+
+        server.action = "captcha"
+        assert isinstance(await limiter._check("ip:0:0"), CaptchaRequired)
+
+        # the client solved the captcha, the next request is assessed again
+        server.action = None
+        assert await limiter._check("ip:0:0") is None
+        assert server.calls == 2
+
+
+async def test_unavailable_service_fails_open_then_opens_the_breaker():
+    async with xcaptcha_settings("http://127.0.0.1:9"):
+        limiter = make_limiter(fail_open=True)
+        limiter.breaker.failure_threshold = 2
+
+        for _ in range(3):
+            assert await limiter._check("ip:0:0") is None
+        assert limiter.breaker.state == limiter.breaker.OPEN
+
+        limiter = make_limiter(fail_open=False)
+        assert await limiter._check("ip:0:0") is not None
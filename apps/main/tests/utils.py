@@ -0,0 +1,95 @@
+import contextlib
+import contextvars
+from types import SimpleNamespace
+
+from tortoise import connections
+
+from fastapp.models.tortoise import Tortoise
+
+# 是否已在记录中的查询里，execute_query_dict 等会再调用 execute_query
+_recording = contextvars.ContextVar("recording", default=False)
+
+_schemas_generated = False
+
+
+@contextlib.asynccontextmanager
+async def empty_tables(*models):
+    """
+    Create the tables in the configured database if needed and delete the
+    rows of ``models`` on both ends, children first.
+    """
+    global _schemas_generated
+    if not _schemas_generated:
+        # safe 模式不会给命名索引加 IF NOT EXISTS，只生成一次
+        await Tortoise.generate_schemas(safe=True)
+        _schemas_generated = True
+    for model in models:
+        await model.objects.all().delete()
+    try:
+        yield
+    finally:
+        for model in models:
+            await model.objects.all().delete()
+
+
+def fake_request(**params):
+    return SimpleNamespace(GET=SimpleNamespace(to_dict=lambda: params))
+
+
+def _subclasses(cls):
+    for sub in cls.__subclasses__():
+        yield sub
+        yield from _subclasses(sub)
+
+
+class QueryCounter:
+    """
+    Record the SQL run on the default connection inside the block, in
+    transactions too: the client classes are patched, not the instance.
+    """
+
+    methods = ("execute_query", "execute_query_dict", "execute_insert", "execute_many")
+
+    def __init__(self, connection: str = "default"):
+        self.connection = connection
+        self.queries = []
+        self.patched = []
+
+    def __enter__(self):
+        client_class = type(connections.get(self.connection))
+        for name in self.methods:
+            owner = next(c for c in client_class.__mro__ if name in c.__dict__)
+            for cls in [owner, *_subclasses(owner)]:
+                if name in cls.__dict__:
+                    self._patch(cls, name)
+        return self
+
+    def _patch(self, cls, name):
+        original = cls.__dict__[name]
+
+        async def execute(conn, sql, *args, **kwargs):
+            if _recording.get():
+                return await original(conn, sql, *args, **kwargs)
+
+            self.queries.append(sql)
+            token = _recording.set(True)
+            try:
+                return await original(conn, sql, *args, **kwargs)
+            finally:
+                _recording.reset(token)
+
+        setattr(cls, name, execute)
+        self.patched.append((cls, name, original))
+
+    def __exit__(self, *exc):
+        for cls, name, original in self.patched:
+            setattr(cls, name, original)
+        self.patched.clear()
+
+    @property
+    def count(self) -> int:
+        return len(self.queries)
+
+    def count_of(self, statement: str) -> int:
+        """Count the queries starting with ``statement``, e.g. ``'DELETE FROM "t"'``."""
+        return sum(1 for x in self.queries if x.lstrip().startswith(statement))
@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     INSTALLED_APPS: List[str] = [
         "fastapp.contrib.contenttypes",
         "fastapp.contrib.auth",
+        "fastapp.contrib.guardian",
+        "fastapp.contrib.dynamic_rbac",
+        "fastapp.contrib.key_auth",
         "apps.main",
         "apps.fake",
     ]
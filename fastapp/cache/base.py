@@ -53,6 +53,9 @@ class BaseCache:
 
     _missing_key = object()
 
+    # incr() 是否原子，默认实现是 get 后再 set，并发时会丢失更新
+    atomic_incr = False
+
     def __init__(self, params):
         timeout = params.get("timeout", params.get("TIMEOUT", 300))
         if timeout is not None:
@@ -10,6 +10,9 @@ from fastapp.utils.functional import cached_property
 class DiskCacheBackend(BaseCache):
     """DiskCache is a simple in-memory cache implementation."""
 
+    # diskcache 在一个事务中完成 incr
+    atomic_incr = True
+
     def __init__(self, directory=None, timeout=60, disk=diskcache.Disk, params={}):
         super().__init__(params)
 
@@ -0,0 +1,66 @@
+"In-process LRU cache with per-entry expiry."
+
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """A small, synchronous LRU cache bounded by size, with optional TTL.
+
+    It lives in the memory of a single worker and is meant as a first level in
+    front of a shared cache or the database. Entries are evicted in least
+    recently used order once ``maxsize`` is reached, and are dropped on access
+    after their expiry time.
+    """
+
+    _missing = object()
+
+    def __init__(self, maxsize: int = 1024, timeout: Optional[float] = None):
+        self.maxsize = maxsize
+        self.timeout = timeout
+        self._data: "OrderedDict[Hashable, tuple[Optional[float], Any]]" = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def __contains__(self, key):
+        return self.get(key, self._missing) is not self._missing
+
+    def get(self, key: Hashable, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+
+        expires_at, value = item
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(
+        self,
+        key: Hashable,
+        value: Any,
+        timeout: Optional[float] = None,
+        expires_at: Optional[float] = None,
+    ):
+        """Store a value. ``expires_at`` is a ``time.monotonic()`` deadline and
+        takes precedence over ``timeout``, which defaults to the cache timeout."""
+        if expires_at is None:
+            timeout = self.timeout if timeout is None else timeout
+            expires_at = None if timeout is None else time.monotonic() + timeout
+
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def delete(self, key: Hashable):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
@@ -72,7 +72,7 @@ async def async_migrate(safe, guided, apps, models):
         return
 
     if content_type_app_enabled:
-        from fastapp.contrib.contenttypes.models import ContentType
+        from fastapp.contrib.contenttypes.models import ContentType, content_types
 
     if auth_app_enabled:
         from fastapp.contrib.auth.models import DefaultPerms, Permission
@@ -81,6 +81,8 @@ async def async_migrate(safe, guided, apps, models):
 
     if content_type_app_enabled:
         # TODO 如果新建模型，不能自动添加content_type
+        await content_types.load(create_missing=True)
+
         existed_perms = {(x.content_type_id, x.perm): x for x in await Permission.all()}
         for x in sorted(
             chain.from_iterable(
@@ -88,9 +90,7 @@ async def async_migrate(safe, guided, apps, models):
             ),
             key=lambda x: x._meta.app_config.label,
         ):
-            content_type, _ = await ContentType.get_or_create(
-                app_label=x._meta.app_config.label, model=x.__name__
-            )
+            content_type = await ContentType.from_model(x)
 
             user_define_perms = getattr(x.Meta, "permissions", [])
 
@@ -1,13 +1,73 @@
-from typing import Iterable, Optional, Type, Union
+from typing import FrozenSet, Iterable, Optional, Tuple, Type, Union
 
 from fastapp import models
 from fastapp.contrib.auth.backends.base import BasePermissionBackend, PrincipalProtocol
-from fastapp.contrib.auth.models import AbstractUser, Permission
-from fastapp.contrib.contenttypes.models import ContentType
-from fastapp.models import Count
+from fastapp.contrib.auth.cache import get_permission_cache
+from fastapp.contrib.auth.models import AbstractUser, Group, Permission
 
 
 class ModelPermissionBackend(BasePermissionBackend):
+    """
+    Permission backend based on the ``Permission`` model.
+
+    The effective permissions of a principal (direct and through groups) are
+    loaded with a single query, kept on the principal for the rest of the
+    request and, when configured, in the permission cache across requests,
+    so each check is a set lookup.
+    """
+
+    @staticmethod
+    def _model_key(
+        obj: Union[models.Model, Type[models.Model], models.QuerySet],
+    ) -> Tuple[str, str]:
+        if isinstance(obj, models.QuerySet):
+            obj = obj.model
+        elif isinstance(obj, models.Model):
+            obj = obj.__class__
+
+        return obj._meta.app, obj.__name__
+
+    @classmethod
+    async def _load_permissions(
+        cls, principal: PrincipalProtocol
+    ) -> FrozenSet[Tuple[str, str, str]]:
+        fields = ("content_type__app_label", "content_type__model", "perm")
+
+        if isinstance(principal, AbstractUser):
+            perm_qs = Permission.objects.filter(
+                models.Q(user_set=principal.pk)
+                | models.Q(group_set__user_set=principal.pk)
+            ).distinct()
+        elif isinstance(principal, Group):
+            perm_qs = Permission.objects.filter(group_set=principal.pk)
+        else:
+            perm_qs = principal.permissions.all()
+
+        return frozenset(await perm_qs.values_list(*fields))
+
+    @classmethod
+    async def get_all_permissions(
+        cls, principal: PrincipalProtocol
+    ) -> FrozenSet[Tuple[str, str, str]]:
+        """Return the ``(app_label, model, perm)`` tuples held by the principal."""
+        perms = getattr(principal, "_perm_cache", None)
+        if perms is not None:
+            return perms
+
+        permission_cache = get_permission_cache()
+        key = (principal.__class__.__name__, principal.pk)
+
+        if permission_cache is not None:
+            perms = await permission_cache.get(key)
+
+        if perms is None:
+            perms = await cls._load_permissions(principal)
+            if permission_cache is not None:
+                permission_cache.set(key, perms)
+
+        principal._perm_cache = perms
+        return perms
+
     @classmethod
     async def has_perm(
         cls,
@@ -15,34 +75,12 @@ class ModelPermissionBackend(BasePermissionBackend):
         perm: str,
         obj: Optional[Union[models.Model, Type[models.Model]]] = None,
     ) -> bool:
-        perm_qs = principal.permissions.filter(perm=perm)
-
-        if obj is not None:
-            if isinstance(obj, models.Model):
-                obj = obj.__class__
+        perms = await cls.get_all_permissions(principal)
 
-            if isinstance(obj, models.QuerySet):
-                obj = obj.model
+        if obj is None:
+            return any(p[2] == perm for p in perms)
 
-            perm_qs = perm_qs.filter(
-                content_type__app_label=obj._meta.app, content_type__model=obj.__name__
-            )
-
-        group_perm_qs = None
-        if isinstance(principal, AbstractUser):
-            group_perm_qs = Permission.objects.filter(
-                group_set__in=await principal.groups.all(), perm=perm
-            )
-            if obj is not None:
-                group_perm_qs = group_perm_qs.filter(
-                    content_type__app_label=obj._meta.app,
-                    content_type__model=obj.__name__,
-                )
-
-        if group_perm_qs is None:
-            return await perm_qs.exists()
-
-        return await perm_qs.exists() or await group_perm_qs.exists()
+        return (*cls._model_key(obj), perm) in perms
 
     @classmethod
     async def has_perms(
@@ -54,52 +92,18 @@ class ModelPermissionBackend(BasePermissionBackend):
         if not isinstance(perm_list, Iterable) or isinstance(perm_list, str):
             raise ValueError("perm_list must be an iterable of permissions.")
 
-        ctype = await ContentType.from_model(obj)
-        if isinstance(principal, AbstractUser):
-            return (
-                await principal.permissions.filter(
-                    content_type=ctype,
-                    permission__perm__in=perm_list,
-                )
-                .annotate(perms_count=Count("permission", distinct=True))
-                .filter(perms_count=len(perm_list))
-                .exists()
-            ) or (
-                await Permission.objects.filter(
-                    group_set__in=principal.groups.all(),
-                    content_type=ctype,
-                    permission__perm__in=perm_list,
-                )
-                .annotate(perms_count=Count("permission", distinct=True))
-                .filter(perms_count=len(perm_list))
-                .exists()
-            )
+        perms = await cls.get_all_permissions(principal)
 
-        else:
-            return (
-                await principal.permissions.filter(
-                    content_type=ctype,
-                    permission__perm__in=perm_list,
-                )
-                .annotate(perms_count=Count("permission", distinct=True))
-                .filter(perms_count=len(perm_list))
-                .exists()
-            )
+        if obj is None:
+            held = {p[2] for p in perms}
+            return all(perm in held for perm in perm_list)
+
+        app_label, model = cls._model_key(obj)
+        return all((app_label, model, perm) in perms for perm in perm_list)
 
     @classmethod
     async def has_module_perms(
         cls, principal: PrincipalProtocol, app_label: str
     ) -> bool:
-        if isinstance(principal, AbstractUser):
-            perm_qs = principal.permissions.filter(content_type__app_label=app_label)
-
-            group_perm_qs = Permission.objects.filter(
-                group_set=principal.groups.all()
-            ).filter(content_type__app_label=app_label)
-
-            return await perm_qs.exists() or await group_perm_qs.exists()
-
-        else:
-            perm_qs = principal.permissions.filter(content_type__app_label=app_label)
-
-            return await perm_qs.exists()
+        perms = await cls.get_all_permissions(principal)
+        return any(p[0] == app_label for p in perms)
@@ -0,0 +1,261 @@
+import logging
+import time
+from typing import TYPE_CHECKING, FrozenSet, Hashable, Optional, Tuple, Type
+
+from fastapp.cache import caches
+from fastapp.cache.local import LRUCache
+from fastapp.conf import settings
+from fastapp.exceptions import ImproperlyConfigured
+from fastapp.patchs.tortoise.relations import connect_m2m_changed
+
+if TYPE_CHECKING:
+    from fastapp.contrib.auth.typing import UserProtocol
+
+logger = logging.getLogger("qingkong.error")
+
+
+class UserCache:
+    """
+    Cache of authenticated users in front of the database.
+
+    Entries are keyed by the token subject (the username) and remember the
+    token version they were validated with, so a token issued for another
+    password never reuses them. A small in-process LRU sits in front of the
+    ``CACHES`` alias; saving or deleting the user invalidates both levels in
+    the current worker, other workers' LRU entries expire after
+    ``local_timeout`` seconds.
+    """
+
+    key_prefix = "fastapp:auth:user"
+
+    def __init__(
+        self,
+        alias: Optional[str] = None,
+        timeout: int = 300,
+        local_maxsize: int = 1024,
+        local_timeout: float = 5,
+    ):
+        self.alias = alias
+        self.timeout = timeout
+        self.local = LRUCache(local_maxsize, min(local_timeout, timeout))
+
+    def make_key(self, username: str) -> str:
+        return f"{self.key_prefix}:{username}"
+
+    def make_id_key(self, pk) -> str:
+        return f"{self.key_prefix}:id:{pk}"
+
+    async def _shared_get(self, key):
+        try:
+            return await caches[self.alias].get(key)
+        except Exception as e:
+            logger.warning(f"User cache get failed: {e!r}")
+            return None
+
+    async def _shared_set(self, key, value):
+        try:
+            await caches[self.alias].set(key, value, timeout=self.timeout)
+        except Exception as e:
+            logger.warning(f"User cache set failed: {e!r}")
+
+    async def get(
+        self, user_model: Type["UserProtocol"], username: str, version: Optional[str]
+    ) -> Optional["UserProtocol"]:
+        key = self.make_key(username)
+
+        entry = self.local.get(key)
+        if entry is None and self.alias:
+            entry = await self._shared_get(key)
+            if entry is not None:
+                self.local.set(key, entry)
+
+        if entry is None or entry["ver"] != version:
+            return None
+
+        return user_model._init_from_db(**entry["row"])
+
+    async def set(self, username: str, version: Optional[str], user: "UserProtocol"):
+        meta = user._meta
+        entry = {
+            "ver": version,
+            "row": {
+                column: getattr(user, field)
+                for field, column in meta.fields_db_projection.items()
+            },
+        }
+
+        key, id_key = self.make_key(username), self.make_id_key(user.pk)
+        self.local.set(key, entry)
+        self.local.set(id_key, username)
+        if self.alias:
+            await self._shared_set(key, entry)
+            await self._shared_set(id_key, username)
+
+    async def invalidate(self, user: "UserProtocol"):
+        id_key = self.make_id_key(user.pk)
+
+        usernames = {user.username, self.local.get(id_key)}
+        if self.alias:
+            usernames.add(await self._shared_get(id_key))
+
+        keys = [self.make_key(x) for x in usernames if x is not None] + [id_key]
+        for key in keys:
+            self.local.delete(key)
+
+        if self.alias:
+            try:
+                await caches[self.alias].delete_many(keys)
+            except Exception as e:
+                logger.warning(f"User cache delete failed: {e!r}")
+
+
+_user_cache: Optional[UserCache] = None
+
+
+def get_user_cache() -> Optional[UserCache]:
+    """
+    Return the user cache configured in settings, or None when disabled.
+
+    Saving a user deletes its entry from ``AUTH_USER_CACHE_ALIAS``. Without an
+    alias that supports delete, a deactivated user would keep access until the
+    entry expires, so the cache is not enabled without one.
+    """
+    global _user_cache
+
+    if not settings.AUTH_USER_CACHE_ENABLE:
+        return None
+
+    if _user_cache is None:
+        alias = settings.AUTH_USER_CACHE_ALIAS
+        if not alias:
+            raise ImproperlyConfigured(
+                "AUTH_USER_CACHE_ENABLE requires AUTH_USER_CACHE_ALIAS"
+            )
+        if not hasattr(caches[alias], "delete_many"):
+            raise ImproperlyConfigured(
+                f"AUTH_USER_CACHE_ALIAS {alias!r} does not support delete"
+            )
+        _user_cache = UserCache(
+            alias=alias,
+            timeout=settings.AUTH_USER_CACHE_TIMEOUT,
+            local_maxsize=settings.AUTH_USER_CACHE_LOCAL_MAXSIZE,
+            local_timeout=settings.AUTH_USER_CACHE_LOCAL_TIMEOUT,
+        )
+    return _user_cache
+
+
+async def invalidate_cached_user(user: "UserProtocol"):
+    if (user_cache := get_user_cache()) is not None:
+        await user_cache.invalidate(user)
+
+
+class PermissionCache:
+    """
+    Cache of effective permissions, as ``(app_label, model, perm)`` tuples.
+
+    Any change to permissions, groups or memberships bumps a generation
+    counter kept in the ``alias`` cache and drops every entry; workers pick
+    up bumps from other workers within ``sync_interval`` seconds. The alias
+    cache must increment atomically, or concurrent bumps can be lost.
+    """
+
+    generation_key = "fastapp:auth:perm_generation"
+
+    def __init__(
+        self,
+        alias: Optional[str] = None,
+        timeout: float = 60,
+        maxsize: int = 4096,
+        sync_interval: float = 1,
+    ):
+        self.alias = alias
+        self.sync_interval = sync_interval
+        self.local = LRUCache(maxsize, timeout)
+
+        self.generation = 0
+        self.synced_at = 0.0
+
+    async def _sync(self):
+        now = time.monotonic()
+        if not self.alias or now - self.synced_at < self.sync_interval:
+            return
+
+        self.synced_at = now
+        try:
+            generation = await caches[self.alias].get(self.generation_key, 0)
+        except Exception as e:
+            logger.warning(f"Permission cache sync failed: {e!r}")
+            return
+
+        if generation != self.generation:
+            self.generation = generation
+            self.local.clear()
+
+    async def get(self, key: Hashable) -> Optional[FrozenSet[Tuple[str, str, str]]]:
+        await self._sync()
+        return self.local.get(key)
+
+    def set(self, key: Hashable, perms: FrozenSet[Tuple[str, str, str]]):
+        self.local.set(key, perms)
+
+    async def invalidate(self):
+        self.local.clear()
+        if not self.alias:
+            return
+
+        try:
+            cache = caches[self.alias]
+            await cache.add(self.generation_key, 0, timeout=None)
+            self.generation = await cache.incr(self.generation_key)
+        except Exception as e:
+            logger.warning(f"Permission cache invalidate failed: {e!r}")
+
+
+_permission_cache: Optional[PermissionCache] = None
+
+
+def get_permission_cache() -> Optional[PermissionCache]:
+    """
+    Return the cross-request permission cache, or None when disabled.
+
+    Without ``AUTH_PERMISSION_CACHE_ALIAS`` a change could only be dropped in
+    the worker that made it, so permissions are not cached across requests.
+    """
+    global _permission_cache
+
+    alias = settings.AUTH_PERMISSION_CACHE_ALIAS
+    if settings.AUTH_PERMISSION_CACHE_TIMEOUT <= 0 or not alias:
+        return None
+
+    if _permission_cache is None:
+        if not getattr(caches[alias], "atomic_incr", False):
+            raise ImproperlyConfigured(
+                f"AUTH_PERMISSION_CACHE_ALIAS {alias!r} does not increment "
+                "atomically"
+            )
+        _permission_cache = PermissionCache(
+            alias=alias,
+            timeout=settings.AUTH_PERMISSION_CACHE_TIMEOUT,
+            maxsize=settings.AUTH_PERMISSION_CACHE_MAXSIZE,
+        )
+    return _permission_cache
+
+
+async def invalidate_permission_cache():
+    if (permission_cache := get_permission_cache()) is not None:
+        await permission_cache.invalidate()
+
+
+@connect_m2m_changed
+async def _permission_m2m_changed(relation, action):
+    through_tables = {
+        f"{settings.INTERNAL_APP_PREFIX}_auth_group_permissions",
+        f"{settings.INTERNAL_APP_PREFIX}_auth_user_groups",
+        f"{settings.INTERNAL_APP_PREFIX}_auth_user_permissions",
+    }
+    if relation.field.through not in through_tables:
+        return
+
+    # drop the per-request copy held by the changed instance as well
+    relation.instance.__dict__.pop("_perm_cache", None)
+    await invalidate_permission_cache()
@@ -64,7 +64,15 @@ class ReadonlyOrSuperUserMixin(AccessMixin):
     """Verify that the current user is administrator."""
 
     async def dispatch(self, request, *args, **kwargs):
-        if self.action in {"create", "update", "destroy"} and (
+        if self.action in {
+            "create",
+            "update",
+            "partial_update",
+            "destroy",
+            "bulk_create",
+            "bulk_update",
+            "bulk_destroy",
+        } and (
             request.user is None
             or not request.user.is_authenticated
             or not request.user.is_superuser
@@ -5,9 +5,13 @@ from tortoise.queryset import MODEL
 from common.settings import settings
 from fastapp import models
 from fastapp.contrib.auth.backends.base import BasePermissionBackend
+from fastapp.contrib.auth.cache import (
+    invalidate_cached_user,
+    invalidate_permission_cache,
+)
 from fastapp.contrib.auth.utils import ANONYMOUS_USERNAME
 from fastapp.contrib.contenttypes.models import ContentType
-from fastapp.django.hashers import make_password
+from fastapp.django.hashers import amake_password, make_password
 from fastapp.models import Manager, QuerySet
 from fastapp.utils.module_loading import import_string
 
@@ -55,6 +59,14 @@ class Permission(models.Model):
     def __str__(self):
         return "%s | %s" % (self.content_type, self.perm)
 
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        await invalidate_permission_cache()
+
+    async def delete(self, *args, **kwargs):
+        await super().delete(*args, **kwargs)
+        await invalidate_permission_cache()
+
 
 class LoadPermissionBackendMixin:
     permission_backend: Optional[Type["BasePermissionBackend"]] = None
@@ -102,6 +114,10 @@ class Group(models.Model, LoadPermissionBackendMixin):
     def __str__(self):
         return self.name
 
+    async def delete(self, *args, **kwargs):
+        await super().delete(*args, **kwargs)
+        await invalidate_permission_cache()
+
     async def has_perm(
         self,
         perm: str,
@@ -125,7 +141,7 @@ class UserManager(Manager[MODEL]):
         return await self._model.create(
             username=username,
             email=email,
-            password=make_password(password),
+            password=await amake_password(password),
             **extra_fields,
         )
 
@@ -194,7 +210,7 @@ class AbstractUser(models.Model, LoadPermissionBackendMixin):
         perm_list: Iterable[str],
         obj: Optional[Union[models.Model, Type[models.Model]]] = None,
     ):
-        return await self.get_permission_backend().has_perms(self, perm_list)
+        return await self.get_permission_backend().has_perms(self, perm_list, obj)
 
     async def has_module_perms(self, app_label: str) -> bool:
         """
@@ -210,6 +226,18 @@ class AbstractUser(models.Model, LoadPermissionBackendMixin):
     def set_password(self, password):
         self.password = make_password(password)
 
+    async def aset_password(self, password):
+        """Same as set_password(), hashing in the password hashing pool."""
+        self.password = await amake_password(password)
+
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        await invalidate_cached_user(self)
+
+    async def delete(self, *args, **kwargs):
+        await super().delete(*args, **kwargs)
+        await invalidate_cached_user(self)
+
     class Meta:
         abstract = True
         manager = UserManager()
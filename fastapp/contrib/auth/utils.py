@@ -1,17 +1,22 @@
-import base64
-import hashlib
-from typing import Annotated, Awaitable, Callable, Optional, Type
+import inspect
+from typing import Annotated, Awaitable, Callable, Optional, Type, Union
 
 import jwt
 from fastapi import Depends, HTTPException, status
 from jwt.exceptions import InvalidTokenError
 
 from fastapp.conf import settings
+from fastapp.contrib.auth.cache import get_user_cache
 from fastapp.contrib.auth.typing import TokenTypeEnum, UserProtocol
-from fastapp.django.hashers import check_password
+from fastapp.django.hashers import amake_password, averify_password, check_password
 from fastapp.exceptions import ImproperlyConfigured
 from fastapp.models import Q
-from fastapp.security.jwt import ALGORITHM, global_bearer_token_header
+from fastapp.security.jwt import (
+    decode_token,
+    global_bearer_token_header,
+    make_token_version,
+)
+from fastapp.security.revocation import is_token_revoked
 from fastapp.utils.module_loading import import_string
 
 ANONYMOUS_USERNAME = "anonymous"
@@ -66,17 +71,44 @@ def verify_password(plain_password, hashed_password):
     )
 
 
+async def rehash_password(user: UserProtocol, password: str):
+    """Re-encode the password with the preferred hasher and persist it."""
+    user.password = await amake_password(password)
+    await user.save(update_fields=["password"])
+
+
 async def authenticate_user(
     username: str,
     password: str,
     user_getter: Callable[[str], Awaitable[Optional["UserProtocol"]]] = get_user,
-    verifier: Callable[[str, str], bool] = verify_password,
+    verifier: Optional[Callable[[str, str], Union[bool, Awaitable[bool]]]] = None,
+    rehash: bool = True,
 ) -> Optional[UserProtocol]:
+    """
+    Return the user if the password is correct, otherwise None.
+
+    Hashing runs in the password hashing pool. If the stored hash uses an
+    outdated hasher and ``rehash`` is true, it is upgraded before returning.
+    Note that upgrading changes the hash, which invalidates tokens versioned
+    by it.
+    """
     user = await user_getter(username)
     if not user:
         return None
-    if not verifier(password, user.password):
+
+    if verifier is not None:
+        is_correct = verifier(password, user.password)
+        if inspect.isawaitable(is_correct):
+            is_correct = await is_correct
+        return user if is_correct else None
+
+    is_correct, must_update = await averify_password(password, user.password)
+    if not is_correct:
         return None
+
+    if must_update and rehash:
+        await rehash_password(user, password)
+
     return user
 
 
@@ -96,9 +128,7 @@ def _get_current_user_factory(
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload: dict[str, str] = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-            )
+            payload: dict[str, str] = decode_token(token)
             if token_type is not None and payload.get("typ") != token_type.value:
                 raise credentials_exception
 
@@ -106,13 +136,28 @@ def _get_current_user_factory(
             if username is None:
                 raise credentials_exception
 
-            user = await get_user(username=username)
+            if await is_token_revoked(payload):
+                raise credentials_exception
+
+            user_cache = get_user_cache()
+            user = None
+            if user_cache is not None:
+                user = await user_cache.get(
+                    get_user_model(), username, payload.get("ver")
+                )
+            cache_hit = user is not None
+
+            if not cache_hit:
+                user = await get_user(username=username)
             if user is None or user.is_active is False:
                 raise credentials_exception
 
             if version_checker:
                 if not version_checker(user, payload.get("ver")):
                     raise credentials_exception
+
+            if user_cache is not None and not cache_hit:
+                await user_cache.set(username, payload.get("ver"), user)
         except (InvalidTokenError, HTTPException) as e:
             if raise_exception:
                 raise credentials_exception from e
@@ -147,12 +192,7 @@ def get_current_user_factory(
 
 
 def default_version_checker(user: UserProtocol, ver: str):
-    return (
-        base64.b85encode(hashlib.blake2s(user.password.encode()).digest()).decode(
-            "utf-8"
-        )
-        == ver
-    )
+    return make_token_version(user.password) == ver
 
 
 def is_superuser(
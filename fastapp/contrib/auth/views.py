@@ -1,7 +1,8 @@
+import secrets
 from datetime import timedelta
-from typing import Optional
+from typing import Annotated, Optional
 
-from fastapi import Request, Response
+from fastapi import Depends, Request, Response
 from pydantic import BaseModel, field_validator
 from starlette import status
 
@@ -24,12 +25,16 @@ from fastapp.contrib.auth.utils import (
     TokenTypeEnum,
     get_user_model,
 )
-from fastapp.django.hashers import make_password
 from fastapp.exceptions import HTTPException
 from fastapp.filters import FilterBackend
 from fastapp.responses import JSONResponse
 from fastapp.router import APIRouter
-from fastapp.security.jwt import create_token
+from fastapp.security.jwt import (
+    create_token,
+    decode_token,
+    global_bearer_token_header,
+    revoke_token,
+)
 from fastapp.utils import timezone
 from fastapp.views import viewsets
 from fastapp.views.decorators import action
@@ -67,18 +72,22 @@ async def token_obtain(req: TokenObtainReq):
     Raises:
         HTTPException: If the provided login credentials are invalid.
     """
+    # NOTE: tokens are versioned by the password hash, so an outdated hash is
+    # upgraded before issuing them rather than in a background task.
     user = await authenticate_user(req.username, req.password)
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid login credentials")
 
+    # 访问令牌记下刷新令牌的 jti，登出时一并吊销
+    refresh_jti = secrets.token_urlsafe(16)
     access_token = create_token(
-        {"typ": TokenTypeEnum.ACCESS.value, "sub": user.username},
+        {"typ": TokenTypeEnum.ACCESS.value, "sub": user.username, "rti": refresh_jti},
         timedelta(seconds=settings.ACCESS_TOKEN_LIFETIME),
         version_key=user.password,
     )
     refresh_token = create_token(
-        {"typ": TokenTypeEnum.REFRESH.value, "sub": user.username},
+        {"typ": TokenTypeEnum.REFRESH.value, "sub": user.username, "jti": refresh_jti},
         timedelta(seconds=settings.REFRESH_TOKEN_LIFETIME),
         version_key=user.password,
     )
@@ -92,12 +101,16 @@ async def token_obtain(req: TokenObtainReq):
 
 
 @token_router.post("/token/refresh/")
-async def token_refresh(user: RefreshTokenUser):
+async def token_refresh(
+    user: RefreshTokenUser,
+    token: Annotated[Optional[str], Depends(global_bearer_token_header)],
+):
     """
     Refresh the access token for a user.
 
     Args:
         user (RefreshTokenUser): A user object containing the necessary information to refresh the token.
+        token (Optional[str]): The refresh token of the request.
 
     Returns:
         dict: A dictionary containing the new access token.
@@ -109,7 +122,11 @@ async def token_refresh(user: RefreshTokenUser):
         raise HTTPException(status_code=401, detail="Invalid login credentials")
 
     access_token = create_token(
-        {"typ": TokenTypeEnum.ACCESS.value, "sub": user.username},
+        {
+            "typ": TokenTypeEnum.ACCESS.value,
+            "sub": user.username,
+            "rti": decode_token(token).get("jti"),
+        },
         timedelta(seconds=settings.ACCESS_TOKEN_LIFETIME),
         version_key=user.password,
     )
@@ -208,7 +225,8 @@ async def change_password(user: CurrentUser, req: PasswordUpdate):
         HTTPException: If the provided old password is invalid.
         ValueError: If the new password contains the username.
     """
-    user = await authenticate_user(user.username, req.old_password)
+    # 密码马上会被替换，不需要升级旧的哈希
+    user = await authenticate_user(user.username, req.old_password, rehash=False)
 
     if not user:
         raise HTTPException(status_code=401, detail="Invalid login credentials")
@@ -216,21 +234,29 @@ async def change_password(user: CurrentUser, req: PasswordUpdate):
     if user.username in req.new_password:
         raise ValueError("Password cannot contain the username")
 
-    user.password = make_password(req.new_password)
+    await user.aset_password(req.new_password)
     await user.save()
 
     return {"message": "Password updated successfully"}
 
 
 @token_router.post("/logout/")
-async def logout(user: CurrentUser, request: Request, response: Response):
+async def logout(
+    user: CurrentUser,
+    request: Request,
+    response: Response,
+    token: Annotated[Optional[str], Depends(global_bearer_token_header)],
+):
     """
-    Log out the current user by deleting all cookies from the response.
+    Log out the current user by deleting all cookies from the response and,
+    when JWT revocation is enabled, revoking the access token and the refresh
+    token it was issued with.
 
     Args:
         user (CurrentUser): The current authenticated user.
         request (Request): The incoming request object.
         response (Response): The outgoing response object.
+        token (Optional[str]): The bearer token of the request.
 
     Returns:
         dict: A dictionary containing a success message.
@@ -240,6 +266,9 @@ async def logout(user: CurrentUser, request: Request, response: Response):
     for key in cookies.keys():
         response.delete_cookie(key=key)
 
+    if token:
+        await revoke_token(token)
+
     return {"message": "Logout successfully"}
 
 
@@ -271,7 +300,7 @@ class AdminUserViewSet(SuperUserRequiredMixin, viewsets.ModelViewSet):
         data = await request.json()
         serializer = self.change_password_serializer_class.model_validate(data)
 
-        user.set_password(serializer.new_password)
+        await user.aset_password(serializer.new_password)
         await user.save()
 
         return JSONResponse(
@@ -286,7 +315,7 @@ class AdminUserViewSet(SuperUserRequiredMixin, viewsets.ModelViewSet):
             raise ValueError("This email has already been registered")
 
         user = await super().perform_create(serializer)
-        user.set_password(serializer.password)
+        await user.aset_password(serializer.password)
         await user.save()
 
         return user
@@ -1,4 +1,5 @@
-from typing import Self, Type
+from itertools import chain
+from typing import Dict, Optional, Self, Tuple, Type
 
 from common.settings import settings
 from fastapp import models
@@ -16,14 +17,26 @@ class ContentType(models.Model):
 
     @classmethod
     async def from_model(cls, model: models.Model | Type[models.Model]) -> Self:
-        if isinstance(model, type):
-            return await cls.objects.get(
-                app_label=model._meta.app_config.label, model=model.__name__
-            )
+        if not isinstance(model, type):
+            model = model.__class__
+
+        if (ctype := content_types.get_for_model(model)) is not None:
+            return ctype
 
-        return await cls.objects.get(
-            app_label=model._meta.app_config.label, model=model.__class__.__name__
+        ctype = await cls.objects.get(
+            app_label=model._meta.app_config.label, model=model.__name__
         )
+        content_types.register(ctype)
+        return ctype
+
+    @classmethod
+    async def from_id(cls, pk: int) -> Self:
+        if (ctype := content_types.get_for_id(pk)) is not None:
+            return ctype
+
+        ctype = await cls.objects.get(id=pk)
+        content_types.register(ctype)
+        return ctype
 
     @classmethod
     def from_model_as_q(
@@ -52,3 +65,69 @@ class ContentType(models.Model):
 
     def __str__(self):
         return f"{self.app_label}.{self.model}"
+
+
+class ContentTypeRegistry:
+    """
+    In-process registry of content types, keyed by model class and by id.
+
+    ``load()`` reads every row once at startup, afterwards lookups never hit
+    the database; models not loaded are looked up once on first use.
+    ``migrate`` loads with ``create_missing`` to create the rows missing for
+    installed models in bulk.
+    """
+
+    def __init__(self):
+        self._by_key: Dict[Tuple[str, str], ContentType] = {}
+        self._by_model: Dict[Type[models.Model], ContentType] = {}
+        self._by_id: Dict[int, ContentType] = {}
+
+    def register(self, ctype: ContentType):
+        self._by_key[(ctype.app_label, ctype.model)] = ctype
+        self._by_id[ctype.id] = ctype
+
+    def get_for_model(self, model: Type[models.Model]) -> Optional[ContentType]:
+        if (ctype := self._by_model.get(model)) is not None:
+            return ctype
+
+        ctype = self._by_key.get((model._meta.app_config.label, model.__name__))
+        if ctype is not None:
+            self._by_model[model] = ctype
+        return ctype
+
+    def get_for_id(self, pk: int) -> Optional[ContentType]:
+        return self._by_id.get(pk)
+
+    def clear(self):
+        self._by_key.clear()
+        self._by_model.clear()
+        self._by_id.clear()
+
+    async def load(self, create_missing: bool = False):
+        from fastapp.models.tortoise import Tortoise
+
+        self.clear()
+        for ctype in await ContentType.objects.all():
+            self.register(ctype)
+
+        if not create_missing:
+            return
+
+        missing = {
+            (x._meta.app_config.label, x.__name__)
+            for x in chain.from_iterable(y.values() for y in Tortoise.apps.values())
+        } - self._by_key.keys()
+        if not missing:
+            return
+
+        await ContentType.objects.bulk_create(
+            [ContentType(app_label=a, model=m) for a, m in sorted(missing)],
+            ignore_conflicts=True,
+        )
+        for ctype in await ContentType.objects.filter(
+            app_label__in={a for a, _ in missing}
+        ):
+            self.register(ctype)
+
+
+content_types = ContentTypeRegistry()
@@ -0,0 +1,106 @@
+from typing import TYPE_CHECKING, Dict, FrozenSet, Optional, Tuple
+
+from fastapp.cache import caches
+from fastapp.contrib.auth.cache import (
+    PermissionCache,
+    get_permission_cache,
+    invalidate_permission_cache,
+    logger,
+)
+from fastapp.contrib.dynamic_rbac.models import DynamicPermission
+from fastapp.patchs.tortoise.relations import connect_m2m_changed
+
+if TYPE_CHECKING:
+    from fastapp.contrib.auth.typing import UserProtocol
+
+# (perm, target) -> ids of the groups granted it
+PermissionMatrix = Dict[Tuple[str, str], FrozenSet[int]]
+
+MATRIX_KEY = "fastapp:dynamic_rbac:matrix"
+USER_GROUPS_KEY = "fastapp:dynamic_rbac:user_groups"
+
+
+async def load_permission_matrix() -> PermissionMatrix:
+    """Compile every (group, target, perm) grant with a single query."""
+    matrix: Dict[Tuple[str, str], set] = {}
+    for perm, target, group_id in await DynamicPermission.objects.filter(
+        groups__id__isnull=False
+    ).values_list("perm", "target", "groups__id"):
+        matrix.setdefault((perm, target), set()).add(group_id)
+
+    return {k: frozenset(v) for k, v in matrix.items()}
+
+
+async def get_permission_matrix(permission_cache: PermissionCache) -> PermissionMatrix:
+    """
+    Return the compiled matrix, from this worker, from the shared cache for
+    the current generation, or rebuilt from the database, in that order.
+
+    Like the rest of the permission cache, a change reaches other workers
+    through the generation counter in the alias cache.
+    """
+    matrix = await permission_cache.get(MATRIX_KEY)
+    if matrix is not None:
+        return matrix
+
+    # 按读取数据库前的 generation 写入，期间的变更会使用新的 key
+    shared_key = f"{MATRIX_KEY}:{permission_cache.generation}"
+    cache = caches[permission_cache.alias]
+    try:
+        rows = await cache.get(shared_key)
+    except Exception as e:
+        logger.warning(f"Dynamic permission matrix get failed: {e!r}")
+        rows = None
+
+    if rows is not None:
+        matrix = {(perm, target): frozenset(ids) for perm, target, ids in rows}
+        permission_cache.set(MATRIX_KEY, matrix)
+        return matrix
+
+    matrix = await load_permission_matrix()
+    permission_cache.set(MATRIX_KEY, matrix)
+
+    rows = [(perm, target, list(ids)) for (perm, target), ids in matrix.items()]
+    try:
+        await cache.set(shared_key, rows, timeout=permission_cache.local.timeout)
+    except Exception as e:
+        logger.warning(f"Dynamic permission matrix set failed: {e!r}")
+
+    return matrix
+
+
+async def get_user_group_ids(
+    permission_cache: PermissionCache, user: "UserProtocol"
+) -> FrozenSet[int]:
+    key = (USER_GROUPS_KEY, user.pk)
+
+    group_ids = await permission_cache.get(key)
+    if group_ids is None:
+        group_ids = frozenset(await user.groups.all().values_list("id", flat=True))
+        permission_cache.set(key, group_ids)
+
+    return group_ids
+
+
+async def check_dynamic_permission(
+    user: "UserProtocol", perm: str, target: str
+) -> Optional[bool]:
+    """
+    Check a grant against the cached matrix, or return None when the
+    permission cache is disabled (no ``AUTH_PERMISSION_CACHE_ALIAS``) and the
+    caller has to query instead.
+    """
+    if (permission_cache := get_permission_cache()) is None:
+        return None
+
+    group_ids = (await get_permission_matrix(permission_cache)).get((perm, target))
+    if not group_ids:
+        return False
+
+    return not group_ids.isdisjoint(await get_user_group_ids(permission_cache, user))
+
+
+@connect_m2m_changed
+async def _dynamic_permission_m2m_changed(relation, action):
+    if relation.field.through == DynamicPermission._meta.fields_map["groups"].through:
+        await invalidate_permission_cache()
@@ -1,14 +1,18 @@
 import asyncio
 
+import click
+
 from fastapp.commands.decorators import async_init_fastapp
 
 
 @async_init_fastapp
-async def async_init_dynamic_rbac():
+async def async_init_dynamic_rbac(remove_stale=False):
     from fastapp.contrib.dynamic_rbac.utils import initialize_dynamic_permissions
 
-    await initialize_dynamic_permissions()
+    created, removed = await initialize_dynamic_permissions(remove_stale=remove_stale)
+    print(f"Dynamic permissions created: {created}, removed: {removed}")
 
 
-def init_dynamic_rbac():
-    asyncio.run(async_init_dynamic_rbac())
+@click.option("--remove-stale", is_flag=True, default=False)
+def init_dynamic_rbac(remove_stale=False):
+    asyncio.run(async_init_dynamic_rbac(remove_stale=remove_stale))
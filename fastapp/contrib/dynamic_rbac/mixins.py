@@ -1,5 +1,6 @@
 from typing import Optional
 
+from fastapp.contrib.dynamic_rbac.cache import check_dynamic_permission
 from fastapp.contrib.dynamic_rbac.models import DynamicPermission
 from fastapp.exceptions import NotAuthenticated
 
@@ -10,7 +11,7 @@ class DynamicPermissionMixin:
     默认配置标准操作的权限：
     - create: add
     - retrieve/list: view
-    - update: change
+    - update/partial_update: change
     - destroy: delete
     """
 
@@ -22,6 +23,7 @@ class DynamicPermissionMixin:
         "create": "add",
         "retrieve": "view",
         "update": "change",
+        "partial_update": "change",
         "destroy": "delete",
         "list": "view",
     }
@@ -69,9 +71,11 @@ class DynamicPermissionMixin:
         handler = getattr(self, self.action)
         target = getattr(handler, "_target", self.get_view_identifier())
 
-        has_perm = await DynamicPermission.objects.filter(
-            perm=perm, target=target, groups__user_set=request.user
-        ).exists()
+        has_perm = await check_dynamic_permission(request.user, perm, target)
+        if has_perm is None:
+            has_perm = await DynamicPermission.objects.filter(
+                perm=perm, target=target, groups__user_set=request.user
+            ).exists()
 
         return has_perm
 
@@ -1,4 +1,5 @@
 from fastapp import models
+from fastapp.contrib.auth.cache import invalidate_permission_cache
 from fastapp.contrib.auth.models import Group
 
 
@@ -22,6 +23,14 @@ class DynamicPermission(models.Model):
             models.Index(fields=("target",)),
         ]
 
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        await invalidate_permission_cache()
+
+    async def delete(self, *args, **kwargs):
+        await super().delete(*args, **kwargs)
+        await invalidate_permission_cache()
+
     async def has_permission(self, request, view):
         return True
 
@@ -1,28 +1,26 @@
 import inspect
+from typing import Set, Tuple
+
+from tortoise.transactions import in_transaction
 
 from fastapp import apps
 from fastapp.conf import settings
+from fastapp.contrib.auth.cache import invalidate_permission_cache
 from fastapp.contrib.dynamic_rbac.mixins import DynamicPermissionMixin
 from fastapp.contrib.dynamic_rbac.models import DynamicPermission
 
 
-async def initialize_dynamic_permissions():
+def collect_dynamic_permissions() -> Set[Tuple[str, str]]:
     """
-    Asynchronously initializes dynamic permissions by iterating through all app configurations.
-    For each app, it imports the views module and checks for classes that inherit from DynamicPermissionMixin.
-    For each such class, it retrieves the view identifier and permission codes,
-    then creates or retrieves the corresponding DynamicPermission objects.
+    Collect the (perm, target) pairs declared in ``settings.DYNAMIC_PERMISSIONS``
+    and by the DynamicPermissionMixin viewsets of every installed app.
     """
 
-    created_perms = set()
+    declared_perms = set()
 
     for target, perms in getattr(settings, "DYNAMIC_PERMISSIONS", {}).items():
         for perm in perms:
-            await DynamicPermission.objects.get_or_create(
-                perm=perm,
-                target=target,
-            )
-            created_perms.add((perm, target))
+            declared_perms.add((perm, target))
 
     for app_config in apps.apps.app_configs.values():
         views_module = app_config.import_module("views")
@@ -41,15 +39,51 @@ async def initialize_dynamic_permissions():
                 and not obj.__name__.endswith("Mixin")
             ):
                 view_identifier = obj.get_view_identifier()
-                permission_codes = obj.get_permission_codes()
+                for code in obj.get_permission_codes():
+                    declared_perms.add((code, view_identifier))
+
+    return declared_perms
+
+
+async def initialize_dynamic_permissions(
+    remove_stale: bool = False, batch_size: int = 1000
+) -> Tuple[int, int]:
+    """
+    Asynchronously initializes dynamic permissions by iterating through all app configurations.
+    For each app, it imports the views module and checks for classes that inherit from DynamicPermissionMixin.
+
+    The declared permissions are diffed against one select of the existing rows,
+    missing rows are bulk inserted and, with ``remove_stale``, rows no longer
+    declared anywhere are deleted, all in one transaction and a constant number
+    of queries. Returns the number of created and removed rows.
+    """
+
+    declared_perms = collect_dynamic_permissions()
+
+    async with in_transaction(DynamicPermission._meta.app_config.default_connection):
+        existing = {
+            (perm, target): pk
+            for pk, perm, target in await DynamicPermission.objects.all().values_list(
+                "id", "perm", "target"
+            )
+        }
+
+        missing = declared_perms - existing.keys()
+        await DynamicPermission.bulk_create(
+            [DynamicPermission(perm=perm, target=target) for perm, target in missing],
+            batch_size=batch_size,
+            ignore_conflicts=True,
+        )
 
-                for code in permission_codes:
-                    if (code, view_identifier) in created_perms:
-                        continue
+        removed = 0
+        if remove_stale:
+            stale_ids = [pk for key, pk in existing.items() if key not in declared_perms]
+            for i in range(0, len(stale_ids), batch_size):
+                removed += await DynamicPermission.objects.filter(
+                    id__in=stale_ids[i : i + batch_size]
+                ).delete()
 
-                    await DynamicPermission.objects.get_or_create(
-                        perm=code,
-                        target=view_identifier,
-                    )
+    if missing or removed:
+        await invalidate_permission_cache()
 
-                    created_perms.add((code, view_identifier))
+    return len(missing), removed
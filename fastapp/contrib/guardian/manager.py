@@ -1,13 +1,12 @@
+from typing import List, Tuple, Type
+
+from pypika.dialects import PostgreSQLQueryBuilder
 from tortoise.transactions import in_transaction
 
 from fastapp import models
 from fastapp.contrib.auth.models import Permission
 from fastapp.contrib.contenttypes.models import ContentType
 from fastapp.contrib.guardian.exceptions import ObjectNotPersisted
-from fastapp.contrib.guardian.shortcuts import (
-    get_objects_for_group,
-    get_objects_for_user,
-)
 from fastapp.models import QuerySet
 from fastapp.models.base import MODEL
 
@@ -30,10 +29,7 @@ class BaseObjectPermissionManager(models.Manager[MODEL]):
 
         ctype = await ContentType.from_model(obj)
 
-        if not isinstance(perm, Permission):
-            permission = Permission.objects.get(content_type=ctype, perm=perm)
-        else:
-            permission = perm
+        permission = await self._get_permission(perm, ctype)
 
         kwargs = {
             "permission": permission,
@@ -45,62 +41,73 @@ class BaseObjectPermissionManager(models.Manager[MODEL]):
         obj_perm, _ = await self.get_or_create(**kwargs)
         return obj_perm
 
-    async def bulk_assign_perm(self, perm, user_or_group, queryset: QuerySet):
-        """
-        Bulk assigns permissions with given ``perm`` for an objects in ``queryset`` and
-        ``user_or_group``.
-        """
-
+    async def _get_object_pks(self, queryset) -> Tuple[Type[models.Model], List[str]]:
         if isinstance(queryset, list):
-            klass = queryset[0].__class__
+            klass = queryset[0].__class__ if queryset else None
+            object_pks = [obj.pk for obj in queryset]
         else:
             klass = queryset.model
+            object_pks = await queryset.values_list(klass._meta.pk_attr, flat=True)
 
-        ctype = await ContentType.from_model(klass)
-
-        if not isinstance(perm, Permission):
-            permission = await Permission.objects.get(content_type=ctype, perm=perm)
-        else:
-            permission = perm
-
-        async with in_transaction(self._model._meta.app_config.default_connection):
-            pass
-
-        if self.user_or_group_field == "user":
-            assigned_objects = await get_objects_for_user(
-                user_or_group,
-                perm,
-                klass,
-                use_groups=False,
-                with_superuser=False,
-                accept_model_perms=False,
-            )
-        else:
-            assigned_objects = await get_objects_for_group(
-                user_or_group, perm, klass, accept_model_perms=False
-            )
+        # object_id is a CharField, compare and store as str
+        return klass, [str(pk) for pk in object_pks]
 
-        existed_ids = await assigned_objects.values_list("id", flat=True)
+    async def _get_permission(self, perm, ctype) -> Permission:
+        if isinstance(perm, Permission):
+            return perm
+        return await Permission.objects.get(content_type=ctype, perm=perm)
 
-        if isinstance(queryset, list):
-            existed_ids_set = set(existed_ids)
-            queryset = [x for x in queryset if x.id not in existed_ids_set]
-        else:
-            queryset = await queryset.exclude(pk__in=existed_ids)
+    async def bulk_assign_perm(
+        self, perm, user_or_group, queryset: QuerySet, batch_size: int = 500
+    ) -> int:
+        """
+        Bulk assigns permissions with given ``perm`` for an objects in ``queryset`` and
+        ``user_or_group``.
 
-        assigned_perms = []
-        for instance in queryset:
-            kwargs = {
-                "permission": permission,
-                self.user_or_group_field: user_or_group,
-                "content_type": ctype,
-                "object_id": instance.pk,
-            }
-            assigned_perms.append(self._model(**kwargs))
+        Rows are written with chunked multi-row ``INSERT ... ON CONFLICT DO
+        NOTHING`` (``INSERT IGNORE`` on MySQL), so existing grants and concurrent
+        assigners are skipped by the unique constraint. Returns the number of
+        rows inserted.
+        """
 
-        await self._model.bulk_create(assigned_perms)
+        klass, object_pks = await self._get_object_pks(queryset)
+        if not object_pks:
+            return 0
 
-        return assigned_perms
+        ctype = await ContentType.from_model(klass)
+        permission = await self._get_permission(perm, ctype)
+
+        meta = self._model._meta
+        columns = [
+            meta.fields_db_projection[f"{self.user_or_group_field}_id"],
+            meta.fields_db_projection["content_type_id"],
+            meta.fields_db_projection["permission_id"],
+            meta.fields_db_projection["object_id"],
+        ]
+        row = [user_or_group.pk, ctype.pk, permission.pk]
+
+        inserted = 0
+        async with in_transaction(meta.app_config.default_connection) as conn:
+            executor = conn.executor_class(model=self._model, db=conn)
+
+            for i in range(0, len(object_pks), batch_size):
+                chunk = object_pks[i : i + batch_size]
+
+                query = conn.query_class.into(meta.basetable).columns(*columns)
+                for j in range(len(chunk)):
+                    query = query.insert(
+                        *[executor.parameter(j * 4 + k) for k in range(4)]
+                    )
+                query = query.on_conflict().do_nothing()
+                if isinstance(query, PostgreSQLQueryBuilder):
+                    # PostgreSQL reports no row count for a fetch without rows
+                    query = query.returning(meta.db_pk_column)
+
+                values = [v for object_pk in chunk for v in (*row, object_pk)]
+                count, _ = await conn.execute_query(query.get_sql(), values)
+                inserted += count
+
+        return inserted
 
     async def remove_perm(self, perm: str, user_or_group, obj: models.Model):
         """
@@ -113,10 +120,7 @@ class BaseObjectPermissionManager(models.Manager[MODEL]):
 
         ctype = await ContentType.from_model(obj)
 
-        if not isinstance(perm, Permission):
-            permission = await Permission.objects.get(content_type=ctype, perm=perm)
-        else:
-            permission = perm
+        permission = await self._get_permission(perm, ctype)
 
         kwargs = {
             "permission": permission,
@@ -128,35 +132,32 @@ class BaseObjectPermissionManager(models.Manager[MODEL]):
         deleted_count = await self.filter(**kwargs).delete()
         return deleted_count
 
-    async def bulk_remove_perm(self, perm, user_or_group, queryset: QuerySet):
+    async def bulk_remove_perm(
+        self, perm, user_or_group, queryset: QuerySet, batch_size: int = 1000
+    ) -> int:
         """
         Bulk removes permissions with given ``perm`` for objects in ``queryset`` and
-        ``user_or_group``.
+        ``user_or_group``, in chunked deletes. Returns the number of rows deleted.
         """
 
-        if isinstance(queryset, list):
-            klass = queryset[0].__class__
-        else:
-            klass = queryset.model
+        klass, object_pks = await self._get_object_pks(queryset)
+        if not object_pks:
+            return 0
 
         ctype = await ContentType.from_model(klass)
-
-        if not isinstance(perm, Permission):
-            permission = await Permission.objects.get(content_type=ctype, perm=perm)
-        else:
-            permission = perm
+        permission = await self._get_permission(perm, ctype)
 
         kwargs = {
-            "permission": permission,
-            self.user_or_group_field: user_or_group,
-            "content_type": ctype,
+            f"{self.user_or_group_field}_id": user_or_group.pk,
+            "content_type_id": ctype.pk,
+            "permission_id": permission.pk,
         }
 
-        if isinstance(queryset, list):
-            object_pks = [obj.pk for obj in queryset]
-        else:
-            object_pks = await queryset.values_list("pk", flat=True)
-
-        deleted_perms = await self.filter(**kwargs, object_id__in=object_pks).delete()
+        deleted = 0
+        async with in_transaction(self._model._meta.app_config.default_connection):
+            for i in range(0, len(object_pks), batch_size):
+                deleted += await self.filter(
+                    **kwargs, object_id__in=object_pks[i : i + batch_size]
+                ).delete()
 
-        return deleted_perms
+        return deleted
@@ -1,8 +1,9 @@
-from typing import List, Type, TypeVar
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Type, TypeVar
 
-from fastapp.contrib.auth.models import Group
+from fastapp.contrib.auth.models import Group, Permission
 from fastapp.contrib.auth.typing import UserProtocol
 from fastapp.contrib.contenttypes.models import ContentType
+from fastapp.contrib.guardian.exceptions import MixedContentTypeError
 from fastapp.contrib.guardian.utils import (
     get_group_obj_perms_model_class,
     get_identity,
@@ -22,18 +23,21 @@ async def get_objects_for_user(
     use_groups=True,
     with_superuser=True,
     accept_model_perms=True,
+    any_perm=False,
 ):
+    """
+    Return a queryset of the objects of ``klass`` the user holds ``perms`` on.
+
+    With several permissions, all of them are required unless ``any_perm`` is
+    set; a permission may come from a user grant or, with ``use_groups``, from
+    a group grant. Everything is resolved in a single query.
+    """
     GroupObjectPermission = get_group_obj_perms_model_class()
     UserObjectPermission = get_user_obj_perms_model_class()
 
     if isinstance(perms, str):
         perms = [perms]
 
-    if len(perms) > 1:
-        raise Exception("not support yet")
-
-    perms = perms[0]
-
     queryset = klass if isinstance(klass, QuerySet) else klass.objects.all()
     klass = klass.model if isinstance(klass, QuerySet) else klass
 
@@ -44,30 +48,186 @@ async def get_objects_for_user(
     ctype = await ContentType.from_model(klass)
 
     if accept_model_perms:
-        # TODO group has perm
-        if await user.has_perm(perms, klass):
+        model_perms = await _get_model_perms(user, klass, perms)
+        if any_perm and model_perms.intersection(perms):
+            return queryset
+        perms = [x for x in perms if x not in model_perms]
+        if not perms:
             return queryset
 
-    # Now we should extract list of pk values for which we would filter
-    # queryset
-    user_obj_perms_queryset = UserObjectPermission.objects.filter(
-        user=user,
-        content_type=ctype,
-        permission__perm=perms,
+    def perm_q(perm):
+        # Now we should extract list of pk values for which we would filter
+        # queryset
+        user_obj_perms_queryset = UserObjectPermission.objects.filter(
+            user=user,
+            content_type=ctype,
+            permission__perm=perm,
+        )
+
+        q = Q(id__in=Subquery(user_obj_perms_queryset.values("object_id")))
+
+        if use_groups:
+            groups_obj_perms_queryset = GroupObjectPermission.objects.filter(
+                group__user_set=user,
+                content_type=ctype,
+                permission__perm=perm,
+            )
+
+            q |= Q(id__in=Subquery(groups_obj_perms_queryset.values("object_id")))
+
+        return q
+
+    return queryset.filter(
+        Q(*[perm_q(x) for x in perms], join_type=Q.OR if any_perm else Q.AND)
     )
 
-    q = Q(id__in=Subquery(user_obj_perms_queryset.values("object_id")))
 
-    if use_groups:
-        groups_obj_perms_queryset = GroupObjectPermission.objects.filter(
-            group__user_set=user,
-            content_type=ctype,
-            permission__perm=perms,
+async def _get_model_perms(
+    user_or_group, klass: Type[Model], perms: Optional[Iterable[str]] = None
+) -> Set[str]:
+    """
+    Return the model-level permissions held on ``klass``, among ``perms`` when
+    given, as decided by the configured ``AUTH_PERMISSION_BACKEND``.
+    """
+    backend = user_or_group.get_permission_backend()
+
+    # 能列出全部权限的后端只需一次查找
+    if get_all_permissions := getattr(backend, "get_all_permissions", None):
+        key = (klass._meta.app, klass.__name__)
+        held = {
+            perm
+            for *model_key, perm in await get_all_permissions(user_or_group)
+            if tuple(model_key) == key
+        }
+        return held if perms is None else held.intersection(perms)
+
+    if perms is None:
+        ctype = await ContentType.from_model(klass)
+        perms = await Permission.objects.filter(content_type=ctype).values_list(
+            "perm", flat=True
         )
+    return {
+        perm for perm in perms if await backend.has_perm(user_or_group, perm, klass)
+    }
 
-        q |= Q(id__in=Subquery(groups_obj_perms_queryset.values("object_id")))
 
-    return queryset.filter(q)
+async def get_perms_for_objects(
+    user_or_group,
+    objects: Sequence[MODEL],
+    perms: Optional[str | Iterable[str]] = None,
+    use_groups=True,
+    with_superuser=True,
+    accept_model_perms=True,
+) -> Dict[Any, Set[str]]:
+    """
+    Return a mapping of object pk to the permissions held on that object.
+
+    User grants and group grants are fetched for the whole list in at most one
+    query each, so annotating a page of objects costs a constant number of
+    queries. ``perms`` restricts the result to the given permissions. All
+    objects must be instances of the same model.
+    """
+    if not objects:
+        return {}
+
+    if isinstance(perms, str):
+        perms = [perms]
+    wanted = None if perms is None else set(perms)
+
+    klass = objects[0].__class__
+    if any(obj.__class__ is not klass for obj in objects):
+        raise MixedContentTypeError(
+            "get_perms_for_objects() requires objects of a single model"
+        )
+    ctype = await ContentType.from_model(klass)
+    user, group = get_identity(user_or_group)
+
+    result: Dict[Any, Set[str]] = {obj.pk: set() for obj in objects}
+    pks = {str(pk): pk for pk in result}
+
+    if user is not None and with_superuser and user.is_superuser:
+        if wanted is None:
+            wanted = set(
+                await Permission.objects.filter(content_type=ctype).values_list(
+                    "perm", flat=True
+                )
+            )
+        for held in result.values():
+            held.update(wanted)
+        return result
+
+    global_perms = (
+        await _get_model_perms(user_or_group, klass, wanted)
+        if accept_model_perms
+        else set()
+    )
+
+    filters = {"content_type_id": ctype.id, "object_id__in": list(pks)}
+    if wanted is not None:
+        filters["permission__perm__in"] = list(wanted)
+
+    querysets = []
+    if user is not None:
+        querysets.append(
+            get_user_obj_perms_model_class().objects.filter(user_id=user.pk, **filters)
+        )
+        if use_groups:
+            querysets.append(
+                get_group_obj_perms_model_class().objects.filter(
+                    group__user_set=user.pk, **filters
+                )
+            )
+    else:
+        querysets.append(
+            get_group_obj_perms_model_class().objects.filter(
+                group_id=group.pk, **filters
+            )
+        )
+
+    for queryset in querysets:
+        for object_id, perm in await queryset.values_list(
+            "object_id", "permission__perm"
+        ):
+            result[pks[object_id]].add(perm)
+
+    if global_perms:
+        if wanted is not None:
+            global_perms &= wanted
+        for held in result.values():
+            held.update(global_perms)
+
+    return result
+
+
+async def filter_objects_for_user(
+    user_or_group,
+    perms: str | Iterable[str],
+    objects: Sequence[MODEL],
+    any_perm=False,
+    use_groups=True,
+    with_superuser=True,
+    accept_model_perms=True,
+) -> List[MODEL]:
+    """
+    Return the subset of ``objects`` on which all of ``perms`` are held, or
+    any of them with ``any_perm``. See get_perms_for_objects().
+    """
+    if isinstance(perms, str):
+        perms = [perms]
+    required = set(perms)
+
+    objects_perms = await get_perms_for_objects(
+        user_or_group,
+        objects,
+        required,
+        use_groups=use_groups,
+        with_superuser=with_superuser,
+        accept_model_perms=accept_model_perms,
+    )
+
+    if any_perm:
+        return [x for x in objects if objects_perms[x.pk] & required]
+    return [x for x in objects if required <= objects_perms[x.pk]]
 
 
 async def get_objects_for_group(
@@ -102,7 +262,7 @@ async def get_objects_for_group(
     return queryset.filter(q)
 
 
-async def assign_perm(perms, user_or_group, obj):
+async def assign_perm(perms, user_or_group, obj) -> int:
     if isinstance(perms, str):
         perms = [perms]
 
@@ -117,11 +277,13 @@ async def assign_perm(perms, user_or_group, obj):
         get_user_obj_perms_model_class() if user else get_group_obj_perms_model_class()
     )
 
+    count = 0
     for perm in perms:
-        await PermissionModel.objects.bulk_assign_perm(perm, user_or_group, obj)
+        count += await PermissionModel.objects.bulk_assign_perm(perm, user_or_group, obj)
+    return count
 
 
-async def remove_perm(perms, user_or_group, obj) -> None:
+async def remove_perm(perms, user_or_group, obj) -> int:
     if isinstance(perms, str):
         perms = [perms]
 
@@ -136,5 +298,7 @@ async def remove_perm(perms, user_or_group, obj) -> None:
         get_user_obj_perms_model_class() if user else get_group_obj_perms_model_class()
     )
 
+    count = 0
     for perm in perms:
-        await PermissionModel.objects.bulk_remove_perm(perm, user_or_group, obj)
+        count += await PermissionModel.objects.bulk_remove_perm(perm, user_or_group, obj)
+    return count
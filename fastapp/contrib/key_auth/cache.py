@@ -0,0 +1,150 @@
+import logging
+from typing import Optional, Tuple, Type
+
+from fastapp.cache import caches
+from fastapp.cache.local import LRUCache
+from fastapp.conf import settings
+from fastapp.exceptions import ImproperlyConfigured
+from fastapp.models import Model
+
+logger = logging.getLogger("qingkong.error")
+
+
+class APIKeyCache:
+    """
+    Cache of API key lookups in front of the database.
+
+    Both hits and misses are cached, misses (unknown or inactive keys) only for
+    ``negative_timeout`` seconds. A small in-process LRU sits in front of the
+    ``CACHES`` alias; saving or deleting a key invalidates both levels in the
+    current worker, other workers' LRU entries expire after ``local_timeout``
+    seconds. Changes made with ``QuerySet.update()`` do not invalidate, they
+    take effect after ``timeout`` seconds.
+    """
+
+    key_prefix = "fastapp:key_auth"
+
+    def __init__(
+        self,
+        alias: Optional[str] = None,
+        timeout: float = 60,
+        negative_timeout: float = 5,
+        local_maxsize: int = 1024,
+        local_timeout: float = 5,
+    ):
+        self.alias = alias
+        self.timeout = timeout
+        self.negative_timeout = min(negative_timeout, timeout)
+        self.local = LRUCache(local_maxsize, min(local_timeout, timeout))
+
+    def make_key(self, model: Type[Model], field: str, value) -> str:
+        return f"{self.key_prefix}:{model._meta.db_table}:{field}:{value}"
+
+    async def get(
+        self, model: Type[Model], field: str, value
+    ) -> Tuple[bool, Optional[Model]]:
+        """Return ``(hit, api_key)``; ``api_key`` is None for a cached miss."""
+        key = self.make_key(model, field, value)
+
+        entry = self.local.get(key)
+        if entry is None and self.alias:
+            try:
+                entry = await caches[self.alias].get(key)
+            except Exception as e:
+                logger.warning(f"API key cache get failed: {e!r}")
+            if entry is not None:
+                self.local.set(
+                    key, entry, timeout=None if entry["row"] else self.negative_timeout
+                )
+
+        if entry is None:
+            return False, None
+
+        if entry["row"] is None:
+            return True, None
+        return True, model._init_from_db(**entry["row"])
+
+    async def set(self, model: Type[Model], field: str, value, api_key: Optional[Model]):
+        entry = {
+            "row": None
+            if api_key is None
+            else {
+                column: getattr(api_key, name)
+                for name, column in api_key._meta.fields_db_projection.items()
+            }
+        }
+        timeout = self.timeout if api_key is not None else self.negative_timeout
+
+        key = self.make_key(model, field, value)
+        self.local.set(key, entry, timeout=min(timeout, self.local.timeout))
+        if self.alias:
+            try:
+                await caches[self.alias].set(key, entry, timeout=timeout)
+            except Exception as e:
+                logger.warning(f"API key cache set failed: {e!r}")
+
+    async def invalidate(self, api_key: Model, fields=("app_key", "uuid")):
+        keys = [
+            self.make_key(api_key.__class__, field, getattr(api_key, field))
+            for field in fields
+            if field in api_key._meta.fields_map
+        ]
+        for key in keys:
+            self.local.delete(key)
+
+        if self.alias and keys:
+            try:
+                await caches[self.alias].delete_many(keys)
+            except Exception as e:
+                logger.warning(f"API key cache delete failed: {e!r}")
+
+
+_api_key_cache: Optional[APIKeyCache] = None
+
+
+def get_api_key_cache() -> Optional[APIKeyCache]:
+    """
+    Return the API key cache configured in settings, or None when disabled.
+
+    Without ``KEY_AUTH_CACHE_ALIAS`` a revoked key could only be dropped in
+    the worker that saved it, so keys are not cached.
+    """
+    global _api_key_cache
+
+    alias = settings.KEY_AUTH_CACHE_ALIAS
+    if settings.KEY_AUTH_CACHE_TIMEOUT <= 0 or not alias:
+        return None
+
+    if _api_key_cache is None:
+        if not hasattr(caches[alias], "delete_many"):
+            raise ImproperlyConfigured(
+                f"KEY_AUTH_CACHE_ALIAS {alias!r} does not support delete"
+            )
+        _api_key_cache = APIKeyCache(
+            alias=alias,
+            timeout=settings.KEY_AUTH_CACHE_TIMEOUT,
+            negative_timeout=settings.KEY_AUTH_CACHE_NEGATIVE_TIMEOUT,
+            local_maxsize=settings.KEY_AUTH_CACHE_LOCAL_MAXSIZE,
+            local_timeout=settings.KEY_AUTH_CACHE_LOCAL_TIMEOUT,
+        )
+    return _api_key_cache
+
+
+async def get_active_api_key(model: Type[Model], field: str, value) -> Optional[Model]:
+    """Return the active API key whose ``field`` equals ``value``, or None."""
+    api_key_cache = get_api_key_cache()
+    if api_key_cache is not None:
+        hit, api_key = await api_key_cache.get(model, field, value)
+        if hit:
+            return api_key
+
+    api_key = await model.filter(**{field: value, "is_active": True}).first()
+
+    if api_key_cache is not None:
+        await api_key_cache.set(model, field, value, api_key)
+    return api_key
+
+
+async def invalidate_cached_api_key(api_key: Model):
+    if (api_key_cache := get_api_key_cache()) is not None:
+        await api_key_cache.invalidate(api_key)
@@ -1,8 +1,10 @@
 import hashlib
+import hmac
 import json
 import time
 
 from fastapp.contrib.auth.mixins import AccessMixin
+from fastapp.contrib.key_auth.cache import get_active_api_key
 from fastapp.contrib.key_auth.models import APIKey
 from fastapp.requests import DjangoStyleRequest
 
@@ -28,6 +30,24 @@ class KeyAuthMixin(AccessMixin):
         """生成签名"""
         return KeyAuthMixin.md5_encryption(data_str + app_secret)
 
+    @staticmethod
+    def check_sign(sign: str, body: bytes, app_secret: str) -> bool:
+        """校验签名：md5(请求体 + app_secret)"""
+        sign_bytes = sign.encode("utf-8")
+
+        expected_sign = hashlib.md5(body + app_secret.encode("utf-8")).hexdigest()
+        if hmac.compare_digest(sign_bytes, expected_sign.encode("ascii")):
+            return True
+
+        try:
+            data_dict = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
+
+        data_str = json.dumps(data_dict, sort_keys=True, separators=(",", ":"))
+        expected_sign = KeyAuthMixin.dict_to_md5(data_str, app_secret)
+        return hmac.compare_digest(sign_bytes, expected_sign.encode("ascii"))
+
     async def dispatch(self, request: DjangoStyleRequest, *args, **kwargs):
         # 1. 检查必要参数是否存在
         app_key = request.headers.get("appKey")
@@ -37,10 +57,8 @@ class KeyAuthMixin(AccessMixin):
         if not app_key or not timestamp_str or not sign:
             return self.handle_no_permission()
 
-        # 2. 从数据库查询有效的 appKey
-        api_key_obj = await self.api_key_model.filter(
-            app_key=app_key, is_active=True
-        ).first()
+        # 2. 查询有效的 appKey（优先读取缓存）
+        api_key_obj = await get_active_api_key(self.api_key_model, "app_key", app_key)
         if not api_key_obj or not api_key_obj.app_secret:
             return self.handle_no_permission()
 
@@ -56,23 +74,12 @@ class KeyAuthMixin(AccessMixin):
         if abs(current_time - timestamp) > TIMESTAMP_TOLERANCE:
             return self.handle_no_permission()
 
-        # 4. 获取请求体原始内容（用于签名计算）
+        # 4. 获取请求体原始内容（用于签名计算），已读取过的请求体会被复用
         body = await request.body()
-        if body:
-            try:
-                data_dict = json.loads(body.decode("utf-8"))
-                data_str = json.dumps(data_dict, sort_keys=True, separators=(",", ":"))
-            except json.JSONDecodeError:
-                data_str = body.decode("utf-8")
-        else:
-            data_str = ""
-
-        # 5. 计算服务端签名
-        expected_sign = KeyAuthMixin.dict_to_md5(data_str, app_secret)
 
-        # 6. 比对签名
-        if sign != expected_sign:
+        # 5. 直接对原始请求体计算签名，不一致时再按规范化 JSON 计算，兼容旧客户端
+        if not self.check_sign(sign, body, app_secret):
             return self.handle_no_permission()
 
-        # 7. 验证通过
+        # 6. 验证通过
         return await super().dispatch(request, *args, **kwargs)
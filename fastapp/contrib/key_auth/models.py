@@ -1,4 +1,5 @@
 from fastapp import models
+from fastapp.contrib.key_auth.cache import invalidate_cached_api_key
 
 
 class APIKey(models.Model):
@@ -18,6 +19,14 @@ class APIKey(models.Model):
     def __str__(self):
         return f"{self.name} - {self.suffix}..."  # Mask the full key for security reasons
 
+    async def save(self, *args, **kwargs):
+        await super().save(*args, **kwargs)
+        await invalidate_cached_api_key(self)
+
+    async def delete(self, *args, **kwargs):
+        await super().delete(*args, **kwargs)
+        await invalidate_cached_api_key(self)
+
     class Meta:
         verbose_name = "API Key"
         verbose_name_plural = "API Keys"
@@ -1,13 +1,13 @@
 from typing import Annotated, Optional
 
-import jwt
 from fastapi import Depends, HTTPException, status
 from jwt.exceptions import InvalidTokenError
 
-from common.settings import settings
 from fastapp.contrib.auth.typing import UserProtocol
+from fastapp.contrib.key_auth.cache import get_active_api_key
 from fastapp.contrib.key_auth.models import APIKey
-from fastapp.security.jwt import ALGORITHM, global_bearer_token_header
+from fastapp.security.jwt import decode_token, global_bearer_token_header
+from fastapp.security.revocation import is_token_revoked
 
 
 def get_api_key_factory(
@@ -24,24 +24,24 @@ def get_api_key_factory(
             headers={"WWW-Authenticate": "Bearer"},
         )
         try:
-            payload: dict[str, str] = jwt.decode(
-                token, settings.SECRET_KEY, algorithms=[ALGORITHM]
-            )
+            payload: dict[str, str] = decode_token(token)
             uuid = payload.get("uuid")
             if uuid is None:
                 if raise_exception:
                     raise credentials_exception
                 else:
                     return None
+            if await is_token_revoked(payload):
+                raise InvalidTokenError("Token has been revoked")
         except InvalidTokenError:
             if raise_exception:
                 raise credentials_exception
             else:
                 return None
 
-        api_key = await APIKey.objects.get_or_none(uuid=uuid)
+        api_key = await get_active_api_key(APIKey, "uuid", uuid)
 
-        if api_key is None or api_key.is_active is False:
+        if api_key is None:
             if raise_exception:
                 raise credentials_exception
             else:
@@ -0,0 +1,169 @@
+import asyncio
+import time
+from math import ceil
+from typing import Annotated, Callable, Dict, Optional
+
+from pydantic import Field
+
+from fastapp.contrib.limiter.redis import RedisRateLimiter, WebSocketRedisRateLimiter
+
+
+class _Lease:
+    __slots__ = ("tokens", "expires_at", "exhausted")
+
+    def __init__(self, tokens: int, expires_at: float, exhausted: bool):
+        self.tokens = tokens
+        self.expires_at = expires_at
+        self.exhausted = exhausted
+
+
+class LeaseRedisRateLimiter(RedisRateLimiter):
+    """
+    Approximate rate limiter that reserves tokens from Redis in batches.
+
+    Each worker leases up to ``batch_size`` tokens per key from the shared
+    counter and spends them locally, so Redis only sees one call per lease
+    instead of one call per request. Once the store reports that the window
+    is exhausted, the worker rejects locally until the window resets.
+
+    A lease is at most ``times // expected_workers`` tokens, so that a single
+    worker never holds the whole quota of a small limit. Tokens leased by one
+    worker cannot be used by the others until the window resets, so the
+    limiter may under-admit by up to ``(workers - 1) * lease_size`` tokens.
+    ``max_overshoot`` lets the store hand out that many tokens beyond
+    ``times`` to compensate; the total number of admitted requests per window
+    never exceeds ``times + max_overshoot``.
+    """
+
+    lua_script = """local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local expire_time = tonumber(ARGV[2])
+local batch = tonumber(ARGV[3])
+
+local current = tonumber(redis.call('get', key) or "0")
+local grant = math.min(batch, limit - current)
+if grant <= 0 then
+ return {0, redis.call("PTTL", key)}
+end
+
+local total = redis.call("INCRBY", key, grant)
+if total == grant then
+ redis.call("PEXPIRE", key, expire_time)
+end
+return {grant, redis.call("PTTL", key)}"""
+
+    batch_size: int = 100
+    max_overshoot: int = 0
+
+    # 预计共享同一限额的 worker 数，单次租约不超过 times // expected_workers
+    expected_workers: int = 8
+
+    # 超过该数量时清理过期的本地租约
+    max_local_keys: int = 10000
+
+    def __init__(
+        self,
+        times: Annotated[int, Field(ge=0)] = 1,
+        milliseconds: Annotated[int, Field(ge=-1)] = 0,
+        seconds: Annotated[int, Field(ge=-1)] = 0,
+        minutes: Annotated[int, Field(ge=-1)] = 0,
+        hours: Annotated[int, Field(ge=-1)] = 0,
+        identifier: Optional[Callable] = None,
+        callback: Optional[Callable] = None,
+        connection_alias: str = "default",
+        batch_size: Optional[Annotated[int, Field(ge=1)]] = None,
+        max_overshoot: Optional[Annotated[int, Field(ge=0)]] = None,
+        expected_workers: Optional[Annotated[int, Field(ge=1)]] = None,
+    ):
+        super().__init__(
+            times=times,
+            milliseconds=milliseconds,
+            seconds=seconds,
+            minutes=minutes,
+            hours=hours,
+            identifier=identifier,
+            callback=callback,
+            connection_alias=connection_alias,
+        )
+
+        if batch_size is not None:
+            self.batch_size = batch_size
+        if max_overshoot is not None:
+            self.max_overshoot = max_overshoot
+        if expected_workers is not None:
+            self.expected_workers = expected_workers
+
+        self.lease_size = max(
+            1, min(self.batch_size, self.times // self.expected_workers)
+        )
+
+        self._leases: Dict[str, _Lease] = {}
+        self._lease_locks: Dict[str, asyncio.Lock] = {}
+
+    def _consume(self, key: str, now: float) -> Optional[int]:
+        """
+        Spend one token from the local lease. Return 0 when admitted, the
+        remaining milliseconds when the window is exhausted, or None when a
+        new lease has to be fetched from the store.
+        """
+        lease = self._leases.get(key)
+        if lease is None or lease.expires_at <= now:
+            return None
+
+        if lease.tokens > 0:
+            lease.tokens -= 1
+            return 0
+
+        if lease.exhausted:
+            return ceil((lease.expires_at - now) * 1000)
+
+        return None
+
+    def _prune(self, now: float):
+        """Drop expired leases so that per-identifier keys do not pile up."""
+        for key in [k for k, v in self._leases.items() if v.expires_at <= now]:
+            del self._leases[key]
+            lock = self._lease_locks.get(key)
+            if lock is not None and not lock.locked():
+                del self._lease_locks[key]
+
+    async def _check(self, key):
+        pexpire = self._consume(key, time.monotonic())
+        if pexpire is not None:
+            return pexpire
+
+        lock = self._lease_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another coroutine may have refilled the lease while we waited.
+            pexpire = self._consume(key, time.monotonic())
+            if pexpire is not None:
+                return pexpire
+
+            granted, pttl = await self.connection.evalsha(
+                self.lua_sha,
+                1,
+                key,
+                str(self.times + self.max_overshoot),
+                str(self.milliseconds),
+                str(self.lease_size),
+            )
+            granted, pttl = int(granted), int(pttl)
+            if pttl < 0:
+                pttl = self.milliseconds
+
+            now = time.monotonic()
+            if len(self._leases) >= self.max_local_keys:
+                self._prune(now)
+
+            self._leases[key] = _Lease(
+                tokens=granted,
+                expires_at=now + pttl / 1000,
+                exhausted=granted < self.lease_size,
+            )
+
+            pexpire = self._consume(key, now)
+            return pexpire if pexpire is not None else max(pttl, 1)
+
+
+class WebSocketLeaseRedisRateLimiter(LeaseRedisRateLimiter, WebSocketRedisRateLimiter):
+    pass
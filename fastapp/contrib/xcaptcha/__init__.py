@@ -41,3 +41,9 @@ class XCaptchaLimiter:
     ) -> None:
         cls.identifier = identifier
         cls.http_callback = http_callback
+
+    @classmethod
+    async def close(cls) -> None:
+        from fastapp.contrib.xcaptcha.client import XCaptchaClient
+
+        await XCaptchaClient.close_shared()
@@ -0,0 +1,52 @@
+import time
+
+
+class CircuitBreaker:
+    """
+    Minimal circuit breaker guarding calls to the captcha service.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls are short-circuited for ``reset_timeout`` seconds. Afterwards a
+    single trial call is let through (half-open); its outcome closes or
+    re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.failures < self.failure_threshold:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow_request(self) -> bool:
+        """Return whether a call to the remote service may be attempted."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.trial_in_flight = False
+
+    def record_failure(self):
+        self.failures += 1
+        self.trial_in_flight = False
+        if self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
@@ -1,9 +1,13 @@
+from typing import Optional
+
 import aiohttp
 
 from common.settings import settings
 
 
 class XCaptchaClient:
+    _shared: Optional["XCaptchaClient"] = None
+
     def __init__(self, base_url, headers=None):
         self.base_url = base_url
         self.session = aiohttp.ClientSession()
@@ -17,12 +21,25 @@ class XCaptchaClient:
     def from_config(cls):
         return cls(settings.XCAPTCHA_URL, {"X-API-Key": settings.XCAPTCHA_API_KEY})
 
+    @classmethod
+    def shared(cls) -> "XCaptchaClient":
+        """Return the process-wide client, creating it on first use."""
+        if cls._shared is None or cls._shared.session.closed:
+            cls._shared = cls.from_config()
+        return cls._shared
+
+    @classmethod
+    async def close_shared(cls):
+        if cls._shared is not None:
+            await cls._shared.close()
+            cls._shared = None
+
     async def request(self, method, url, **kwargs):
         merged_url = f"{self.base_url}/{url}"
         return await self.session.request(method, merged_url, **kwargs)
 
     async def post(self, url, **kwargs):
-        req_kwargs = {"timeout": 2}
+        req_kwargs = {"timeout": settings.XCAPTCHA_TIMEOUT}
         req_kwargs.update(kwargs)
 
         return await self.request("POST", url, **req_kwargs)
@@ -1,5 +1,7 @@
 import asyncio
-from typing import Callable, Optional, Type
+import logging
+import time
+from typing import Callable, Dict, Optional, Tuple, Type
 
 from starlette.requests import Request
 from starlette.responses import Response
@@ -7,6 +9,7 @@ from starlette.responses import Response
 from fastapp.conf import settings
 from fastapp.contrib.limiter.depends import RateLimiter
 from fastapp.contrib.xcaptcha import XCaptchaLimiter
+from fastapp.contrib.xcaptcha.breaker import CircuitBreaker
 from fastapp.contrib.xcaptcha.client import XCaptchaClient
 from fastapp.contrib.xcaptcha.encrypt import encrypt_ts_key
 from fastapp.contrib.xcaptcha.exceptions import (
@@ -15,57 +18,126 @@ from fastapp.contrib.xcaptcha.exceptions import (
     ThrottledException,
 )
 
+error_logger = logging.getLogger("qingkong.error")
+
 
 class IntelligenceLimiter(RateLimiter):
+    """
+    Dependency that asks the captcha service for a risk decision.
+
+    Decisions to let a key through are cached for ``decision_ttl`` seconds
+    and concurrent assessments of the same key share one remote call.
+    Throttling decisions are not cached, so a client that has just solved the
+    captcha is assessed again on its next request. A circuit breaker
+    stops calling the service while it is failing; in that case the request
+    is let through when ``fail_open`` is set and blocked otherwise.
+    """
+
+    # 超过该数量时清理过期的决策缓存
+    max_cached_decisions: int = 10000
+
     def __init__(
         self,
         rules=None,
         identifier: Optional[Callable] = None,
         callback: Optional[Callable] = None,
         limiter: Type[XCaptchaLimiter] = XCaptchaLimiter,
+        decision_ttl: Optional[float] = None,
+        fail_open: Optional[bool] = None,
     ):
         if not settings.XCAPTCHA_ENABLE:
             return
 
         self.rules = rules
+        self.rules_payload = [r.to_dict() for r in rules or []]
 
         self.identifier = identifier
         self.callback = callback
 
         self.limiter = limiter
-        self.client = XCaptchaClient.from_config()
 
-    def __del__(self):
-        if hasattr(self, "client"):
-            asyncio.new_event_loop().run_until_complete(self.client.close())
+        self.decision_ttl = (
+            settings.XCAPTCHA_DECISION_TTL if decision_ttl is None else decision_ttl
+        )
+        self.fail_open = settings.XCAPTCHA_FAIL_OPEN if fail_open is None else fail_open
+        self.breaker = CircuitBreaker(
+            failure_threshold=settings.XCAPTCHA_BREAKER_THRESHOLD,
+            reset_timeout=settings.XCAPTCHA_BREAKER_RESET_TIMEOUT,
+        )
 
-    async def _check(self, key) -> Optional[ThrottledException]:
-        if not settings.XCAPTCHA_ENABLE:
-            return None
+        self._decisions: Dict[str, Tuple[float, Optional[ThrottledException]]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
 
+    @property
+    def client(self) -> XCaptchaClient:
+        return XCaptchaClient.shared()
+
+    async def _assess(self, key) -> Optional[ThrottledException]:
+        response = await self.client.risk_assessment(key, rules=self.rules_payload)
         try:
-            response = await self.client.risk_assessment(
-                key, rules=list(map(lambda r: r.to_dict(), self.rules))
-            )
-            if response.status in (200, 429):
-                resp = await response.json()
-                if resp["status"] == "throttled":
-                    action = resp["data"]["action"]
-                    if action == "block":
-                        raise Ratelimited(encrypt_ts_key(key))
-                    elif action == "captcha":
-                        raise CaptchaRequired(encrypt_ts_key(key))
-            else:
+            if response.status not in (200, 429):
                 response.raise_for_status()
-        except (Ratelimited, CaptchaRequired) as e:
-            return e
-        except OSError as e:
-            print(f"Http Error: {e}")
-        except Exception as e:
-            print(f"Unknown Error {e}")
+            resp = await response.json()
+        finally:
+            response.release()
+
+        if resp["status"] == "throttled":
+            action = resp["data"]["action"]
+            if action == "block":
+                return Ratelimited(encrypt_ts_key(key))
+            elif action == "captcha":
+                return CaptchaRequired(encrypt_ts_key(key))
 
         return None
 
+    def _fallback(self, key) -> Optional[ThrottledException]:
+        if self.fail_open:
+            return None
+        return Ratelimited(encrypt_ts_key(key))
+
+    def _remember(self, key, decision: Optional[ThrottledException]):
+        if self.decision_ttl <= 0 or decision is not None:
+            return
+
+        now = time.monotonic()
+        if len(self._decisions) >= self.max_cached_decisions:
+            for k in [k for k, v in self._decisions.items() if v[0] <= now]:
+                del self._decisions[k]
+
+        self._decisions[key] = (now + self.decision_ttl, decision)
+
+    async def _decide(self, key) -> Optional[ThrottledException]:
+        if not self.breaker.allow_request():
+            return self._fallback(key)
+
+        try:
+            decision = await self._assess(key)
+        except Exception as e:
+            error_logger.warning(f"XCaptcha risk assessment failed: {e!r}")
+            self.breaker.record_failure()
+            return self._fallback(key)
+
+        self.breaker.record_success()
+        self._remember(key, decision)
+        return decision
+
+    async def _check(self, key) -> Optional[ThrottledException]:
+        if not settings.XCAPTCHA_ENABLE:
+            return None
+
+        cached = self._decisions.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._decide(key))
+            self._pending[key] = pending
+            pending.add_done_callback(lambda _: self._pending.pop(key, None))
+
+        # shield so that a cancelled request does not cancel the shared call
+        return await asyncio.shield(pending)
+
     async def __call__(self, request: Request, response: Response):
         if not settings.XCAPTCHA_ENABLE:
             return None
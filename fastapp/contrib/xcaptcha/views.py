@@ -18,7 +18,7 @@ class CaptchaAcquireView(View):
             )
 
         key = decrypt_ts_key(track_id)
-        response = await XCaptchaClient.from_config().acquire_challenges(key)
+        response = await XCaptchaClient.shared().acquire_challenges(key)
 
         resp_json = await response.json()
         if resp_json["status"] == "ok":
@@ -49,9 +49,9 @@ class CaptchaResolveView(View):
             )
 
         key = decrypt_ts_key(track_id)
-        response = XCaptchaClient.from_config().resolve_challenges(key, point, token)
+        response = await XCaptchaClient.shared().resolve_challenges(key, point, token)
 
-        resp_json = response.json()
+        resp_json = await response.json()
         if resp_json["status"] == "ok":
             data = resp_json.get("data")
         else:
@@ -1,10 +1,13 @@
+import asyncio
 import base64
 import binascii
 import functools
 import hashlib
 import importlib
 import math
+import os
 import warnings
+from concurrent.futures import ThreadPoolExecutor
 
 from fastapp.django.crypto import (
     RANDOM_STRING_CHARS,
@@ -88,9 +91,42 @@ def check_password(password, encoded, setter=None, preferred="default"):
     return is_correct
 
 
+_hashing_executor = None
+
+
+def get_hashing_executor():
+    """
+    Return the thread pool that runs password hashing off the event loop.
+
+    PBKDF2, Argon2 and bcrypt release the GIL while hashing, so a small pool
+    keeps logins from stalling other requests. Its size bounds how many hashes
+    run at once; further calls queue up in the pool.
+    """
+    global _hashing_executor
+    if _hashing_executor is None:
+        from fastapp.conf import settings
+
+        _hashing_executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASHING_MAX_WORKERS
+            or min(4, os.cpu_count() or 1),
+            thread_name_prefix="password-hasher",
+        )
+    return _hashing_executor
+
+
+async def averify_password(password, encoded, preferred="default"):
+    """See verify_password()."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hashing_executor(),
+        functools.partial(verify_password, password, encoded, preferred=preferred),
+    )
+
+
 async def acheck_password(password, encoded, setter=None, preferred="default"):
     """See check_password()."""
-    is_correct, must_update = verify_password(password, encoded, preferred=preferred)
+    is_correct, must_update = await averify_password(
+        password, encoded, preferred=preferred
+    )
     if setter and is_correct and must_update:
         await setter(password)
     return is_correct
@@ -118,6 +154,14 @@ def make_password(password, salt=None, hasher="default"):
     return hasher.encode(password, salt)
 
 
+async def amake_password(password, salt=None, hasher="default"):
+    """See make_password()."""
+    return await asyncio.get_running_loop().run_in_executor(
+        get_hashing_executor(),
+        functools.partial(make_password, password, salt=salt, hasher=hasher),
+    )
+
+
 @functools.lru_cache
 def get_hashers():
     hashers = []
@@ -1,5 +1,6 @@
 import asyncio
 import inspect
+import logging
 import socket
 from contextlib import _AsyncGeneratorContextManager, asynccontextmanager
 from pathlib import Path
@@ -34,6 +35,8 @@ from fastapp.router import APIRouter, router_convert
 from fastapp.utils.module_loading import import_string
 from fastapp.utils.typing import copy_method_signature
 
+logger = logging.getLogger("qingkong.error")
+
 
 @asynccontextmanager
 async def default_lifespan(app: RawFastAPI):
@@ -48,6 +51,16 @@ def lifespan_wrapper(lifespan: Callable[[RawFastAPI], _AsyncGeneratorContextMana
         await async_init_db(get_tortoise_config(settings.DATABASES))
         await init_cache()
 
+        if "fastapp.contrib.contenttypes" in settings.INSTALLED_APPS:
+            from fastapp.contrib.contenttypes.models import content_types
+
+            # 只读取，缺少的记录由 migrate 创建；表还不存在时退回按需查询
+            try:
+                await content_types.load()
+            except Exception as e:
+                logger.warning(f"Content types not preloaded: {e!r}")
+                content_types.clear()
+
         if p := settings.RATE_LIMITER_CLASS:
             import_string(p).init()
 
@@ -73,6 +86,11 @@ def lifespan_wrapper(lifespan: Callable[[RawFastAPI], _AsyncGeneratorContextMana
 
         await Tortoise.close_connections()
 
+        if p := settings.XCAPTCHA_LIMITER_CLASS:
+            # 自定义的限流类不一定实现 close
+            if close := getattr(import_string(p), "close", None):
+                await close()
+
         for conn in connections.values():
             await conn.close()
 
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, Dict, List, Optional, Type
 
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, Field
 from tortoise.fields.base import Field as TortoiseField
 from tortoise.fields.relational import RelationalField
 
@@ -17,6 +17,7 @@ from fastapp.models import QuerySet
 from fastapp.models.fields import DecimalField, JSONField
 from fastapp.models.fields.data import PositiveIntegerField, PositiveSmallIntegerField
 from fastapp.requests import QueryParamsWrap
+from fastapp.serializers.schema_cache import create_model
 
 try:
     from fastapp.models.fields.vector import VectorField
@@ -108,11 +109,10 @@ class FilterSetMetaclass(type):
                     if not isinstance(v, RelationalField)
                 }
 
-                field_filter_dict = {
-                    x: ["exact"] for x in set(non_related_fields_map.keys())
-                }
+                # 按模型字段顺序，生成的模型在每次启动时保持一致
+                field_filter_dict = {x: ["exact"] for x in non_related_fields_map}
                 if isinstance(fields, list) or isinstance(fields, tuple):
-                    field_filter_dict |= {x: ["exact"] for x in set(fields)}
+                    field_filter_dict |= {x: ["exact"] for x in fields}
                 elif isinstance(fields, dict):
                     field_filter_dict |= {
                         k: (v if isinstance(v, list) or isinstance(v, tuple) else [v])
@@ -206,7 +206,10 @@ class FilterSetMetaclass(type):
         # 动态创建Pydantic模型并附加到类属性
         if model_fields:
             pydantic_model = create_model(
-                f"{name}PydanticModel", __base__=BaseModel, **model_fields
+                f"{name}PydanticModel",
+                __base__=BaseModel,
+                __module__=__name__,
+                **model_fields,
             )
             new_class.PydanticModel = pydantic_model
         else:
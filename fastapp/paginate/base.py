@@ -2,6 +2,7 @@ from typing import Type
 
 from pydantic import BaseModel, Field
 
+from fastapp.paginate.count import CountStrategy
 from fastapp.responses import JSONResponse
 from fastapp.utils.sql import get_limit_offset
 
@@ -14,17 +15,20 @@ class BaseFilter(BaseModel):
 class BasePaginate:
     params_model: Type[BaseModel] = BaseFilter
 
+    # how the total is computed, see fastapp.paginate.count
+    count_strategy: CountStrategy = CountStrategy()
+
     @classmethod
     async def paginate_queryset(cls, queryset, request, view):
         request_filter = cls.params_model(**request.GET.to_dict())
         limit, offset = get_limit_offset(
             request_filter.page_size, request_filter.current
         )
-        total = await queryset.count()
-
-        view.total = total
+        page, view.total = await cls.count_strategy.paginate(
+            queryset, limit, offset, view
+        )
 
-        return queryset.offset(offset).limit(limit)
+        return page
 
     @classmethod
     def get_paginated_response(cls, data, total=None):
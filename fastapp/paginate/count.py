@@ -0,0 +1,214 @@
+"""
+Strategies for computing the total of a paginated queryset.
+
+Set one as ``count_strategy`` on a paginate class, for example::
+
+    class AuditPaginate(ProPaginate):
+        count_strategy = CachedCount(EstimatedCount(threshold=100000), timeout=30)
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+from pypika import Order
+from tortoise.expressions import RawSQL
+
+from fastapp.cache import caches
+from fastapp.cache.local import LRUCache
+
+logger = logging.getLogger("qingkong.error")
+
+
+def with_stable_ordering(queryset):
+    """
+    Make OFFSET pages deterministic: order by the primary key when nothing
+    orders the queryset, and append it as a tiebreak when the ordering does
+    not already end with a unique field.
+    """
+    meta = queryset.model._meta
+
+    orderings = list(queryset._orderings)
+    if not orderings and not queryset._annotations:
+        # the model default ordering, applied by tortoise when there is no other
+        orderings = list(meta.ordering)
+
+    if not orderings:
+        return queryset.order_by(meta.pk_attr)
+
+    field, order = orderings[-1]
+    field_object = meta.fields_map.get(field)
+    if field_object is not None and (field_object.pk or field_object.unique):
+        return queryset
+
+    return queryset.order_by(
+        *[f"-{f}" if o == Order.desc else f for f, o in orderings],
+        f"-{meta.pk_attr}" if order == Order.desc else meta.pk_attr,
+    )
+
+
+async def fetch_page(page, view=None) -> List[Any]:
+    """Evaluate a page, fetching the relations the view's serializer needs."""
+    serializer_class = view.get_serializer_class() if view is not None else None
+    if serializer_class is not None and hasattr(serializer_class, "apply_fetch_plan"):
+        page = serializer_class.apply_fetch_plan(page)
+    return await page
+
+
+class CountStrategy:
+    """Run the count, then return the page unevaluated. Exact and sequential."""
+
+    async def count(self, queryset) -> int:
+        return await queryset.count()
+
+    def get_page(self, queryset, limit: int, offset: int):
+        return with_stable_ordering(queryset).offset(offset).limit(limit)
+
+    async def paginate(self, queryset, limit: int, offset: int, view=None) -> Tuple:
+        """Return ``(page, total)``, page being a queryset or a list."""
+        total = await self.count(queryset)
+        return self.get_page(queryset, limit, offset), total
+
+
+ExactCount = CountStrategy
+
+
+class ConcurrentCount(CountStrategy):
+    """
+    Run the count and the page query at the same time. Outside a transaction
+    each query takes its own connection from the pool.
+    """
+
+    def __init__(self, inner: Optional[CountStrategy] = None):
+        self.inner = inner or CountStrategy()
+
+    async def count(self, queryset) -> int:
+        return await self.inner.count(queryset)
+
+    async def paginate(self, queryset, limit: int, offset: int, view=None) -> Tuple:
+        total, page = await asyncio.gather(
+            self.count(queryset),
+            fetch_page(self.get_page(queryset, limit, offset), view),
+        )
+        return page, total
+
+
+class WindowCount(CountStrategy):
+    """
+    Fetch the page and the total in one query with ``COUNT(*) OVER ()``.
+
+    A page past the end returns no row to read the total from, and falls back
+    to a separate count. Distinct querysets are counted separately as well,
+    the window would count the rows before ``DISTINCT``.
+    """
+
+    total_field = "window_total"
+
+    async def paginate(self, queryset, limit: int, offset: int, view=None) -> Tuple:
+        if queryset._distinct:
+            return await super().paginate(queryset, limit, offset, view)
+
+        page = await fetch_page(
+            self.get_page(queryset, limit, offset).annotate(
+                **{self.total_field: RawSQL("COUNT(*) OVER ()")}
+            ),
+            view,
+        )
+        if page:
+            return page, getattr(page[0], self.total_field)
+
+        return page, await self.count(queryset) if offset else 0
+
+
+class EstimatedCount(CountStrategy):
+    """
+    Use the query planner's row estimate when it is at least ``threshold``,
+    and an exact count below it. Estimates are available on PostgreSQL and
+    MySQL; other databases always get an exact count.
+    """
+
+    def __init__(self, threshold: int = 100000):
+        self.threshold = threshold
+
+    async def estimate(self, queryset) -> Optional[int]:
+        db = queryset._db or queryset._choose_db()
+        dialect = db.capabilities.dialect
+
+        try:
+            if dialect == "postgres":
+                _, rows = await db.execute_query(
+                    f"EXPLAIN (FORMAT JSON) {queryset.sql()}"
+                )
+                plan = rows[0]["QUERY PLAN"]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                return int(plan[0]["Plan"]["Plan Rows"])
+
+            if dialect == "mysql":
+                rows = await db.execute_query_dict(f"EXPLAIN {queryset.sql()}")
+                return int(rows[0]["rows"])
+        except Exception as e:
+            logger.warning(f"Count estimate failed: {e!r}")
+
+        return None
+
+    async def count(self, queryset) -> int:
+        estimate = await self.estimate(queryset)
+        if estimate is None or estimate < self.threshold:
+            return await queryset.count()
+        return estimate
+
+
+class CachedCount(CountStrategy):
+    """
+    Cache the totals of ``inner`` for ``timeout`` seconds, keyed by the SQL of
+    the queryset, that is by filter combination. Totals are kept in an
+    in-process LRU, or in the ``CACHES`` alias when one is given.
+    """
+
+    key_prefix = "fastapp:paginate:count"
+
+    def __init__(
+        self,
+        inner: Optional[CountStrategy] = None,
+        timeout: float = 60,
+        alias: Optional[str] = None,
+        maxsize: int = 1024,
+    ):
+        self.inner = inner or CountStrategy()
+        self.timeout = timeout
+        self.alias = alias
+        self.local = LRUCache(maxsize, timeout)
+
+    def make_key(self, queryset) -> str:
+        digest = hashlib.blake2b(queryset.sql().encode(), digest_size=16).hexdigest()
+        return f"{self.key_prefix}:{digest}"
+
+    async def count(self, queryset) -> int:
+        key = self.make_key(queryset)
+
+        if self.alias is None:
+            total = self.local.get(key)
+        else:
+            try:
+                total = await caches[self.alias].get(key)
+            except Exception as e:
+                logger.warning(f"Count cache get failed: {e!r}")
+                total = None
+
+        if total is not None:
+            return total
+
+        total = await self.inner.count(queryset)
+
+        if self.alias is None:
+            self.local.set(key, total)
+        else:
+            try:
+                await caches[self.alias].set(key, total, timeout=self.timeout)
+            except Exception as e:
+                logger.warning(f"Count cache set failed: {e!r}")
+
+        return total
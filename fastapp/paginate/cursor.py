@@ -0,0 +1,169 @@
+import base64
+import binascii
+import functools
+import json
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel, Field, TypeAdapter
+from pypika import Order
+from starlette import status
+
+from fastapp.exceptions import HttpCodeException
+from fastapp.models import Q
+from fastapp.paginate.count import fetch_page
+from fastapp.responses import JSONResponse
+
+
+class CursorFilter(BaseModel):
+    page_size: int = Field(default=20, gt=0)
+    cursor: Optional[str] = Field(default=None)
+
+
+class CursorPage(NamedTuple):
+    next: Optional[str]
+    previous: Optional[str]
+
+
+@functools.lru_cache(maxsize=None)
+def _type_adapter(field_type: type) -> TypeAdapter:
+    return TypeAdapter(field_type)
+
+
+class CursorPaginate:
+    """
+    Keyset pagination: the cursor carries the ordering values of the last row
+    seen, and the next page is fetched with ``WHERE (keys) > (values)`` instead
+    of ``OFFSET``, so every page costs the same however deep it is.
+
+    The ordering comes from ``ordering``, then the queryset, the view and the
+    model ``Meta``, and the primary key is appended as a tiebreak. Ordering fields
+    must be concrete, non-null columns of the model: NULL compares as neither
+    greater nor less, so rows holding it would be skipped, and any other
+    ordering is answered with a 400. The view's ``total`` holds the
+    :class:`CursorPage` of the current page; no count is run.
+    """
+
+    params_model: Type[BaseModel] = CursorFilter
+
+    ordering: Optional[Sequence[str]] = None
+    max_page_size: int = 1000
+
+    @classmethod
+    def get_ordering(cls, queryset, view=None) -> List[Tuple[str, bool]]:
+        """Return ``[(field, descending), ...]`` ending with the primary key."""
+        meta = queryset.model._meta
+
+        ordering = cls.ordering
+        if ordering:
+            ordering = [(x.lstrip("-"), x.startswith("-")) for x in ordering]
+        elif queryset._orderings:
+            ordering = [(f, o == Order.desc) for f, o in queryset._orderings]
+        elif getattr(view, "ordering", None):
+            ordering = [(x.lstrip("-"), x.startswith("-")) for x in view.ordering]
+        elif meta.ordering:
+            ordering = [(f, o == Order.desc) for f, o in meta.ordering]
+        else:
+            ordering = [(meta.pk_attr, True)]
+
+        ordering = [(meta.pk_attr if f == "pk" else f, desc) for f, desc in ordering]
+        for field, _ in ordering:
+            if field not in meta.fields_db_projection:
+                reason = "is not a column of"
+            elif meta.fields_map[field].null:
+                reason = "is nullable in"
+            else:
+                continue
+
+            raise HttpCodeException(
+                f'Cursor ordering field "{field}" {reason} '
+                f"{queryset.model.__name__}",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if ordering[-1][0] != meta.pk_attr:
+            ordering.append((meta.pk_attr, ordering[-1][1]))
+
+        return ordering
+
+    @classmethod
+    def encode_cursor(cls, obj, ordering, reverse: bool) -> str:
+        values = [getattr(obj, field) for field, _ in ordering]
+        data = json.dumps({"v": values, "r": reverse}, default=str).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    @classmethod
+    def decode_cursor(cls, cursor: str, model, ordering) -> Tuple[List[Any], bool]:
+        try:
+            padding = "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(cursor + padding))
+            values, reverse = data["v"], bool(data["r"])
+            if len(values) != len(ordering):
+                raise ValueError("cursor does not match ordering")
+
+            fields_map = model._meta.fields_map
+            values = [
+                _type_adapter(fields_map[field].field_type).validate_python(value)
+                for (field, _), value in zip(ordering, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError):
+            raise HttpCodeException(
+                "Invalid cursor", code=status.HTTP_400_BAD_REQUEST
+            )
+
+        return values, reverse
+
+    @staticmethod
+    def keyset_q(ordering, values, reverse: bool) -> Q:
+        """Rows strictly after ``values`` in ``ordering``, or before if reversed."""
+        q_list = []
+        for i, (field, desc) in enumerate(ordering):
+            lookup = "lt" if desc != reverse else "gt"
+            q_list.append(
+                Q(
+                    **{f: v for (f, _), v in zip(ordering[:i], values[:i])},
+                    **{f"{field}__{lookup}": values[i]},
+                )
+            )
+        return Q(*q_list, join_type=Q.OR)
+
+    @classmethod
+    async def paginate_queryset(cls, queryset, request, view):
+        request_filter = cls.params_model(**request.GET.to_dict())
+        limit = min(request_filter.page_size, cls.max_page_size)
+
+        ordering = cls.get_ordering(queryset, view)
+
+        reverse = False
+        if request_filter.cursor:
+            values, reverse = cls.decode_cursor(
+                request_filter.cursor, queryset.model, ordering
+            )
+            queryset = queryset.filter(cls.keyset_q(ordering, values, reverse))
+
+        queryset = queryset.order_by(
+            *[("-" if desc != reverse else "") + field for field, desc in ordering]
+        )
+        rows = await fetch_page(queryset.limit(limit + 1), view)
+
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = cls.encode_cursor(rows[-1], ordering, False)
+            if (has_more and reverse) or (request_filter.cursor and not reverse):
+                previous_cursor = cls.encode_cursor(rows[0], ordering, True)
+
+        view.total = CursorPage(next=next_cursor, previous=previous_cursor)
+
+        return rows
+
+    @classmethod
+    def get_paginated_response(cls, data, total: Optional[CursorPage] = None):
+        total = total or CursorPage(None, None)
+        return JSONResponse(
+            {"data": data, "next": total.next, "previous": total.previous}
+        )
@@ -1,9 +1,9 @@
 from pydantic import BaseModel, Field
 
 from fastapp.paginate.base import BasePaginate
+from fastapp.paginate.count import CountStrategy
 from fastapp.responses import JSONResponse
 from fastapp.utils.sql import get_limit_offset
-from fastapp.paginate.serializers import PaginateResponse
 
 class ProTableFilter(BaseModel):
     page_size: int = Field(default=20, alias="pageSize")
@@ -11,20 +11,24 @@ class ProTableFilter(BaseModel):
 
 
 class ProPaginateMixin:
+    count_strategy: CountStrategy = CountStrategy()
+
     async def paginate_queryset(self, queryset):
         try:
             request_filter = ProTableFilter(**self.request.GET.to_dict())
             limit, offset = get_limit_offset(
                 request_filter.page_size, request_filter.current
             )
-            self.total = await queryset.count()
-            return queryset.offset(offset).limit(limit)
+            page, self.total = await self.count_strategy.paginate(
+                queryset, limit, offset, self
+            )
+            return page
 
         except Exception:
             return None
 
     def get_paginated_response(self, data):
-        return JSONResponse(PaginateResponse(data=data, total=self.total, success=True).model_dump())
+        return JSONResponse({"data": data, "total": self.total, "success": True})
 
 
 class ProPaginate(BasePaginate):
@@ -0,0 +1,102 @@
+from functools import wraps
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, List, Optional
+
+from pypika import Table
+from tortoise.exceptions import OperationalError
+from tortoise.fields.relational import ManyToManyRelation
+
+if TYPE_CHECKING:
+    from tortoise.backends.base.client import BaseDBAsyncClient
+    from tortoise.models import Model
+
+# Called as receiver(relation, action) after add/remove/clear on any M2M relation
+m2m_changed_receivers: List[Callable[[ManyToManyRelation, str], Awaitable]] = []
+
+
+def connect_m2m_changed(receiver: Callable[[ManyToManyRelation, str], Awaitable]):
+    if receiver not in m2m_changed_receivers:
+        m2m_changed_receivers.append(receiver)
+    return receiver
+
+
+def _notify(method, action: str):
+    @wraps(method)
+    async def wrapper(self: ManyToManyRelation, *args, **kwargs):
+        result = await method(self, *args, **kwargs)
+        for receiver in m2m_changed_receivers:
+            await receiver(self, action)
+        return result
+
+    wrapper._m2m_notify = True
+    return wrapper
+
+
+for _action in ("add", "remove", "clear"):
+    _method = getattr(ManyToManyRelation, _action)
+    if not getattr(_method, "_m2m_notify", False):
+        setattr(ManyToManyRelation, _action, _notify(_method, _action))
+
+
+async def set_m2m(
+    relation: ManyToManyRelation,
+    instances: Iterable["Model"],
+    using_db: "Optional[BaseDBAsyncClient]" = None,
+) -> None:
+    """
+    Make ``instances`` the exact content of ``relation``.
+
+    The current rows are read once and diffed against ``instances``, then the
+    stale rows are removed with one DELETE and the missing ones inserted with
+    one multi-row INSERT. Receivers are notified as for ``remove`` and ``add``.
+    """
+    if not relation.instance._saved_in_db:
+        raise OperationalError(f"You should first call .save() on {relation.instance}")
+
+    db = using_db or relation.remote_model._meta.db
+    field = relation.field
+    through_table = Table(field.through)
+    backward_field = through_table[field.backward_key]
+    forward_field = through_table[field.forward_key]
+
+    pk_b = type(relation.instance)._meta.pk.to_db_value(
+        relation.instance.pk, relation.instance
+    )
+    related_pk_formatting_func = relation.remote_model._meta.pk.to_db_value
+
+    # dict 去重并保持顺序
+    pks_f = {}
+    for instance in instances:
+        if not instance._saved_in_db:
+            raise OperationalError(f"You should first call .save() on {instance}")
+        pks_f[related_pk_formatting_func(instance.pk, instance)] = None
+
+    select_query = (
+        db.query_class.from_(through_table)
+        .where(backward_field == pk_b)
+        .select(field.forward_key)
+    )
+    _, rows = await db.execute_query(str(select_query))
+    existing_pks_f = {
+        related_pk_formatting_func(r[field.forward_key], relation.instance)
+        for r in rows
+    }
+
+    if pks_f_to_delete := existing_pks_f.difference(pks_f):
+        query = (
+            db.query_class.from_(through_table)
+            .where((backward_field == pk_b) & forward_field.isin(list(pks_f_to_delete)))
+            .delete()
+        )
+        await db.execute_query(str(query))
+        for receiver in m2m_changed_receivers:
+            await receiver(relation, "remove")
+
+    if pks_f_to_insert := [x for x in pks_f if x not in existing_pks_f]:
+        query = db.query_class.into(through_table).columns(
+            forward_field, backward_field
+        )
+        for pk_f in pks_f_to_insert:
+            query = query.insert(pk_f, pk_b)
+        await db.execute_query(str(query))
+        for receiver in m2m_changed_receivers:
+            await receiver(relation, "add")
@@ -4,6 +4,7 @@ except ImportError:
     orjson = None
     import json
 
+import datetime
 import decimal
 import os
 import typing
@@ -21,10 +22,18 @@ from starlette.responses import RedirectResponse as RedirectResponse  # noqa
 from starlette.responses import Response as Response  # noqa
 from starlette.responses import StreamingResponse as StarletteStreamingResponse  # noqa
 
-from fastapp.utils.json import JSONEncoder, default_datetime_format, replace_nan
+from fastapp.utils.json import JSONEncoder, format_datetime, replace_nan
+
+if orjson:
+    # UUID 和 numpy 由 orjson 原生序列化，Decimal 交给 orjson_default
+    ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY
+    # datetime/date/time 不使用 orjson 的 RFC 3339 格式，交给 orjson_default 格式化
+    ORJSON_DATETIME_OPTIONS = ORJSON_OPTIONS | orjson.OPT_PASSTHROUGH_DATETIME
 
 
 def orjson_default(obj):
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return format_datetime(obj)
     if isinstance(obj, decimal.Decimal):
         return f"{obj:f}"
     if isinstance(obj, BaseModel):
@@ -33,6 +42,40 @@ def orjson_default(obj):
     raise TypeError
 
 
+def serializer_content(serializer) -> typing.Any:
+    """序列化器的响应内容，由 pydantic 直接输出 JSON，不再经过中间的 dict"""
+    if orjson:
+        return orjson.Fragment(serializer.model_dump_json())
+    return serializer.model_dump()
+
+
+def render_json(
+    content: typing.Any,
+    orjson_parse_datetime: bool = True,
+    json_replace_nan: bool = False,
+) -> bytes:
+    if orjson:
+        return orjson.dumps(
+            content,
+            default=orjson_default,
+            option=(
+                ORJSON_DATETIME_OPTIONS if orjson_parse_datetime else ORJSON_OPTIONS
+            ),
+        )
+
+    if json_replace_nan:
+        content = replace_nan(content)
+
+    return json.dumps(
+        content,
+        cls=JSONEncoder,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
 class JSONResponse(StarletteJSONResponse):
     # 到这边之前会被fastapi的serialize_response处理(fastapi.routing.serialize_response)
     # 还有可能被fastapi.encoders.jsonable_encoder处理
@@ -58,22 +101,11 @@ class JSONResponse(StarletteJSONResponse):
         if content is None:
             return b""
 
-        if orjson:
-            if self.orjson_parse_datetime:
-                content = default_datetime_format(content)
-            return orjson.dumps(content, default=orjson_default)
-
-        if self.json_replace_nan:
-            content = replace_nan(content)
-
-        return json.dumps(
+        return render_json(
             content,
-            cls=JSONEncoder,
-            ensure_ascii=False,
-            allow_nan=False,
-            indent=None,
-            separators=(",", ":"),
-        ).encode("utf-8")
+            orjson_parse_datetime=self.orjson_parse_datetime,
+            json_replace_nan=self.json_replace_nan,
+        )
 
 
 class JsonResponse(JSONResponse):
@@ -1,5 +1,8 @@
 import base64
+import functools
 import hashlib
+import secrets
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated, Any, Awaitable, Callable, Optional
 
@@ -14,12 +17,69 @@ from starlette.status import HTTP_401_UNAUTHORIZED
 from typing_extensions import Doc
 
 from common.settings import settings
+from fastapp.cache.local import LRUCache
 from fastapp.security.api_key import api_key_auth_factory, key_handler
+from fastapp.security.revocation import is_token_revoked, revoke_token_payload
 
 decode = jwt.decode
 
 ALGORITHM = "HS256"
 
+# 已验证 token 的进程内缓存：token 摘要 -> 解码后的 payload，按 exp 过期
+verified_tokens = LRUCache(maxsize=settings.JWT_VERIFIED_TOKEN_CACHE_SIZE)
+
+
+def _token_digest(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def decode_token(token: str) -> dict:
+    """
+    Decode and verify a token, reusing the result for tokens verified before.
+
+    Only tokens carrying an ``exp`` claim are cached, and each entry expires
+    together with its token. The cache replaces signature verification only;
+    version and revocation checks still run on every request.
+    """
+    if verified_tokens.maxsize <= 0 or not isinstance(token, str):
+        # 缺失的 token 交给 jwt.decode 抛出 InvalidTokenError
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+
+    key = _token_digest(token)
+    payload = verified_tokens.get(key)
+    if payload is not None:
+        return dict(payload)
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    if isinstance(exp := payload.get("exp"), (int, float)):
+        verified_tokens.set(
+            key, payload, expires_at=time.monotonic() + (exp - time.time())
+        )
+
+    return dict(payload)
+
+
+def forget_verified_token(token: str):
+    """Drop a token from the verified-token cache."""
+    verified_tokens.delete(_token_digest(token))
+
+
+async def revoke_token(token: str) -> bool:
+    """
+    Revoke a single token by its ``jti``, see fastapp.security.revocation.
+    Returns False when revocation is disabled or the token has no ``jti``.
+    """
+    payload = decode_token(token)
+    forget_verified_token(token)
+    return await revoke_token_payload(payload)
+
+
+@functools.lru_cache(maxsize=1024)
+def make_token_version(version_key: str) -> str:
+    return base64.b85encode(hashlib.blake2s(version_key.encode()).digest()).decode(
+        "utf-8"
+    )
+
 
 class GlobalBearerTokenHeader(APIKeyBase):
     def __init__(
@@ -101,15 +161,10 @@ def create_token(
     to_encode.update(
         {"exp": expire, "iss": settings.PROJECT_NAME or settings.BASE_DIR.name}
     )
+    to_encode.setdefault("jti", secrets.token_urlsafe(16))
 
     if version_key:
-        to_encode.update(
-            {
-                "ver": base64.b85encode(
-                    hashlib.blake2s(version_key.encode()).digest()
-                ).decode("utf-8")
-            }
-        )
+        to_encode.update({"ver": make_token_version(version_key)})
 
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
@@ -118,9 +173,9 @@ def create_token(
 async def jwt_validator(request: Request, token: str) -> Any:  # pylint: disable=W0613
     """jwt_validator"""
 
-    payload = jwt.decode(
-        token, settings.SECRET_KEY, algorithms=[ALGORITHM], verify=True
-    )
+    payload = decode_token(token)
+    if await is_token_revoked(payload):
+        raise InvalidTokenError("Token has been revoked")
 
     return payload
 
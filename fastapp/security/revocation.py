@@ -0,0 +1,301 @@
+"Per-token (jti) revocation backed by a CACHES alias."
+
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from typing import Dict, List, Optional
+
+from fastapp.cache import caches
+from fastapp.conf import settings
+from fastapp.exceptions import ImproperlyConfigured
+
+logger = logging.getLogger("qingkong.error")
+
+
+class BloomFilter:
+    """A fixed-size Bloom filter over strings.
+
+    ``in`` never misses an added item; it may report an item that was never
+    added with a probability of about ``error_rate`` while it holds at most
+    ``capacity`` items. ``expires_at`` is the latest expiry of the items.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+        self.expires_at = 0.0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little")
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str, exp: Optional[float] = None):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+        self.extend(exp)
+
+    def extend(self, exp: Optional[float]):
+        self.expires_at = max(self.expires_at, math.inf if exp is None else exp)
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item)
+        )
+
+
+class TokenRevocationList:
+    """
+    Revoked token ids, stored in a ``CACHES`` alias until the token expires.
+
+    Every revocation is also appended to a numbered log in the cache. Each
+    worker replays new log entries into local Bloom filters at most every
+    ``sync_interval`` seconds, so tokens that were never revoked, the common
+    case, are decided in memory; filter hits are confirmed against the cache.
+    A revocation therefore reaches every worker within ``sync_interval``.
+
+    A full filter gets a new one next to it, and a filter is dropped once
+    all of its tokens have expired. Every ``snapshot_interval`` entries one
+    worker stores its filters in the cache, and a new worker starts from
+    that snapshot instead of replaying the whole log.
+
+    Until the first sync has succeeded every token is reported as revoked,
+    concurrent requests wait for that sync rather than skip it.
+
+    The alias cache must increment atomically, the log numbers come from
+    ``incr()``.
+    """
+
+    key_prefix = "fastapp:jwt:revoked"
+
+    # get_many() 每批读取的日志条数
+    replay_batch_size = 1000
+
+    # 日志条目在 incr 之后才写入，缺失的条目在此时间（秒）内每次同步都重试
+    pending_timeout: float = 60
+
+    # 每追加这么多条日志保存一次过滤器快照
+    snapshot_interval = 1000
+
+    def __init__(
+        self,
+        alias: str = "default",
+        sync_interval: float = 1,
+        capacity: int = 100000,
+        error_rate: float = 0.001,
+    ):
+        self.alias = alias
+        self.sync_interval = sync_interval
+        self.capacity = capacity
+        self.error_rate = error_rate
+
+        self.filters: List[BloomFilter] = []
+        self.seq = 0
+        # 已读到但还没有写入的日志序号 -> 首次发现的时间
+        self.pending: Dict[int, float] = {}
+        self.snapshot_seq = 0
+        self.synced_at = 0.0
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+    @property
+    def seq_key(self) -> str:
+        return f"{self.key_prefix}:seq"
+
+    @property
+    def snapshot_key(self) -> str:
+        return f"{self.key_prefix}:snapshot"
+
+    def make_key(self, jti: str) -> str:
+        return f"{self.key_prefix}:jti:{jti}"
+
+    def make_log_key(self, seq: int) -> str:
+        return f"{self.key_prefix}:log:{seq}"
+
+    def _add(self, jti: str, exp: Optional[float]):
+        for bloom in self.filters:
+            if jti in bloom:
+                # 重放到自己吊销的条目（或误判），保证该过滤器保留到 exp 即可
+                bloom.extend(exp)
+                return
+
+        if not self.filters or self.filters[-1].count >= self.capacity:
+            self.filters.append(BloomFilter(self.capacity, self.error_rate))
+        self.filters[-1].add(jti, exp)
+
+    def _reset(self):
+        self.filters, self.seq, self.pending = [], 0, {}
+        self.snapshot_seq = 0
+
+    def _dump_snapshot(self) -> dict:
+        return {
+            "seq": self.seq,
+            "pending": list(self.pending),
+            "filters": [(bytes(f.bits), f.count, f.expires_at) for f in self.filters],
+        }
+
+    def _load_snapshot(self, snapshot: dict) -> bool:
+        filters = []
+        for bits, count, expires_at in snapshot["filters"]:
+            bloom = BloomFilter(self.capacity, self.error_rate)
+            if len(bits) != len(bloom.bits):
+                # 快照来自不同的容量或误判率配置
+                return False
+            bloom.bits = bytearray(bits)
+            bloom.count, bloom.expires_at = count, expires_at
+            filters.append(bloom)
+
+        now = time.monotonic()
+        self.filters, self.seq = filters, snapshot["seq"]
+        self.pending = {seq: now for seq in snapshot["pending"]}
+        self.snapshot_seq = self.seq
+        return True
+
+    async def _replay(self, cache, seqs: List[int]):
+        now = time.monotonic()
+        for i in range(0, len(seqs), self.replay_batch_size):
+            batch = seqs[i : i + self.replay_batch_size]
+            entries = await cache.get_many([self.make_log_key(x) for x in batch])
+            for seq in batch:
+                entry = entries.get(self.make_log_key(seq))
+                if entry is not None:
+                    self._add(*entry)
+                    self.pending.pop(seq, None)
+                elif now - self.pending.setdefault(seq, now) >= self.pending_timeout:
+                    # 条目过期了（令牌也已过期），或写入方中途失败
+                    del self.pending[seq]
+
+    async def _sync(self):
+        now = time.monotonic()
+        if self.loaded and (
+            now - self.synced_at < self.sync_interval or self.lock.locked()
+        ):
+            return
+
+        # 首次加载完成前不能跳过，等待正在进行的同步
+        async with self.lock:
+            if self.synced_at >= now:
+                # 等待期间已经同步过（或失败过）
+                return
+
+            self.synced_at = time.monotonic()
+            cache = caches[self.alias]
+            try:
+                if not self.loaded:
+                    snapshot = await cache.get(self.snapshot_key)
+                    if snapshot is not None and not self._load_snapshot(snapshot):
+                        self._reset()
+
+                seq = await cache.get(self.seq_key, 0)
+                if seq < self.seq:
+                    # 日志被清空了
+                    self._reset()
+
+                await self._replay(
+                    cache, sorted(self.pending) + list(range(self.seq + 1, seq + 1))
+                )
+                self.seq = seq
+                self.loaded = True
+
+                wall = time.time()
+                self.filters = [f for f in self.filters if f.expires_at > wall]
+
+                if self.seq - self.snapshot_seq >= self.snapshot_interval:
+                    await self._save_snapshot(cache)
+            except Exception as e:
+                logger.warning(f"Token revocation sync failed: {e!r}")
+
+    async def _save_snapshot(self, cache):
+        self.snapshot_seq = self.seq
+        # 每个区间只由一个 worker 保存
+        lock_key = f"{self.snapshot_key}:lock:{self.seq // self.snapshot_interval}"
+        if await cache.add(lock_key, 1, timeout=self.pending_timeout):
+            await cache.set(self.snapshot_key, self._dump_snapshot(), timeout=None)
+
+    async def revoke(self, jti: str, exp: Optional[float] = None):
+        """Revoke ``jti`` until ``exp`` (a unix timestamp), or for good."""
+        timeout = None if exp is None else max(1, math.ceil(exp - time.time()))
+
+        cache = caches[self.alias]
+        await cache.set(self.make_key(jti), 1, timeout=timeout)
+
+        await cache.add(self.seq_key, 0, timeout=None)
+        seq = await cache.incr(self.seq_key)
+        await cache.set(self.make_log_key(seq), (jti, exp), timeout=timeout)
+
+        self._add(jti, exp)
+
+    async def is_revoked(self, jti: str) -> bool:
+        await self._sync()
+        if not self.loaded:
+            # 还没有成功同步过，按已吊销处理
+            return True
+        if not any(jti in bloom for bloom in self.filters):
+            return False
+
+        try:
+            return await caches[self.alias].get(self.make_key(jti)) is not None
+        except Exception as e:
+            logger.warning(f"Token revocation lookup failed: {e!r}")
+            return True
+
+
+_revocation_list: Optional[TokenRevocationList] = None
+
+
+def get_token_revocation_list() -> Optional[TokenRevocationList]:
+    """Return the token revocation list, or None when revocation is disabled."""
+    global _revocation_list
+
+    if not settings.JWT_REVOCATION_ENABLE:
+        return None
+
+    if _revocation_list is None:
+        alias = settings.JWT_REVOCATION_CACHE_ALIAS
+        if not getattr(caches[alias], "atomic_incr", False):
+            raise ImproperlyConfigured(
+                f"JWT_REVOCATION_CACHE_ALIAS {alias!r} does not increment atomically"
+            )
+        _revocation_list = TokenRevocationList(
+            alias=alias,
+            sync_interval=settings.JWT_REVOCATION_SYNC_INTERVAL,
+            capacity=settings.JWT_REVOCATION_FILTER_CAPACITY,
+            error_rate=settings.JWT_REVOCATION_FILTER_ERROR_RATE,
+        )
+    return _revocation_list
+
+
+async def is_token_revoked(payload: dict) -> bool:
+    """Tokens without a ``jti`` claim can not be revoked individually."""
+    revocation_list = get_token_revocation_list()
+    if revocation_list is None or not (jti := payload.get("jti")):
+        return False
+
+    return await revocation_list.is_revoked(jti)
+
+
+async def revoke_token_payload(payload: dict) -> bool:
+    """
+    Revoke a decoded token, return False when it can not be revoked.
+
+    An access token names the refresh token it was issued with in its ``rti``
+    claim, that refresh token is revoked as well.
+    """
+    revocation_list = get_token_revocation_list()
+    if revocation_list is None or not (jti := payload.get("jti")):
+        return False
+
+    await revocation_list.revoke(jti, payload.get("exp"))
+    if rti := payload.get("rti"):
+        # 刷新令牌不会晚于这个时间过期
+        exp = time.time() + settings.REFRESH_TOKEN_LIFETIME
+        await revocation_list.revoke(rti, exp)
+    return True
@@ -228,6 +228,12 @@ class SerializerModel(
             serialize_as_any=serialize_as_any,
         )
 
+    @copy_method_signature(BaseModel.model_dump_json)
+    def model_dump_json(self, *, indent: int | None = None, **kwargs) -> str:
+        return self.pydantic_model.__pydantic_serializer__.to_json(
+            self.instance, indent=indent, **kwargs
+        ).decode()
+
     @classmethod
     def __get_pydantic_core_schema__(
         cls, source: type[BaseModel], handler: GetCoreSchemaHandler, /
@@ -19,7 +19,6 @@ from pydantic import (
     ConfigDict,
     Field,
     computed_field,
-    create_model,
 )
 from pydantic._internal._decorators import PydanticDescriptorProxy
 from tortoise.contrib.pydantic.base import PydanticModel
@@ -36,6 +35,7 @@ from tortoise.fields import IntField, JSONField, TextField, relational
 
 from fastapp.models.fields import DateField, DateTimeField
 from fastapp.serializers.fields import ListSerializer
+from fastapp.serializers.schema_cache import create_model
 
 if TYPE_CHECKING:  # pragma: nocoverage
     from tortoise.models import Model
@@ -57,6 +57,35 @@ class PydanticMeta(RawPydanticMeta):
     hidden_fields: Tuple[str, ...] = ()
 
 
+# Tortoise 模型描述的进程内缓存，模型初始化之后字段不再变化
+_DESCRIPTIONS: Dict[type, dict] = {}
+
+
+def describe_model(cls: "Type[Model]") -> dict:
+    """``cls.describe(serializable=False)``, described once per initialised model."""
+    if not cls._meta._inited:
+        return cls.describe(serializable=False)
+
+    description = _DESCRIPTIONS.get(cls)
+    if description is None:
+        description = _DESCRIPTIONS[cls] = cls.describe(serializable=False)
+
+    # 生成模型时会修改字段描述，每次返回一份副本
+    def copy_field(fd):
+        if isinstance(fd, dict) and "constraints" in fd:
+            return dict(fd, constraints=dict(fd["constraints"]))
+        return fd
+
+    return {
+        key: (
+            [copy_field(x) for x in value]
+            if isinstance(value, list)
+            else copy_field(value)
+        )
+        for key, value in description.items()
+    }
+
+
 def field_map_process(field_map):
     for name, desc in field_map.items():
         if desc["default"] is None:
@@ -212,7 +241,7 @@ def pydantic_model_creator(
     properties: Dict[str, Any] = {}
 
     # Get model description
-    model_description = cls.describe(serializable=False)
+    model_description = describe_model(cls)
 
     # Field map we use
     field_map: Dict[str, dict] = {}
@@ -1,20 +1,40 @@
 import asyncio
+import functools
 from collections import defaultdict
-from datetime import date, datetime
-from typing import Any, Dict, Iterable, List, Optional, Self, Tuple, Type, Union
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    NamedTuple,
+    Self,
+    Tuple,
+    Type,
+    Union,
+    get_args,
+    get_origin,
+)
+from uuid import UUID
 
-from pydantic import BaseModel, ValidationInfo, model_validator
+from pydantic import BaseModel, ValidationError, ValidationInfo, model_validator
 from pydantic._internal import _model_construction
 from pydantic.main import IncEx
 from tortoise.backends.base.client import BaseDBAsyncClient
 from tortoise.contrib.pydantic.base import PydanticModel
 from tortoise.fields import Field
 from tortoise.fields.relational import BackwardFKRelation
+from tortoise.models import Model as TortoiseModel
 from tortoise.transactions import in_transaction
 
 from fastapp.conf import settings
 from fastapp.models.base import BaseModel as BaseDBModel
 from fastapp.models.base import QuerySet
+from fastapp.models.exceptions import DoesNotExist
+from fastapp.patchs.tortoise.relations import set_m2m
 from fastapp.serializers.base import (
     BaseSerializer,
     get_serializer_map,
@@ -24,6 +44,7 @@ from fastapp.serializers.base import (
 from fastapp.serializers.creator import pydantic_model_creator
 from fastapp.utils.context import BlankContextManager
 from fastapp.utils.functional import copy_method_signature
+from fastapp.utils.json import format_datetime
 
 try:
     from fastapp.models.fields.vector import VectorField
@@ -31,6 +52,19 @@ except ImportError:
     VectorField = None
 
 
+def _unwrap_relation_type(field_type):
+    origin = getattr(field_type, "__origin__", None)
+    if origin in (list, List, Union):
+        field_type = field_type.__args__[0]
+
+    # noinspection PyProtectedMember
+    sub_origin = getattr(field_type, "__origin__", None)
+    if sub_origin is Union:
+        field_type = field_type.__args__[0]
+
+    return field_type
+
+
 def _get_fetch_fields(
     pydantic_class: "Type[PydanticModel]", model_class: "Type[BaseDBModel]"
 ) -> List[str]:
@@ -42,14 +76,7 @@ def _get_fetch_fields(
     """
     fetch_fields = []
     for field_name, field_type in pydantic_class.__annotations__.items():
-        origin = getattr(field_type, "__origin__", None)
-        if origin in (list, List, Union):
-            field_type = field_type.__args__[0]
-
-        # noinspection PyProtectedMember
-        sub_origin = getattr(field_type, "__origin__", None)
-        if sub_origin is Union:
-            field_type = field_type.__args__[0]
+        field_type = _unwrap_relation_type(field_type)
 
         if field_name in model_class._meta.fetch_fields and issubclass(
             field_type, PydanticModel
@@ -66,6 +93,202 @@ def _get_fetch_fields(
     return fetch_fields
 
 
+class FetchPlan(NamedTuple):
+    select_related: Tuple[str, ...]
+    prefetch_related: Tuple[str, ...]
+    # 为空表示查询所有列
+    only: Tuple[str, ...]
+
+
+def _has_custom_validators(pydantic_class: "Type[PydanticModel]") -> bool:
+    """Validators and computed fields may read any attribute of the instance."""
+    decorators = pydantic_class.__pydantic_decorators__
+    return bool(
+        decorators.validators
+        or set(decorators.field_validators) - {"_tortoise_convert"}
+        or decorators.computed_fields
+        or set(decorators.model_validators) - {"remove_hidden_fields"}
+    )
+
+
+def _nested_serializers(pydantic_class: "Type[PydanticModel]"):
+    """Yield ``(field_name, serializer)`` for the relations a serializer nests."""
+    meta = pydantic_class.model_config["orig_model"]._meta
+    for field_name, field_type in pydantic_class.__annotations__.items():
+        field_type = _unwrap_relation_type(field_type)
+        if field_name in meta.fetch_fields and (
+            isinstance(field_type, type) and issubclass(field_type, PydanticModel)
+        ):
+            yield field_name, field_type
+
+
+def _is_forward(pydantic_class: "Type[PydanticModel]", field_name: str) -> bool:
+    meta = pydantic_class.model_config["orig_model"]._meta
+    return field_name in meta.fk_fields or field_name in meta.o2o_fields
+
+
+def _needs_prefetch(pydantic_class: "Type[PydanticModel]") -> bool:
+    """Whether a reverse or many-to-many relation is loaded at or below it."""
+    return any(
+        not _is_forward(pydantic_class, field_name) or _needs_prefetch(field_type)
+        for field_name, field_type in _nested_serializers(pydantic_class)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _get_fetch_plan(pydantic_class: "Type[PydanticModel]") -> FetchPlan:
+    """
+    Plan how to load a queryset for a serializer: forward foreign keys and
+    one-to-one relations are joined with ``select_related()``, reverse and
+    many-to-many relations, and anything below them, are batch prefetched,
+    and when every field is a column or one of those relations, only the
+    serializer's columns are selected.
+
+    A forward relation with a prefetch below it is prefetched as well, since
+    prefetching a path loads every relation on it again and would replace
+    the joined objects.
+    """
+    select_related: List[str] = []
+    prefetch_related: List[str] = []
+
+    def collect(pydantic_class, prefix: str, joinable: bool):
+        for field_name, field_type in _nested_serializers(pydantic_class):
+            path = prefix + field_name
+            join = (
+                joinable
+                and _is_forward(pydantic_class, field_name)
+                and not _needs_prefetch(field_type)
+            )
+            (select_related if join else prefetch_related).append(path)
+            collect(field_type, path + "__", join)
+
+    model_class = pydantic_class.model_config["orig_model"]
+    collect(pydantic_class, "", True)
+
+    # 只保留最深的路径，上层关系会随之加载
+    def leaves(paths: List[str]) -> Tuple[str, ...]:
+        return tuple(x for x in paths if not any(y.startswith(x + "__") for y in paths))
+
+    meta = model_class._meta
+    only = [meta.pk_attr]
+    for field_name in pydantic_class.model_fields:
+        if field_name in meta.fields_db_projection:
+            only.append(field_name)
+        elif field_name in meta.fk_fields or field_name in meta.o2o_fields:
+            # 加载外键关系需要外键列
+            only.append(meta.fields_map[field_name].source_field)
+        elif field_name not in meta.fetch_fields:
+            only = []
+            break
+
+    only = list(dict.fromkeys(only))
+    if _has_custom_validators(pydantic_class) or len(only) == len(
+        meta.fields_db_projection
+    ):
+        only = []
+
+    return FetchPlan(leaves(select_related), leaves(prefetch_related), tuple(only))
+
+
+# 校验和 python 模式导出都不会改变取值的字段类型，可以直接使用数据库返回的值
+VALUES_PASSTHROUGH_TYPES = (
+    str,
+    int,
+    float,
+    bool,
+    Decimal,
+    UUID,
+    datetime,
+    date,
+    time,
+    dict,
+    list,
+    Any,
+)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_values_plan(
+    pydantic_class: "Type[PydanticModel]",
+) -> Optional[Tuple[List[str], Callable[[Any], Dict[str, Any]]]]:
+    """
+    Compile the ``values_list()`` paths of a serializer and a function turning
+    one raw database row into the dict ``model_dump()`` would return, foreign
+    keys joined as nested dicts. Return None when the output can not be
+    reproduced from column values.
+    """
+    paths: Dict[str, int] = {}
+    converters: Dict[str, Callable] = {}
+
+    def column(meta, name: str, prefix: str) -> str:
+        path = prefix + name
+        index = paths.setdefault(path, len(paths))
+        if any(x[1] == name for x in meta.db_native_fields):
+            return f"r[{str(index)!r}]"
+
+        converters[f"c{index}"] = meta.fields_map[name].to_python_value
+        return f"c{index}(r[{str(index)!r}])"
+
+    def build(pydantic_class, model_class, prefix: str, exclude) -> Optional[str]:
+        decorators = pydantic_class.__pydantic_decorators__
+        if (
+            _has_custom_validators(pydantic_class)
+            or decorators.field_serializers
+            or decorators.model_serializers
+        ):
+            return None
+
+        meta = model_class._meta
+        items = []
+        for name, field_info in pydantic_class.model_fields.items():
+            if name in exclude:
+                continue
+
+            annotations = [field_info.annotation]
+            if get_origin(field_info.annotation) is Union:
+                annotations = [
+                    x for x in get_args(field_info.annotation) if x is not type(None)
+                ]
+
+            if name in meta.fields_db_projection:
+                if any(x not in VALUES_PASSTHROUGH_TYPES for x in annotations):
+                    return None
+                items.append(f"{name!r}: {column(meta, name, prefix)}")
+
+            elif name in meta.fk_fields or name in meta.o2o_fields:
+                annotation = annotations[0]
+                if len(annotations) != 1 or not (
+                    isinstance(annotation, type) and issubclass(annotation, BaseModel)
+                ):
+                    return None
+
+                field = meta.fields_map[name]
+                related_meta = field.related_model._meta
+                value = build(annotation, field.related_model, f"{prefix}{name}__", ())
+                if value is None:
+                    return None
+                if field.null:
+                    pk = column(related_meta, related_meta.pk_attr, f"{prefix}{name}__")
+                    value = f"(None if {pk} is None else {value})"
+                items.append(f"{name!r}: {value}")
+
+            else:
+                return None
+
+        return "{" + ", ".join(items) + "}"
+
+    source = build(
+        pydantic_class,
+        pydantic_class.model_config["orig_model"],
+        "",
+        set(pydantic_class.model_config["write_only_fields"]),
+    )
+    if source is None:
+        return None
+
+    return list(paths), eval(f"lambda r: {source}", converters)
+
+
 def merge_dicts(data: List[Tuple[Dict[str, Any]]]) -> Dict[str, Any]:
     result = {}
 
@@ -75,6 +298,76 @@ def merge_dicts(data: List[Tuple[Dict[str, Any]]]) -> Dict[str, Any]:
     return result
 
 
+class RelatedObjectsMap:
+    """
+    Identity map of the rows a serializer refers to by id.
+
+    The ids of the serializer, its nested serializers and relations are
+    collected first, then each model is queried once with ``pk__in``, so the
+    number of queries does not grow with the number of related items.
+    """
+
+    def __init__(self, using_db: Optional[BaseDBAsyncClient] = None):
+        self.using_db = using_db
+        self.objects: Dict[Type[BaseDBModel], Dict[Any, BaseDBModel]] = defaultdict(
+            dict
+        )
+        self.pending: Dict[Type[BaseDBModel], set] = defaultdict(set)
+
+    @classmethod
+    async def for_serializer(
+        cls,
+        serializer: "ModelSerializerPydanticModel",
+        using_db: Optional[BaseDBAsyncClient] = None,
+    ) -> Self:
+        identity_map = cls(using_db)
+        identity_map.collect(serializer)
+        await identity_map.load()
+        return identity_map
+
+    def add(self, model: Type[BaseDBModel], pk: Any):
+        # 请求中的id可能是字符串
+        pk = model._meta.pk.to_python_value(pk)
+        if pk not in self.objects[model]:
+            self.pending[model].add(pk)
+
+    def collect(self, serializer: "ModelSerializerPydanticModel"):
+        """Collect the ids ``serializer.save()`` will need, nested ones included."""
+        if (pk := getattr(serializer, "id", None)) and serializer._instance is None:
+            self.add(serializer.orig_model(), pk)
+
+        model_description = serializer.model_description()
+        for field in model_description.get("m2m_fields", []) + model_description.get(
+            "backward_fk_fields", []
+        ):
+            value = getattr(serializer, field["name"], None)
+            if not isinstance(value, Iterable):
+                continue
+
+            for sub_value in value:
+                if isinstance(sub_value, ModelSerializerPydanticModel):
+                    self.collect(sub_value)
+                elif isinstance(sub_value, dict):
+                    if sub_object_id := sub_value.get("id", None):
+                        self.add(field["python_type"], sub_object_id)
+                else:
+                    self.add(field["python_type"], sub_value)
+
+    async def load(self):
+        for model, pks in self.pending.items():
+            if not pks:
+                continue
+            for obj in await model.objects.filter(pk__in=pks).using_db(self.using_db):
+                self.objects[model][obj.pk] = obj
+        self.pending.clear()
+
+    def get(self, model: Type[BaseDBModel], pk: Any) -> BaseDBModel:
+        obj = self.objects[model].get(model._meta.pk.to_python_value(pk))
+        if obj is None:
+            raise DoesNotExist(f"{model.__name__} has no object with pk {pk!r}")
+        return obj
+
+
 class ModelSerializerMetaclass(_model_construction.ModelMetaclass):
     # TODO
     # read_only_fields = ['account_name']
@@ -168,6 +461,7 @@ class ModelSerializerMetaclass(_model_construction.ModelMetaclass):
 class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetaclass):
     _instance: Optional[BaseDBModel] = None
     _instance_processed: bool = False
+    _partial: bool = False
 
     _meta = None
 
@@ -214,6 +508,17 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
             exclude = exclude + self.write_only_fields()
         return super().model_dump(exclude=exclude, **kwargs)
 
+    @copy_method_signature(PydanticModel.model_dump_json)
+    def model_dump_json(
+        self, exclude: IncEx | None = None, exclude_write_only=True, **kwargs
+    ) -> str:
+        exclude = exclude or []
+        if exclude_write_only:
+            if isinstance(exclude, set):
+                exclude = list(exclude)
+            exclude = exclude + self.write_only_fields()
+        return super().model_dump_json(exclude=exclude, **kwargs)
+
     @classmethod
     def read_only_fields(cls):
         return cls.model_config["read_only_fields"]
@@ -278,7 +583,11 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
         if getattr(self, "id", None):
             # 允许嵌套的部分更新
             related_model = self.orig_model()
-            obj = await related_model.get(id=self.id)
+            if self._instance is not None and self._instance.pk == self.id:
+                # 已经批量加载过
+                obj = self._instance
+            else:
+                obj = await related_model.get(id=self.id)
             model_data = {
                 k: getattr(obj, k)
                 for k in [x["name"] for x in related_model._meta.data_fields()]
@@ -319,11 +628,23 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
         force_create: bool = False,
         force_update: bool = False,
         is_in_transaction: bool = False,
+        identity_map: Optional[RelatedObjectsMap] = None,
         **extra_fields,
     ):
+        if self._partial:
+            return await self._save_partial(
+                using_db, is_in_transaction, identity_map, **extra_fields
+            )
+
         m2m_fields = self.model_description().get("m2m_fields", [])
         backward_fk_fields = self.model_description().get("backward_fk_fields", [])
 
+        if identity_map is None:
+            identity_map = await RelatedObjectsMap.for_serializer(self, using_db)
+
+        if getattr(self, "id", None) and self._instance is None:
+            self._instance = identity_map.get(self.orig_model(), self.id)
+
         instance = await self.to_model(**extra_fields)
 
         transaction_context_manager = (
@@ -335,32 +656,160 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
             await instance.save(using_db, update_fields, force_create, force_update)
 
             m2m_objects = await self._build_related_objects(
-                m2m_fields, using_db=using_db
+                m2m_fields, using_db=using_db, identity_map=identity_map
             )
 
-            # FIXME 更新时可能导致m2m字段丢失
             for f in m2m_fields:
-                field = getattr(instance, f["name"])
-                await field.clear()
-
-                related_objects = m2m_objects.get(f["name"])
-                if not related_objects:
+                # 未提交的m2m字段保持不变
+                if f["name"] not in self.model_fields_set:
                     continue
 
-                for obj in related_objects:
-                    await field.add(obj)
+                await set_m2m(
+                    getattr(instance, f["name"]),
+                    m2m_objects.get(f["name"], []),
+                    using_db=using_db,
+                )
 
             await self._build_related_objects(
-                backward_fk_fields, related_instance=instance, using_db=using_db
+                backward_fk_fields,
+                related_instance=instance,
+                using_db=using_db,
+                identity_map=identity_map,
             )
         return instance
 
+    async def _save_partial(
+        self,
+        using_db: Optional[BaseDBAsyncClient] = None,
+        is_in_transaction: bool = False,
+        identity_map: Optional[RelatedObjectsMap] = None,
+        **extra_fields,
+    ):
+        instance = self._instance
+        meta = instance._meta
+        supplied = self.model_fields_set | extra_fields.keys()
+
+        read_only_fields = set(self.read_only_fields())
+        update_fields = [
+            name
+            for name in meta.fields_db_projection
+            if name in supplied
+            and name not in read_only_fields
+            and name != meta.pk_attr
+        ]
+        for name in update_fields:
+            setattr(
+                instance,
+                name,
+                extra_fields[name] if name in extra_fields else getattr(self, name),
+            )
+        if update_fields:
+            update_fields += [
+                name
+                for name, field in meta.fields_map.items()
+                if getattr(field, "auto_now", False) and name not in update_fields
+            ]
+
+        model_description = self.model_description()
+        m2m_fields = [
+            f for f in model_description.get("m2m_fields", []) if f["name"] in supplied
+        ]
+        backward_fk_fields = [
+            f
+            for f in model_description.get("backward_fk_fields", [])
+            if f["name"] in supplied
+        ]
+
+        if identity_map is None and (m2m_fields or backward_fk_fields):
+            identity_map = await RelatedObjectsMap.for_serializer(self, using_db)
+
+        transaction_context_manager = (
+            in_transaction
+            if (m2m_fields or backward_fk_fields) and not is_in_transaction
+            else BlankContextManager
+        )
+
+        async with transaction_context_manager(instance.app.default_connection):
+            if update_fields:
+                await self._update_columns(instance, update_fields, using_db)
+
+            if m2m_fields:
+                m2m_objects = await self._build_related_objects(
+                    m2m_fields, using_db=using_db, identity_map=identity_map
+                )
+                for f in m2m_fields:
+                    await set_m2m(
+                        getattr(instance, f["name"]),
+                        m2m_objects.get(f["name"], []),
+                        using_db=using_db,
+                    )
+
+            if backward_fk_fields:
+                await self._build_related_objects(
+                    backward_fk_fields,
+                    related_instance=instance,
+                    using_db=using_db,
+                    identity_map=identity_map,
+                )
+        return instance
+
+    async def _update_columns(
+        self,
+        instance: BaseDBModel,
+        update_fields: List[str],
+        using_db: Optional[BaseDBAsyncClient] = None,
+    ):
+        """
+        ``UPDATE`` only ``update_fields``. With ``Meta.partial_update_returning``
+        on PostgreSQL and SQLite the row is read back with ``RETURNING``, so
+        values set by the database are in the response without another query.
+        """
+        db = using_db or instance._choose_db(True)
+        if not (
+            getattr(self._my_meta, "partial_update_returning", False)
+            and db.capabilities.dialect in ("postgres", "sqlite")
+            # 模型重写了save()时不能绕过
+            and type(instance).save is TortoiseModel.save
+        ):
+            await instance.save(using_db, update_fields=update_fields)
+            return
+
+        meta = instance._meta
+        executor = db.executor_class(model=type(instance), db=db)
+
+        await instance._pre_save(db, update_fields)
+
+        values = [
+            executor.column_map[name](getattr(instance, name), instance)
+            for name in update_fields
+        ]
+        values.append(meta.pk.to_db_value(instance.pk, instance))
+        columns = ", ".join(f'"{x}"' for x in meta.fields_db_projection.values())
+
+        _, rows = await db.execute_query(
+            f"{executor.get_update_sql(update_fields, None)} RETURNING {columns}",
+            values,
+        )
+        if not rows:
+            raise DoesNotExist(type(instance))
+
+        for name, column in meta.fields_db_projection.items():
+            setattr(
+                instance, name, meta.fields_map[name].to_python_value(rows[0][column])
+            )
+
+        await instance._post_save(db, False, update_fields)
+
     async def _build_related_objects(
         self,
         fields,
         related_instance=None,
         using_db: Optional[BaseDBAsyncClient] = None,
+        identity_map: Optional[RelatedObjectsMap] = None,
     ):
+        if identity_map is None:
+            identity_map = await RelatedObjectsMap.for_serializer(self, using_db)
+
         # TODO 不支持嵌套的更新
         field_map = self.field_map()
         result = defaultdict(list)
@@ -380,6 +829,10 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
                 for sub_value in value:
                     if isinstance(sub_value, ModelSerializerPydanticModel):
                         sub_model_id = getattr(sub_value, "id", None)
+                        if sub_model_id and sub_value._instance is None:
+                            sub_value._instance = identity_map.get(
+                                related_model, sub_model_id
+                            )
 
                         if not sub_model_id:
                             if not field_desc.get("writable", False):
@@ -391,19 +844,24 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
                                 related_object = sub_value.save(
                                     using_db=using_db,
                                     is_in_transaction=True,
+                                    identity_map=identity_map,
                                     **{
                                         model_field_type.relation_field: related_instance.id
                                     },
                                 )
                             else:
                                 related_object = sub_value.save(
-                                    using_db=using_db, is_in_transaction=True
+                                    using_db=using_db,
+                                    is_in_transaction=True,
+                                    identity_map=identity_map,
                                 )
                         else:
                             if field["field_type"] is BackwardFKRelation:
                                 # HACK 有限地允许反向FK的更新
                                 related_object = sub_value.save(
-                                    using_db=using_db, is_in_transaction=True
+                                    using_db=using_db,
+                                    is_in_transaction=True,
+                                    identity_map=identity_map,
                                 )
                             else:
                                 # FIXME 这个地方是导致m2m异常clear的原因，目前使用了以下的to_model方式来绕过
@@ -419,9 +877,7 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
                                     f"Not support this value '{sub_value}'"
                                 )
                         related_objects.append(
-                            await related_model.objects.get(id=sub_value).using_db(
-                                using_db
-                            )
+                            identity_map.get(related_model, sub_value)
                         )
 
                 all_related_objects = await asyncio.gather(*related_objects)
@@ -437,6 +893,49 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
 
         return result
 
+    @classmethod
+    def partial_validate(cls, instance: BaseDBModel, data: dict) -> Self:
+        """
+        Validate only the fields in ``data`` over ``instance``, for PATCH.
+
+        The other columns are copied from ``instance`` as they are and no
+        relation is loaded. ``save()`` then writes the supplied columns with a
+        single ``UPDATE`` and syncs only the supplied relations.
+        """
+        meta = instance._meta
+        serializer = cls.model_construct(
+            _fields_set=set(),
+            **{
+                name: getattr(instance, name)
+                for name in cls.model_fields
+                if name in meta.fields_db_projection
+            },
+        )
+
+        hidden_fields = set(cls.hidden_fields())
+        line_errors = []
+        for name, value in data.items():
+            # 与 PUT/POST 一样忽略未知的和被排除的字段
+            if name in hidden_fields or name not in cls.model_fields:
+                continue
+            try:
+                cls.__pydantic_validator__.validate_assignment(serializer, name, value)
+            except ValidationError as e:
+                line_errors.extend(
+                    {
+                        k: v
+                        for k, v in error.items()
+                        if k in ("type", "loc", "input", "ctx")
+                    }
+                    for error in e.errors()
+                )
+        if line_errors:
+            raise ValidationError.from_exception_data(cls.__name__, line_errors)
+
+        serializer._instance = instance
+        serializer._partial = True
+        return serializer
+
     def update(self, data: dict) -> Self:
         new_data = self.model_dump() | data
         new_serializer = self.__class__(**new_data)
@@ -446,6 +945,50 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
 
         return self
 
+    @classmethod
+    def get_fetch_fields(cls) -> List[str]:
+        """Return the relations to prefetch for this serializer."""
+        return _get_fetch_fields(cls, cls.model_config["orig_model"])  # type: ignore
+
+    @classmethod
+    def apply_fetch_plan(cls, queryset: "QuerySet") -> "QuerySet":
+        """Join, prefetch and prune columns of ``queryset`` for this serializer."""
+        plan = _get_fetch_plan(cls)  # type: ignore
+        if plan.select_related:
+            queryset = queryset.select_related(*plan.select_related)
+        if plan.prefetch_related:
+            queryset = queryset.prefetch_related(*plan.prefetch_related)
+        if plan.only and not (queryset._fields_for_select or queryset._annotations):
+            queryset = queryset.only(*plan.only)
+        return queryset
+
+    @classmethod
+    async def values_from_queryset(
+        cls, queryset: "QuerySet"
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Dump a queryset straight from ``values_list()``, without building model
+        instances or validating them; the result equals ``model_dump()`` of
+        :meth:`from_queryset`. Return None without querying when the serializer
+        has fields this can not reproduce, e.g. validators, custom serializers,
+        choices or many-to-many relations, or sets ``Meta.values_fast_path``
+        to False.
+        """
+        if not getattr(getattr(cls, "_my_meta", None), "values_fast_path", True):
+            return None
+        if queryset._fields_for_select or queryset._distinct:
+            return None
+        if (plan := _get_values_plan(cls)) is None:
+            return None
+
+        paths, build = plan
+        query = queryset.values_list(*paths)
+        query._db = query._db or query._choose_db()
+        query._make_query()
+        # 跳过 ValuesListQuery 的逐值转换，由编译好的函数只转换非原生类型的列
+        _, rows = await query._db.execute_query(str(query.query))
+        return [build(row) for row in rows]
+
     @classmethod
     async def from_tortoise_orm(cls, obj: "BaseDBModel") -> Self:
         """
@@ -467,10 +1010,8 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
 
         :param obj: The Model instance you want serialized.
         """
-        # Get fields needed to fetch
-        fetch_fields = _get_fetch_fields(cls, cls.model_config["orig_model"])  # type: ignore
         # Fetch fields
-        await obj.fetch_related(*fetch_fields)
+        await obj.fetch_related(*cls.get_fetch_fields())
         return cls.model_validate(obj)
 
     @classmethod
@@ -479,15 +1020,11 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
         Returns a serializable pydantic model instance that contains a list of models,
         from the provided queryset.
 
-        This will prefetch all the relations automatically.
+        This will fetch all the relations automatically, see :meth:`apply_fetch_plan`.
 
         :param queryset: a queryset on the model this PydanticModel is based on.
         """
-        fetch_fields = _get_fetch_fields(cls, cls.model_config["orig_model"])  # type: ignore
-        return [
-            cls.model_validate(e)
-            for e in await queryset.prefetch_related(*fetch_fields)
-        ]
+        return [cls.model_validate(e) for e in await cls.apply_fetch_plan(queryset)]
 
     class Config:
         @staticmethod
@@ -503,6 +1040,9 @@ class ModelSerializerPydanticModel(PydanticModel, metaclass=ModelSerializerMetac
         json_encoders = {
             datetime: lambda v: v.strftime(settings.DATETIME_FORMAT),
             date: lambda v: v.strftime(settings.DATE_FORMAT),
+            # 与 JSONResponse 的 orjson_default 保持一致
+            time: format_datetime,
+            Decimal: lambda v: f"{v:f}",
         }
 
 
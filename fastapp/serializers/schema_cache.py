@@ -0,0 +1,357 @@
+"""
+Deferred build and on-disk cache for the generated pydantic models of
+serializers and filtersets.
+
+Most of the cost of creating these models is pydantic building their core
+schema. With ``SCHEMA_DEFER_BUILD`` the schema is built the first time a model
+validates or serializes. With ``SCHEMA_CACHE_DIR`` built schemas are stored
+under a hash of the model name, bases, fields, validators and config, and a
+later start completes the model from the stored schema.
+
+Functions in a schema, validators, default factories and the like, are not
+stored: they are looked up again on the new class by their field, decorator
+or config name. Models whose schema refers to other functions, or to a type
+the key can not follow (a pydantic model that is not generated here), are not
+cached. The key does not cover the code of custom types, clear the directory
+after changing one.
+
+Stored schemas are unpickled, so anyone who can write to the directory can run
+code in the service. The directory must be private to the user the service
+runs as: it is created with mode 0700, and a directory or file that belongs to
+another user or is writable by group or others is not read.
+"""
+
+import hashlib
+import io
+import logging
+import os
+import pickle
+import re
+import tempfile
+import typing
+from enum import Enum
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Type
+
+import pydantic
+import pydantic_core
+from pydantic import BaseModel
+from pydantic import create_model as pydantic_create_model
+from pydantic._internal._config import ConfigWrapper
+from pydantic._internal._model_construction import set_deprecated_descriptors
+from pydantic._internal._signature import generate_pydantic_signature
+from pydantic._internal._utils import LazyClassAttribute
+from pydantic.fields import FieldInfo
+from pydantic.plugin._schema_validator import create_schema_validator
+from pydantic_core import SchemaSerializer
+from tortoise.contrib.pydantic.creator import _MODEL_INDEX
+
+from fastapp.conf import settings
+
+logger = logging.getLogger("qingkong.error")
+
+# 缓存格式变化时递增
+CACHE_VERSION = 1
+
+_ADDRESS_RE = re.compile(r" at 0x[0-9a-fA-F]+")
+
+_DECORATOR_KINDS = (
+    "validators",
+    "field_validators",
+    "root_validators",
+    "field_serializers",
+    "model_serializers",
+    "model_validators",
+    "computed_fields",
+)
+
+
+def _is_generated(model) -> bool:
+    return (
+        isinstance(model, type)
+        and issubclass(model, BaseModel)
+        and _MODEL_INDEX.get(model.__name__) is model
+    )
+
+
+def _type_key_parts(annotation, parts: List[Any]) -> bool:
+    """
+    Add what the schema of ``annotation`` depends on beyond its repr: the key
+    of nested models and the members of enums. Return False when a nested
+    model has no key.
+    """
+    if isinstance(annotation, type):
+        if issubclass(annotation, BaseModel):
+            key = None
+            if _is_generated(annotation):
+                key = annotation.model_config.get("schema_cache_key")
+            if key is None:
+                return False
+            parts.append(key)
+        elif issubclass(annotation, Enum):
+            parts.append([(m.name, m.value) for m in annotation])
+
+    return all(_type_key_parts(arg, parts) for arg in typing.get_args(annotation))
+
+
+def make_key(model_name: str, kwargs: Dict[str, Any], config: dict) -> Optional[str]:
+    """Hash the arguments of ``create_model``, or None if they can not be keyed."""
+    parts: List[Any] = []
+    for name, value in kwargs.items():
+        if name.startswith("__"):
+            parts.append((name, value))
+            continue
+
+        annotation = value[0] if isinstance(value, tuple) else value
+        if isinstance(value, tuple) and isinstance(value[1], FieldInfo):
+            # 只取 Field() 传入的参数，比完整的 repr 快得多
+            value = (annotation, value[1]._attributes_set)
+        parts.append((name, value))
+        if not _type_key_parts(annotation, parts):
+            return None
+
+    material = repr(
+        (
+            CACHE_VERSION,
+            pydantic.VERSION,
+            pydantic_core.__version__,
+            model_name,
+            config,
+            parts,
+        )
+    )
+    material = _ADDRESS_RE.sub("", material)
+    return hashlib.blake2b(material.encode(), digest_size=20).hexdigest()
+
+
+def _model_callables(model: Type[BaseModel]):
+    """Yield ``(path, function)`` for the functions a model schema may refer to."""
+    for name, field in model.model_fields.items():
+        if field.default_factory is not None:
+            yield ("default_factory", name), field.default_factory
+
+    decorators = model.__pydantic_decorators__
+    for kind in _DECORATOR_KINDS:
+        for name, decorator in getattr(decorators, kind).items():
+            yield ("decorator", kind, name), decorator.func
+
+    for key, value in model.model_config.items():
+        if isinstance(value, dict):
+            for k, v in value.items():
+                if callable(v) and not isinstance(v, type):
+                    yield ("config", key, k), v
+        elif callable(value) and not isinstance(value, type):
+            yield ("config", key), value
+
+
+def _resolve_callable(model: Type[BaseModel], path: Tuple) -> Any:
+    kind, *rest = path
+    if kind == "default_factory":
+        return model.model_fields[rest[0]].default_factory
+    if kind == "decorator":
+        return getattr(model.__pydantic_decorators__, rest[0])[rest[1]].func
+    value = model.model_config[rest[0]]
+    return value[rest[1]] if len(rest) > 1 else value
+
+
+def _iter_schema_models(schema):
+    if isinstance(schema, dict):
+        for value in schema.values():
+            yield from _iter_schema_models(value)
+    elif isinstance(schema, list):
+        for value in schema:
+            yield from _iter_schema_models(value)
+    elif isinstance(schema, type) and issubclass(schema, BaseModel):
+        yield schema
+
+
+class _SchemaPickler(pickle.Pickler):
+    def __init__(self, file, model: Type[BaseModel]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.model = model
+
+        self.callables: Dict[int, Tuple] = {}
+        owners = {model, *_iter_schema_models(model.__pydantic_core_schema__)}
+        for owner in owners:
+            if owner is not model and not _is_generated(owner):
+                continue
+            owner_name = None if owner is model else owner.__name__
+            for path, func in _model_callables(owner):
+                self.callables.setdefault(id(func), ("callable", owner_name, path))
+
+    def persistent_id(self, obj):
+        if obj is self.model:
+            return ("model", None)
+        if _is_generated(obj):
+            return ("model", obj.__name__)
+        return self.callables.get(id(obj))
+
+
+class _SchemaUnpickler(pickle.Unpickler):
+    def __init__(self, file, model: Type[BaseModel]):
+        super().__init__(file)
+        self.model = model
+
+    def persistent_load(self, pid):
+        kind, owner_name, *rest = pid
+        owner = self.model if owner_name is None else _MODEL_INDEX[owner_name]
+        if kind == "model":
+            return owner
+        return _resolve_callable(owner, rest[0])
+
+
+_insecure_dirs: set = set()
+
+
+def _is_private(st: os.stat_result) -> bool:
+    if not hasattr(os, "geteuid"):
+        return True
+    return st.st_uid == os.geteuid() and not st.st_mode & 0o022
+
+
+def _check_cache_dir(directory: Path) -> bool:
+    """Whether ``directory`` is safe to load pickles from; a missing one is."""
+    try:
+        st = directory.stat()
+    except FileNotFoundError:
+        return True
+    except OSError as e:
+        logger.warning(f"Schema cache directory check failed: {e!r}")
+        return False
+
+    if _is_private(st):
+        return True
+    if directory not in _insecure_dirs:
+        _insecure_dirs.add(directory)
+        logger.warning(
+            f"Schema cache {directory} is disabled: it must be owned by the "
+            "service user and not writable by group or others"
+        )
+    return False
+
+
+def _read_schema(path: Path) -> Optional[bytes]:
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, "O_NOFOLLOW", 0))
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Schema cache read failed: {e!r}")
+        return None
+
+    with os.fdopen(fd, "rb") as f:
+        # 检查打开的文件本身，避免检查后被替换
+        if not _is_private(os.fstat(fd)):
+            logger.warning(f"Schema cache {path} is ignored: not private")
+            return None
+        return f.read()
+
+
+def _dump_schema(path: Path, model: Type[BaseModel]):
+    buffer = io.BytesIO()
+    try:
+        _SchemaPickler(buffer, model).dump(model.__pydantic_core_schema__)
+    except (pickle.PicklingError, AttributeError, TypeError) as e:
+        # 引用了无法按名称找回的函数，不缓存
+        logger.debug(f"Schema of {model.__name__} is not cached: {e!r}")
+        return
+
+    tmp_path = None
+    try:
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        # 先写临时文件再替换，并发启动的 worker 不会读到写了一半的文件
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(buffer.getvalue())
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"Schema cache write failed: {e!r}")
+        if tmp_path is not None and os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def _load_schema(data: bytes, model: Type[BaseModel]) -> Optional[dict]:
+    try:
+        return _SchemaUnpickler(io.BytesIO(data), model).load()
+    except Exception as e:
+        logger.warning(f"Schema cache load failed for {model.__name__}: {e!r}")
+        return None
+
+
+def _complete_model(model: Type[BaseModel], schema: dict):
+    """Finish a deferred model with a stored schema, as pydantic does once built."""
+    config_wrapper = ConfigWrapper(model.model_config, check=False)
+    core_config = config_wrapper.core_config(title=model.__name__)
+
+    model.__pydantic_computed_fields__ = {
+        k: v.info for k, v in model.__pydantic_decorators__.computed_fields.items()
+    }
+    set_deprecated_descriptors(model)
+
+    model.__pydantic_core_schema__ = schema
+    model.__pydantic_validator__ = create_schema_validator(
+        schema,
+        model,
+        model.__module__,
+        model.__qualname__,
+        "create_model",
+        core_config,
+        config_wrapper.plugin_settings,
+    )
+    model.__pydantic_serializer__ = SchemaSerializer(schema, core_config)
+    model.__pydantic_complete__ = True
+
+    model.__signature__ = LazyClassAttribute(
+        "__signature__",
+        partial(
+            generate_pydantic_signature,
+            init=model.__init__,
+            fields=model.__pydantic_fields__,
+            validate_by_name=config_wrapper.validate_by_name,
+            extra=config_wrapper.extra,
+        ),
+    )
+
+
+def create_model(model_name: str, /, **kwargs) -> Type[BaseModel]:
+    """
+    ``pydantic.create_model`` following ``SCHEMA_DEFER_BUILD`` and
+    ``SCHEMA_CACHE_DIR``.
+    """
+    config = dict(kwargs.pop("__config__", None) or {})
+    defer_build = bool(settings.SCHEMA_DEFER_BUILD or config.get("defer_build"))
+
+    key = path = data = None
+    if settings.SCHEMA_CACHE_DIR is not None and _check_cache_dir(
+        Path(settings.SCHEMA_CACHE_DIR)
+    ):
+        key = make_key(model_name, kwargs, config)
+    if key is not None:
+        path = Path(settings.SCHEMA_CACHE_DIR) / f"{key}.pickle"
+        data = _read_schema(path)
+
+    if data is None and not defer_build:
+        model = pydantic_create_model(model_name, __config__=config, **kwargs)
+        if key is not None:
+            model.model_config["schema_cache_key"] = key
+            _dump_schema(path, model)
+        return model
+
+    model = pydantic_create_model(
+        model_name, __config__=config | {"defer_build": True}, **kwargs
+    )
+    model.model_config["defer_build"] = defer_build
+    if key is not None:
+        model.model_config["schema_cache_key"] = key
+
+    if data is not None:
+        schema = _load_schema(data, model)
+        if schema is not None:
+            _complete_model(model, schema)
+        elif not defer_build:
+            # 缓存无效，重新构建并覆盖
+            model.model_rebuild()
+            _dump_schema(path, model)
+
+    return model
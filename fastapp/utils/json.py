@@ -83,13 +83,24 @@ def is_aware(value):
     return value.utcoffset() is not None
 
 
-def default_datetime_format(o):
+def format_datetime(o):
+    """Format a datetime, date or time the way JSON responses render it."""
+    # isoformat() is about twice as fast as the equivalent strftime(), they
+    # differ only for years before 1000 that strftime() does not zero-pad
     if isinstance(o, datetime.datetime):
-        return o.strftime("%Y-%m-%d %H:%M:%S")
+        if o.year < 1000:
+            return o.strftime("%Y-%m-%d %H:%M:%S")
+        return o.isoformat(" ", "seconds")[:19]
     elif isinstance(o, datetime.date):
         return o.isoformat()
     elif isinstance(o, datetime.time):
-        return o.strftime("%H:%M:%S")
+        return o.isoformat("seconds")[:8]
+    return o
+
+
+def default_datetime_format(o):
+    if isinstance(o, (datetime.datetime, datetime.date, datetime.time)):
+        return format_datetime(o)
     elif isinstance(o, dict):
         return {k: default_datetime_format(v) for k, v in o.items()}
     elif isinstance(o, list):
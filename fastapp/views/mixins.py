@@ -1,12 +1,27 @@
-from typing import TYPE_CHECKING
-
+import csv
+import functools
+import io
+from typing import TYPE_CHECKING, Any, AsyncIterator, Dict, List, Optional, Tuple, Type
+from uuid import UUID
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter, ValidationError
 from starlette import status
 from tortoise.queryset import MODEL
+from tortoise.transactions import in_transaction
 
+from fastapp.exceptions import HttpCodeException
 from fastapp.models.base import BaseModel, QuerySet
+from fastapp.paginate.cursor import CursorPaginate
 from fastapp.requests import DjangoStyleRequest
-from fastapp.responses import JSONResponse
+from fastapp.responses import (
+    JSONResponse,
+    StreamingFileResponse,
+    render_json,
+    serializer_content,
+)
 from fastapp.serializers.model import ModelSerializer
+from fastapp.utils.json import format_datetime
 from fastapp.utils.model import ger_full_fields_map, get_verbose_name_dict
 from fastapp.views.decorators import action
 
@@ -22,7 +37,7 @@ class RetrieveModelMixin:
     async def retrieve(self, request, *args, **kwargs):  # type: ignore
         instance = await self.get_object()
         serializer = await self.get_serializer(instance)
-        return JSONResponse(serializer.model_dump())
+        return JSONResponse(serializer_content(serializer))
 
 
 class ListModelMixin:
@@ -36,10 +51,10 @@ class ListModelMixin:
         page = await self.paginate_queryset(queryset)
         if page is not None:
             serializer = await self.get_serializer(page, many=True)
-            return self.get_paginated_response(serializer.model_dump())
+            return self.get_paginated_response(serializer_content(serializer))
 
         serializer = await self.get_serializer(queryset, many=True)
-        return JSONResponse(serializer.model_dump())
+        return JSONResponse(serializer_content(serializer))
 
 
 class CreateModelMixin:
@@ -54,9 +69,9 @@ class CreateModelMixin:
         self.instance = await self.perform_create(serializer)  # type: ignore
 
         return JSONResponse(
-            (
+            serializer_content(
                 await self.get_serializer(self.instance, override_action="retrieve")
-            ).model_dump(),
+            ),
             status_code=status.HTTP_201_CREATED,
         )
 
@@ -84,11 +99,35 @@ class UpdateModelMixin:
         await self.perform_update(serializer)
 
         return JSONResponse(
-            (
+            serializer_content(
                 await self.get_serializer(
                     serializer._instance, override_action="retrieve"
                 )
-            ).model_dump(),
+            ),
+            status_code=status.HTTP_200_OK,
+        )
+
+    async def partial_update(  # type: ignore
+        self: "UpdateModelMixinType", request: DjangoStyleRequest, *args, **kwargs
+    ):
+        """
+        Validate and write only the fields in the payload, relations included.
+        Untouched relations are not loaded and the columns are written with a
+        single UPDATE.
+        """
+        instance = await self.get_object()
+        serializer = await self.get_serializer(
+            instance, data=await request.data, partial=True
+        )
+
+        await self.perform_update(serializer)
+
+        return JSONResponse(
+            serializer_content(
+                await self.get_serializer(
+                    serializer._instance, override_action="retrieve"
+                )
+            ),
             status_code=status.HTTP_200_OK,
         )
 
@@ -191,3 +230,390 @@ if TYPE_CHECKING:
         ModelSchemaMixin, ModelFieldsOperatorMixin, GenericViewSet
     ):
         pass
+
+
+def _csv_value(value: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, (dict, list, tuple)):
+        return render_json(value).decode("utf-8")
+    return format_datetime(value)
+
+
+class ExportModelMixin:
+    """
+    Stream the filtered queryset as NDJSON or CSV, `?format=csv`.
+
+    Rows are read in keyset chunks of `export_chunk_size` in the cursor
+    pagination ordering, or by primary key when that ordering has a nullable
+    field (NULLs fall out of keyset conditions), and each chunk is serialized
+    with the list serializer and written before the next one is fetched. The next chunk is
+    only read once the client has taken the previous one, so memory stays
+    bounded by one chunk whatever the size of the table.
+    """
+
+    export_formats = ("ndjson", "csv")
+    export_default_format = "ndjson"
+    export_chunk_size = 1000
+
+    async def iter_export_chunks(  # type: ignore[misc]
+        self: "ExportModelMixinType", queryset: QuerySet
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        pk_attr = queryset.model._meta.pk_attr
+        try:
+            ordering = CursorPaginate.get_ordering(queryset, self)
+        except HttpCodeException:
+            ordering = [(pk_attr, False)]
+        fields = [field for field, _ in ordering]
+        order_by = [("-" if desc else "") + field for field, desc in ordering]
+
+        values = None
+        while True:
+            chunk = queryset
+            if values is not None:
+                chunk = chunk.filter(CursorPaginate.keyset_q(ordering, values, False))
+
+            keys = (
+                await chunk.order_by(*order_by)
+                .limit(self.export_chunk_size)
+                .values_list(*fields)
+            )
+            if not keys:
+                return
+
+            page = queryset.filter(**{f"{pk_attr}__in": [x[-1] for x in keys]})
+            serializer = await self.get_serializer(
+                page.order_by(*order_by), many=True, override_action="list"
+            )
+            yield serializer.model_dump()
+
+            if len(keys) < self.export_chunk_size:
+                return
+            values = list(keys[-1])
+
+    async def _iter_ndjson(self, queryset: QuerySet) -> AsyncIterator[bytes]:
+        async for rows in self.iter_export_chunks(queryset):
+            yield b"".join(render_json(row) + b"\n" for row in rows)
+
+    async def _iter_csv(self, queryset: QuerySet) -> AsyncIterator[bytes]:
+        header = None
+        async for rows in self.iter_export_chunks(queryset):
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            if header is None:
+                header = list(rows[0])
+                writer.writerow(header)
+            writer.writerows([[_csv_value(row.get(k)) for k in header] for row in rows])
+            yield buffer.getvalue().encode("utf-8")
+
+    @action(detail=False, methods=["get"])
+    async def export(self: "ExportModelMixinType", request: DjangoStyleRequest):  # type: ignore[misc]
+        export_format = request.GET.get("format", self.export_default_format)
+        if export_format not in self.export_formats:
+            raise HttpCodeException(
+                f"Unsupported export format: {export_format}",
+                code=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = await self.filter_queryset(self.get_queryset())
+        filename = f"{queryset.model.__name__.lower()}.{export_format}"
+
+        if export_format == "csv":
+            return StreamingFileResponse(
+                self._iter_csv(queryset),
+                media_type="text/csv; charset=utf-8",
+                filename=filename,
+            )
+
+        return StreamingFileResponse(
+            self._iter_ndjson(queryset),
+            media_type="application/x-ndjson",
+            filename=filename,
+        )
+
+
+if TYPE_CHECKING:
+
+    class ExportModelMixinType(ExportModelMixin, GenericViewSet):
+        pass
+
+
+@functools.lru_cache(maxsize=None)
+def _bulk_type_adapter(serializer_class: Type[ModelSerializer]) -> TypeAdapter:
+    return TypeAdapter(List[serializer_class])  # type: ignore[valid-type]
+
+
+def _chunks(items: List[Any], size: int):
+    for i in range(0, len(items), size):
+        yield items[i : i + size]
+
+
+class BulkModelMixin:
+    """
+    Opt-in bulk actions on the collection URL, for loading batches.
+
+    - `POST bulk/` creates a list of objects with `bulk_create`
+    - `PUT bulk/` updates a list of objects, identified by primary key, with
+      one `UPDATE ... CASE` per chunk; each item is validated like a PATCH,
+      so fields left out keep their value
+    - `DELETE bulk/` deletes a list of primary keys with `DELETE ... IN`
+
+    The whole batch is validated first and written in one transaction, in
+    chunks of `bulk_chunk_size`. When any item fails nothing is written and
+    the 422 response lists the errors of each failing item by index.
+
+    Only columns are written: `perform_*` hooks, model `save()` overrides and
+    delete signals are not called, and M2M or reverse FK fields are rejected.
+    """
+
+    bulk_chunk_size = 1000
+    bulk_max_items = 10000
+
+    def _bulk_error_response(self, errors: Dict[int, List[dict]]) -> JSONResponse:
+        return JSONResponse(
+            {
+                "error": "ValidationError",
+                "message": "Invalid request data",
+                # ctx 中可能有异常对象
+                "detail": jsonable_encoder(
+                    [
+                        {"index": index, "errors": errors[index]}
+                        for index in sorted(errors)
+                    ]
+                ),
+            },
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+
+    def _bulk_items(self, data: Any) -> List[Any]:
+        if not isinstance(data, list):
+            raise HttpCodeException(
+                "Expected a list of items", code=status.HTTP_400_BAD_REQUEST
+            )
+        if len(data) > self.bulk_max_items:
+            raise HttpCodeException(
+                f"At most {self.bulk_max_items} items per request",
+                code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            )
+        return data
+
+    def validate_bulk(  # type: ignore[misc]
+        self: "BulkModelMixinType", data: Any
+    ) -> Tuple[List[ModelSerializer], Dict[int, List[dict]]]:
+        """Validate a batch with one TypeAdapter, return items and errors by index."""
+        serializer_class = self.get_serializer_class()
+        items = self._bulk_items(data)
+
+        errors: Dict[int, List[dict]] = {}
+        try:
+            serializers = _bulk_type_adapter(serializer_class).validate_python(items)
+        except ValidationError as e:
+            for error in e.errors(include_url=False, include_input=False):
+                index, *loc = error["loc"]
+                errors.setdefault(index, []).append(error | {"loc": tuple(loc)})
+            return [], errors
+
+        for index, serializer in enumerate(serializers):
+            if relation_errors := _relation_errors(serializer):
+                errors[index] = relation_errors
+
+        return serializers, errors
+
+    @action(detail=False, methods=["post"], url_path="bulk")
+    async def bulk_create(  # type: ignore[misc]
+        self: "BulkModelMixinType", request: DjangoStyleRequest
+    ):
+        serializers, errors = self.validate_bulk(await request.data)
+
+        model = self.get_serializer_class().orig_model()
+        pk_attr = model._meta.pk_attr
+        for index, serializer in enumerate(serializers):
+            if pk_attr in serializer.model_fields_set:
+                errors.setdefault(index, []).append(
+                    {
+                        "type": "bulk_pk",
+                        "loc": (pk_attr,),
+                        "msg": "Primary key can not be set when creating",
+                    }
+                )
+        if errors:
+            return self._bulk_error_response(errors)
+
+        instances = [await serializer.to_model() for serializer in serializers]
+
+        async with in_transaction(model._meta.app_config.default_connection) as conn:
+            await model.bulk_create(
+                instances, batch_size=self.bulk_chunk_size, using_db=conn
+            )
+
+        return JSONResponse(
+            {"count": len(instances)}, status_code=status.HTTP_201_CREATED
+        )
+
+    @action(detail=False, methods=["put"], url_path="bulk")
+    async def bulk_update(  # type: ignore[misc]
+        self: "BulkModelMixinType", request: DjangoStyleRequest
+    ):
+        serializer_class = self.get_serializer_class()
+        items = self._bulk_items(await request.data)
+
+        queryset = await self.filter_queryset(self.get_queryset())
+        meta = queryset.model._meta
+
+        pks = [
+            item.get(meta.pk_attr) if isinstance(item, dict) else None
+            for item in items
+        ]
+        loaded = await self._bulk_load(queryset, pks)
+
+        # 与 PATCH 一样只校验提交的字段，其余字段保留原值
+        errors: Dict[int, List[dict]] = {}
+        serializers = []
+        for index, (pk, instance, item) in enumerate(zip(pks, loaded, items)):
+            if not isinstance(item, dict):
+                errors[index] = [
+                    {
+                        "type": "dict_type",
+                        "loc": (),
+                        "msg": "Input should be a valid dictionary",
+                    }
+                ]
+                continue
+            if pk is None:
+                errors[index] = [
+                    {"type": "missing", "loc": (meta.pk_attr,), "msg": "Field required"}
+                ]
+                continue
+            if instance is None:
+                errors[index] = [_not_found_error(meta.pk_attr)]
+                continue
+
+            try:
+                serializer = serializer_class.partial_validate(instance, item)
+            except ValidationError as e:
+                errors[index] = e.errors(include_url=False, include_input=False)
+                continue
+            if relation_errors := _relation_errors(serializer):
+                errors[index] = relation_errors
+                continue
+            serializers.append((instance, serializer))
+
+        if errors:
+            return self._bulk_error_response(errors)
+
+        read_only_fields = set(serializer_class.read_only_fields())
+        update_fields = set()
+        instances = []
+        for instance, serializer in serializers:
+            for name in serializer.model_fields_set:
+                if (
+                    name in meta.fields_db_projection
+                    and name != meta.pk_attr
+                    and name not in read_only_fields
+                ):
+                    setattr(instance, name, getattr(serializer, name))
+                    update_fields.add(name)
+            instances.append(instance)
+
+        update_fields.update(
+            name
+            for name, field in meta.fields_map.items()
+            if getattr(field, "auto_now", False)
+        )
+        if instances and update_fields:
+            async with in_transaction(meta.app_config.default_connection) as conn:
+                await queryset.model.bulk_update(
+                    instances,
+                    fields=[x for x in meta.fields_db_projection if x in update_fields],
+                    batch_size=self.bulk_chunk_size,
+                    using_db=conn,
+                )
+
+        return JSONResponse({"count": len(instances)}, status_code=status.HTTP_200_OK)
+
+    @action(detail=False, methods=["delete"], url_path="bulk")
+    async def bulk_destroy(  # type: ignore[misc]
+        self: "BulkModelMixinType", request: DjangoStyleRequest
+    ):
+        pks = self._bulk_items(await request.data)
+
+        queryset = await self.filter_queryset(self.get_queryset())
+        meta = queryset.model._meta
+        loaded = await self._bulk_load(queryset, pks)
+
+        errors = {
+            index: [_not_found_error(meta.pk_attr)]
+            for index, instance in enumerate(loaded)
+            if instance is None
+        }
+        if errors:
+            return self._bulk_error_response(errors)
+
+        # 去重并保持顺序
+        pks = list({instance.pk: None for instance in loaded})
+        async with in_transaction(meta.app_config.default_connection) as conn:
+            for chunk in _chunks(pks, self.bulk_chunk_size):
+                await (
+                    queryset.model.filter(**{f"{meta.pk_attr}__in": chunk})
+                    .using_db(conn)
+                    .delete()
+                )
+
+        return JSONResponse({"count": len(pks)}, status_code=status.HTTP_200_OK)
+
+    async def _bulk_load(  # type: ignore[misc]
+        self: "BulkModelMixinType", queryset: QuerySet, pks: List[Any]
+    ) -> List[Optional[BaseModel]]:
+        """
+        Load `pks` from the view's queryset in chunks, checking object
+        permissions on each. Return the instance of each pk, None if missing.
+        """
+        pk_field = queryset.model._meta.pk
+
+        python_pks: List[Any] = []
+        for pk in pks:
+            try:
+                python_pks.append(
+                    pk_field.to_python_value(pk)
+                    if isinstance(pk, (str, int, UUID))
+                    else None
+                )
+            except (TypeError, ValueError):
+                python_pks.append(None)
+
+        loaded = {}
+        for chunk in _chunks(
+            list({x for x in python_pks if x is not None}), self.bulk_chunk_size
+        ):
+            for instance in await queryset.filter(pk__in=chunk):
+                await self.check_object_permissions(self.request, instance)
+                loaded[instance.pk] = instance
+
+        return [loaded.get(x) if x is not None else None for x in python_pks]
+
+
+def _not_found_error(pk_attr: str) -> dict:
+    return {"type": "not_found", "loc": (pk_attr,), "msg": "Object does not exist"}
+
+
+def _relation_errors(serializer: ModelSerializer) -> List[dict]:
+    model_description = serializer.model_description()
+    relations = {
+        x["name"]
+        for x in model_description.get("m2m_fields", [])
+        + model_description.get("backward_fk_fields", [])
+    }
+    return [
+        {
+            "type": "bulk_relation",
+            "loc": (name,),
+            "msg": "Relations can not be written in bulk",
+        }
+        for name in relations & serializer.model_fields_set
+    ]
+
+
+if TYPE_CHECKING:
+
+    class BulkModelMixinType(BulkModelMixin, GenericViewSet):
+        pass
@@ -13,6 +13,7 @@ from typing import (
     Literal,
     Optional,
     Self,
+    Sequence,
     Tuple,
     Type,
     overload,
@@ -33,7 +34,7 @@ from fastapp.paginate.base import BasePaginate
 from fastapp.paginate.serializers import PaginateResponse
 from fastapp.permissions.base import OperablePermissionBase as BasePermission
 from fastapp.requests import DjangoStyleRequest
-from fastapp.responses import JSONResponse
+from fastapp.responses import JSONResponse, render_json
 from fastapp.utils.functional import classonlymethod, copy_method_signature
 from fastapp.utils.module_loading import import_string
 from fastapp.utils.strings import BRACE_REGEX, split_camel_case
@@ -52,6 +53,7 @@ REST_ACTION_METHOD_MAPPING = {
     "retrieve": ["get"],
     "create": ["post"],
     "update": ["put"],
+    "partial_update": ["patch"],
     "destroy": ["delete"],
 }
 
@@ -94,7 +96,7 @@ class GenericViewSetWrapper(ViewWrapper):
 
         for name, action in viewset.get_actions():
             methods = REST_ACTION_METHOD_MAPPING[name]
-            detail = name in {"retrieve", "update", "destroy"}
+            detail = name in {"retrieve", "update", "partial_update", "destroy"}
 
             routers.append(ViewSetRouteItem(name, "/{id}/" if detail else "/", methods))
 
@@ -115,13 +117,13 @@ class GenericViewSetWrapper(ViewWrapper):
             for match in matches
         ]
 
-        if route.action in ("create", "update"):
+        if route.action in ("create", "update", "partial_update"):
             # 添加 body 参数的类型注解
             extra_params.append(
                 "body: "
                 + (
                     "SkipValidation[serializer_class]"
-                    if route.action == "update"
+                    if route.action in ("update", "partial_update")
                     else "serializer_class"
                 )
             )
@@ -229,7 +231,7 @@ class APIView(View):
         Instantiates and returns the list of permissions that this view requires.
         """
         # support action permission classes
-        if (action := getattr(self, "action", None)) and action not in {"list", "create", "retrieve", "update", "destroy"}:
+        if (action := getattr(self, "action", None)) and action not in {"list", "create", "retrieve", "update", "partial_update", "destroy"}:
             action_func = getattr(self, action)
             if ps := action_func.kwargs.get("permission_classes"):
                 return [permission() for permission in ps]
@@ -269,10 +271,38 @@ class ListSerializerWrapper:
     def model_dump(self, *args, **kwargs):
         return [x.model_dump(*args, **kwargs) for x in self.data]
 
+    @copy_method_signature(BaseModel.model_dump_json)
+    def model_dump_json(self, *args, **kwargs):
+        return f"[{','.join(x.model_dump_json(*args, **kwargs) for x in self.data)}]"
+
     def __init__(self, data):
         self.data = data
 
 
+class ValuesListSerializerWrapper(ListSerializerWrapper):
+    """Rows already dumped by `ModelSerializer.values_from_queryset()`."""
+
+    def __init__(self, rows, serializer_class):
+        self.rows = rows
+        self.serializer_class = serializer_class
+
+    @property
+    def data(self):
+        return [self.serializer_class.model_construct(**x) for x in self.rows]
+
+    @copy_method_signature(BaseModel.model_dump)
+    def model_dump(self, *args, **kwargs):
+        if args or kwargs:
+            return super().model_dump(*args, **kwargs)
+        return self.rows
+
+    @copy_method_signature(BaseModel.model_dump_json)
+    def model_dump_json(self, *args, **kwargs):
+        if args or kwargs:
+            return super().model_dump_json(*args, **kwargs)
+        return render_json(self.rows).decode()
+
+
 class GenericAPIView(APIView, Generic[MODEL]):
     """
     Base class for all other generic views.
@@ -295,6 +325,11 @@ class GenericAPIView(APIView, Generic[MODEL]):
     lookup_field = "id"
     lookup_url_kwarg = None
 
+    # Default ordering of `get_queryset()`, e.g. ["-created_at"]. When unset the
+    # queryset's own ordering or the model `Meta.ordering` applies; paginators
+    # add a pk tiebreak where pages need a stable order.
+    ordering: Optional[Sequence[str]] = None
+
     # The filter backend classes to use for queryset filtering
     filter_backends = []
     # filterset_class = FilterSet
@@ -335,7 +370,10 @@ class GenericAPIView(APIView, Generic[MODEL]):
             queryset = queryset.objects.all()
         elif isinstance(queryset, TortoiseQuerySet):
             queryset = queryset.all()
-        return queryset.order_by("id")
+
+        if self.ordering:
+            queryset = queryset.order_by(*self.ordering)
+        return queryset
 
     async def get_object(self) -> MODEL:
         """
@@ -430,6 +468,7 @@ class GenericAPIView(APIView, Generic[MODEL]):
         data: Any = None,
         many: Optional[bool] = False,
         override_action: Optional[str] = None,
+        partial: bool = False,
         **kwargs,
     ) -> ListSerializerWrapper | serializers.BaseSerializer:
         """
@@ -437,9 +476,17 @@ class GenericAPIView(APIView, Generic[MODEL]):
         deserializing input, and for serializing output.
 
         override_action: override self.action
+        partial: validate only the fields present in data (PATCH)
         """
         serializer_class = self.get_serializer_class(override_action=override_action)
         if isinstance(instance, TortoiseQuerySet):
+            if (
+                getattr(serializer_class.from_queryset, "__func__", None)
+                is serializers.ModelSerializer.from_queryset.__func__
+            ):
+                rows = await serializer_class.values_from_queryset(instance)
+                if rows is not None:
+                    return ValuesListSerializerWrapper(rows, serializer_class)
             return ListSerializerWrapper(await serializer_class.from_queryset(instance))
         elif isinstance(instance, list):
             return ListSerializerWrapper(
@@ -450,6 +497,8 @@ class GenericAPIView(APIView, Generic[MODEL]):
             if instance is None:
                 # create
                 return serializer_class.model_validate(data)
+            elif partial and hasattr(serializer_class, "partial_validate"):
+                return serializer_class.partial_validate(instance, data)
             else:
                 # update
                 serializer = await serializer_class.from_tortoise_orm(instance)
@@ -1,8 +1,19 @@
 import multiprocessing
 
-from fastapp.commands import about, cli, migrate, gateway, runserver, startapp, serve_static
+from fastapp.commands import (
+    about,
+    cli,
+    gateway,
+    migrate,
+    run_tests,
+    runserver,
+    serve_static,
+    startapp,
+)
 
-cli.register_commands(runserver, gateway, startapp, migrate, about, serve_static)
+cli.register_commands(
+    runserver, gateway, startapp, migrate, about, serve_static, run_tests
+)
 
 if __name__ == "__main__":
     multiprocessing.freeze_support()